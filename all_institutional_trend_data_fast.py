@@ -1,63 +1,69 @@
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
-import time
-from datetime import datetime
 import os
 from tqdm import tqdm
-from io import StringIO
 import multiprocessing
+from functools import partial
 
-def get_investor_trend(ticker_pages):
+from naver_fetcher import NAVER_BASE_URL, last_page_in_html, reached_known_date, split_job, get_page_sync
+from naver_parser import parse_frgn, concat_columns
+from http_cache import make_cache
+from rate_limiter import make_limiter
+
+FRGN_PATH = "/item/frgn.naver"
+FRGN_ROWS_PER_PAGE = 20
+
+
+def get_investor_trend(ticker_pages, base_url=NAVER_BASE_URL, cache=None, limiter=None):
     """
     Naver Finance에서 투자자별 매매동향(외국인/기관)을 가져옵니다.
+    cache가 있으면 (url, 거래일) 캐시를 먼저 확인하고, 캐시 응답은 대기 없이 처리합니다.
+    limiter가 있으면 네트워크 요청은 모든 워커 프로세스가 공유하는 예산 안에서만 보냅니다.
+    ticker_pages가 (ticker, pages, known_through)면 known_through 이하 날짜가 나온 페이지에서 멈춥니다.
     """
-    ticker, pages = ticker_pages
+    ticker, pages, known_through = split_job(ticker_pages)
 
-    url = f"https://finance.naver.com/item/frgn.naver?code={ticker}"
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+    url = f"{base_url}{FRGN_PATH}?code={ticker}"
+    session = requests.Session()
+    session.headers.update({'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'})
 
-    df_list = []
+    page_cols = []
 
     try:
         for page in range(1, pages + 1):
             pg_url = f'{url}&page={page}'
-            response = requests.get(pg_url, headers=headers)
-            html = BeautifulSoup(response.text, "lxml")
-
-            # 투자자별 매매동향 테이블 찾기
-            tables = html.select("table")
-
-            target_table = None
-            for tbl in tables:
-                if "기관" in str(tbl) and "외국인" in str(tbl):
-                    target_table = tbl
-                    break
-
-            if target_table:
-                df = pd.read_html(StringIO(str(target_table)))[0]
-                df = df.dropna()
-
-                if isinstance(df.columns, pd.MultiIndex):
-                     df.columns = [c[1] if c[1] else c[0] for c in df.columns]
+            html = cache.get(pg_url) if cache is not None else None
+            if html is None:
+                html = get_page_sync(session, pg_url, limiter)
+                if cache is not None:
+                    cache.put(pg_url, html)
 
-                df_list.append(df)
-            else:
+            # 외국인/기관 순매매 테이블 (날짜, 기관, 외국인)
+            cols = parse_frgn(html)
+            if not len(cols['date']):
                 break
+            page_cols.append(cols)
 
-            time.sleep(0.05)
+            last_page = last_page_in_html(html)
+            if last_page is not None and page >= last_page:
+                break
+            if reached_known_date(html, known_through):
+                break
 
-        if not df_list:
+        cols = concat_columns(page_cols)
+        if cols is None:
             return None
 
-        df = pd.concat(df_list, ignore_index=True)
-
-        df = df.iloc[:, [0, 5, 6]] # 날짜, 기관, 외국인
-        df.columns = ['date', 'institutional_net_buy', 'foreigner_net_buy']
+        df = pd.DataFrame({
+            'date': pd.to_datetime(cols['date']),
+            'close': cols['close'],
+            'institutional_net_buy': cols['institutional_net_buy'],
+            'foreigner_net_buy': cols['foreigner_net_buy'],
+        })
         df['ticker'] = ticker  # ticker 컬럼 추가
 
         # 전처리
-        df['date'] = pd.to_datetime(df['date'])
+        df = df.drop_duplicates(subset=['date'])
         df = df.sort_values(by='date')
 
         return df
@@ -66,7 +72,141 @@ def get_investor_trend(ticker_pages):
         # print(f"Error fetching investor data for {ticker}: {e}")
         return None
 
-def fetch_and_save_investor_data(stock_list_path, output_path, pages_to_fetch=20, filtered_only=False):
+def fetch_one(task, **kwargs):
+    """Pool 워커: (ticker, DataFrame 또는 None) → 결과가 없어도 어느 종목인지 알 수 있게"""
+    return task[0], get_investor_trend(task, **kwargs)
+
+
+class TrendCheckpoint:
+    """
+    저장이 끝난 종목 목록 (한 줄에 한 종목, 추가 쓰기 + fsync)
+    CSV 모드에서는 '@바이트' 줄로 그 시점까지 확정된 .partial 파일 크기도 기록
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        """→ (저장 완료 종목 set, 확정된 partial 파일 크기 또는 None)"""
+        done, offset = set(), None
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith('@'):
+                        offset = int(line[1:])
+                    elif line:
+                        done.add(line)
+        return done, offset
+
+    def mark(self, tickers, offset=None):
+        if not tickers:
+            return
+        lines = [f"{t}\n" for t in tickers]
+        if offset is not None:
+            lines.append(f"@{offset}\n")
+        with open(self.path, 'a') as f:
+            f.write(''.join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class CsvBatchWriter:
+    """
+    DataFrame을 batch_rows 단위로 CSV에 이어 쓰기 (bulk_loader 로더와 같은 write/stats 인터페이스)
+    파일이 이미 있으면(--resume) 헤더 없이 이어서 씀
+    """
+
+    def __init__(self, path, batch_rows=50000):
+        self.path = path
+        self.batch_rows = batch_rows
+        self._buffer = []
+        self._buffered_rows = 0
+        self.stats = {'rows': 0, 'chunks': 0}
+        self.offset = os.path.getsize(path) if os.path.exists(path) else 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        return False
+
+    def write(self, df):
+        self._buffer.append(df)
+        self._buffered_rows += len(df)
+        if self._buffered_rows >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        chunk = pd.concat(self._buffer, ignore_index=True)
+        self._buffer = []
+        self._buffered_rows = 0
+
+        header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, 'a', newline='') as f:
+            chunk.to_csv(f, index=False, header=header)
+            f.flush()
+            os.fsync(f.fileno())
+            self.offset = f.tell()
+        self.stats['rows'] += len(chunk)
+        self.stats['chunks'] += 1
+
+
+def load_known_through(output_path):
+    """기존 결과 CSV → {ticker: 마지막 날짜} (파일이 없으면 빈 dict)"""
+    if not os.path.exists(output_path):
+        return {}
+    df = pd.read_csv(output_path, usecols=['ticker', 'date'], dtype={'ticker': str})
+    df['ticker'] = df['ticker'].str.zfill(6)
+    last = pd.to_datetime(df['date']).groupby(df['ticker']).max()
+    return {t: d.date() for t, d in last.items()}
+
+
+def load_known_through_db():
+    """investor_flows → {ticker: 마지막 날짜}"""
+    from db_config import get_db_connection
+
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT ticker, MAX(date) FROM investor_flows GROUP BY ticker")
+        return dict(cur.fetchall())
+
+
+def merge_with_existing(output_path, new_df, pages_to_fetch):
+    """
+    증분 수집 결과를 기존 CSV에 병합
+    - (ticker, date) 중복은 새로 받은 값 우선
+    - 종목별로 전체 수집과 같은 기간(pages_to_fetch 페이지 분량)만 유지
+    """
+    old = pd.read_csv(output_path, dtype={'ticker': str})
+    old['ticker'] = old['ticker'].str.zfill(6)
+    old['date'] = pd.to_datetime(old['date'])
+
+    merged = pd.concat([old, new_df], ignore_index=True)
+    merged = merged.drop_duplicates(subset=['ticker', 'date'], keep='last')
+    merged = merged.sort_values(['ticker', 'date'])
+    return merged.groupby('ticker', sort=False).tail(pages_to_fetch * FRGN_ROWS_PER_PAGE)
+
+
+def fetch_and_save_investor_data(stock_list_path, output_path, pages_to_fetch=20, filtered_only=False,
+                                 base_url=NAVER_BASE_URL, cache=None, incremental=False,
+                                 new_listings_only=False, limiter=None, to_db=False, limit=None,
+                                 resume=False, batch_rows=50000):
+    """
+    incremental: 기존 데이터의 종목별 마지막 날짜까지만 페이징 후 병합
+    new_listings_only: 기존 데이터에 없는 종목만 전체 깊이로 수집 후 병합
+    to_db: CSV 대신 investor_flows에 COPY upsert (기존 데이터 = investor_flows)
+    resume: 체크포인트에 기록된(저장 완료) 종목은 건너뛰고 이어서 수집
+    batch_rows: 이 행 수만큼 모이면 디스크/DB에 쓰고 체크포인트 갱신 (메모리 상한)
+    """
     print(f"Loading stock list from {stock_list_path}...")
 
     if filtered_only and os.path.exists('filtered_stocks.csv'):
@@ -82,34 +222,99 @@ def fetch_and_save_investor_data(stock_list_path, output_path, pages_to_fetch=20
             return
 
     tickers = stocks['ticker'].tolist()
+    if limit:
+        tickers = tickers[:limit]
+
+    known_through = {}
+    if incremental or new_listings_only:
+        if to_db:
+            known_through = load_known_through_db()
+            print(f"Known-through dates loaded for {len(known_through)} stocks from investor_flows")
+        else:
+            known_through = load_known_through(output_path)
+            print(f"Known-through dates loaded for {len(known_through)} stocks from {output_path}")
 
-    print(f"Processing {len(tickers)} stocks with multiprocessing...")
+    if new_listings_only:
+        tasks = [(ticker, pages_to_fetch) for ticker in tickers if ticker not in known_through]
+        print(f"New listings only: {len(tasks)} of {len(tickers)} stocks")
+    elif incremental:
+        tasks = [(ticker, pages_to_fetch, known_through.get(ticker)) for ticker in tickers]
+    else:
+        tasks = [(ticker, pages_to_fetch) for ticker in tickers]
+
+    checkpoint = TrendCheckpoint("investor_flows.checkpoint" if to_db else f"{output_path}.checkpoint")
+    partial_path = f"{output_path}.partial"
+    if resume:
+        done, offset = checkpoint.load()
+        tasks = [t for t in tasks if t[0] not in done]
+        print(f"Resuming: {len(done)} stocks already saved, {len(tasks)} remaining")
+        # 체크포인트 이후에 쓰다 만 행은 잘라냄 (해당 종목은 다시 수집)
+        if not to_db and os.path.exists(partial_path):
+            with open(partial_path, 'r+b') as f:
+                f.truncate(offset or 0)
+    else:
+        checkpoint.clear()
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+    print(f"Processing {len(tasks)} stocks with multiprocessing...")
 
     # 멀티프로세싱 설정
     workers = max(1, multiprocessing.cpu_count() - 1)
     print(f"Using {workers} worker processes")
 
     pool = multiprocessing.Pool(workers)
+    results = pool.imap_unordered(partial(fetch_one, base_url=base_url, cache=cache, limiter=limiter), tasks)
 
-    tasks = [(ticker, pages_to_fetch) for ticker in tickers]
+    # 결과는 batch_rows마다 디스크/DB에 쓰고, 저장이 끝난 종목만 체크포인트에 기록
+    if to_db:
+        from bulk_loader import InvestorFlowLoader
+        sink = InvestorFlowLoader(chunk_size=batch_rows, verbose=False)
+    else:
+        sink = CsvBatchWriter(partial_path, batch_rows)
 
-    results = list(tqdm(
-        pool.imap_unordered(get_investor_trend, tasks),
-        total=len(tasks)
-    ))
+    try:
+        with sink:
+            pending = []
+            for ticker, df in tqdm(results, total=len(tasks)):
+                if df is None:
+                    continue
+                pending.append(ticker)
+                chunks = sink.stats['chunks']
+                sink.write(df)
+                if sink.stats['chunks'] != chunks:
+                    checkpoint.mark(pending, getattr(sink, 'offset', None))
+                    pending = []
+        checkpoint.mark(pending, getattr(sink, 'offset', None))
+    finally:
+        pool.terminate()
+        pool.join()
 
-    pool.close()
-    pool.join()
+    st = sink.stats
+    if to_db:
+        print(f"\nLoaded {st['rows']:,} rows into investor_flows "
+              f"(new {st['inserted']:,}, updated {st['updated']:,}, "
+              f"{len(st['tickers'])} stocks, {sink.rows_per_sec:,.0f} rows/sec)")
+        checkpoint.clear()
+        return
 
-    # None이 아닌 결과만 필터링
-    all_data = [df for df in results if df is not None]
+    if not os.path.exists(partial_path):
+        print("No data collected.")
+        checkpoint.clear()
+        return
 
-    if all_data:
-        final_df = pd.concat(all_data, ignore_index=True)
+    if known_through:
+        final_df = pd.read_csv(partial_path, dtype={'ticker': str}, parse_dates=['date'])
+        final_df = merge_with_existing(output_path, final_df, pages_to_fetch)
         final_df.to_csv(output_path, index=False)
-        print(f"\nData saved to {output_path}. Total rows: {len(final_df)}")
+        os.remove(partial_path)
+        total = len(final_df)
     else:
-        print("No data collected.")
+        os.replace(partial_path, output_path)
+        total = st['rows']
+    checkpoint.clear()
+    print(f"\nData saved to {output_path}. "
+          f"{'Rows added this run' if resume and not known_through else 'Total rows'}: {total}")
 
 if __name__ == "__main__":
     STOCK_LIST_FILE = "korean_stocks_list.csv"
@@ -122,14 +327,45 @@ if __name__ == "__main__":
                        help="Use filtered stock list (top 500) instead of all stocks")
     parser.add_argument("--pages", type=int, default=20,
                        help="Number of pages to fetch per stock")
+    parser.add_argument("--base-url", default=NAVER_BASE_URL,
+                       help="Override host (e.g. local naver_stub_server.py)")
+    parser.add_argument("--cache-dir", default=None, help="HTTP response cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the HTTP response cache")
+    parser.add_argument("--replay", action="store_true",
+                       help="Serve the whole run from the cache (no network)")
+    parser.add_argument("--no-rate-limit", action="store_true",
+                       help="Disable the shared rate limiter")
+    parser.add_argument("--incremental", action="store_true",
+                       help="Stop paging at each stock's last date in the existing output and merge")
+    parser.add_argument("--new-listings-only", action="store_true",
+                       help="Deep-fetch only stocks missing from the existing output and merge")
+    parser.add_argument("--to-db", action="store_true",
+                       help="Upsert into investor_flows instead of rewriting the CSV")
+    parser.add_argument("--limit", type=int, help="Limit number of stocks to process")
+    parser.add_argument("--resume", action="store_true",
+                       help="Skip stocks already saved by an interrupted run (checkpoint file)")
+    parser.add_argument("--batch-rows", type=int, default=50000,
+                       help="Rows buffered before each write to disk/DB")
     args = parser.parse_args()
 
+    cache = make_cache(args.cache_dir, replay=args.replay, no_cache=args.no_cache)
+    limiter = make_limiter(no_limit=args.no_rate_limit)
+
     if os.path.exists(STOCK_LIST_FILE):
         fetch_and_save_investor_data(
             STOCK_LIST_FILE,
             OUTPUT_FILE,
             pages_to_fetch=args.pages,
-            filtered_only=args.filtered_only
+            filtered_only=args.filtered_only,
+            base_url=args.base_url,
+            cache=cache,
+            incremental=args.incremental,
+            new_listings_only=args.new_listings_only,
+            limiter=limiter,
+            to_db=args.to_db,
+            limit=args.limit,
+            resume=args.resume,
+            batch_rows=args.batch_rows
         )
     else:
         print(f"File not found: {STOCK_LIST_FILE}")
@@ -2,19 +2,90 @@ import pandas as pd
 import numpy as np
 import os
 from tqdm import tqdm
+from data_access import query
 from db_config import get_db_connection
+from panel_executor import run_sharded
+from price_store import load_price_panel
+
+INVESTOR_WINDOW_DAYS = 7  # 수급 가산점에 쓰는 기간 (종목별 최신 거래일 기준)
+
+
+def load_investor_window(last_dates, window_days=INVESTOR_WINDOW_DAYS, backend=None):
+    """
+    investor_flows에서 종목별 (최신 거래일 - window_days) 이후 행만 조회
+    last_dates: {ticker: 최신 거래일} → (ticker, date) 기본키 범위 조회
+    backend: 'duckdb'면 analytics_db 미러에서 조회 (종목별 시작일은 DataFrame으로 조인)
+    """
+    tickers = list(last_dates.keys())
+    starts = [(pd.Timestamp(d) - pd.Timedelta(days=window_days)).date() for d in last_dates.values()]
+    if backend == 'duckdb':
+        window = pd.DataFrame({'ticker': tickers, 'start_date': pd.to_datetime(starts)})
+        df = query("""
+            SELECT f.ticker, f.date, f.institutional_net_buy, f.foreigner_net_buy
+            FROM _window w
+            JOIN investor_flows f ON f.ticker = w.ticker AND f.date >= CAST(w.start_date AS DATE)
+            ORDER BY f.ticker, f.date
+        """, backend='duckdb', frames={'_window': window})
+        df['date'] = pd.to_datetime(df['date'])
+        return df
+    with get_db_connection() as conn:
+        df = pd.read_sql("""
+            SELECT f.ticker, f.date, f.institutional_net_buy, f.foreigner_net_buy
+            FROM unnest(%s::varchar[], %s::date[]) AS w(ticker, start_date)
+            JOIN investor_flows f ON f.ticker = w.ticker AND f.date >= w.start_date
+        """, conn, params=(tickers, starts))
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+
+def indicator_panel(df):
+    """
+    전 종목 지표를 종목별 grouped rolling으로 한 번에 계산 (_calculate_technical_indicators와 같은 값)
+    → 60거래일 이상인 종목의 최신 행만 반환 (ticker 오름차순, 종목 단위로 독립이라 shard로 나눠 계산 가능)
+    """
+    df = df.sort_values(['ticker', 'date'], kind='stable').reset_index(drop=True)
+    ticker = df['ticker']
+    g = df.groupby('ticker', sort=True)
+
+    def rolling(series, window, min_periods=None, how='mean'):
+        r = series.groupby(ticker, sort=True).rolling(window=window, min_periods=min_periods)
+        return getattr(r, how)().reset_index(level=0, drop=True)
+
+    ind = pd.DataFrame({'ticker': ticker, 'date': df['date'], 'close': df['close'],
+                        'volume': df['volume']})
+    ind['MA20'] = rolling(df['close'], 20)
+    ind['MA50'] = rolling(df['close'], 50)
+    ind['MA200'] = rolling(df['close'], 200)
+    ind['VolMA20'] = rolling(df['volume'], 20)
+    high52 = rolling(df['high'], 252, 50, 'max')
+    low52 = rolling(df['low'], 252, 50, 'min')
+    ind['Position52'] = (df['close'] - low52) / (high52 - low52)
+
+    # RSI (종목 첫 행의 diff는 NaN → gain/loss 0, 기존 계산과 동일)
+    delta = g['close'].diff(1)
+    gain = rolling(delta.where(delta > 0, 0), 14)
+    loss = rolling(-delta.where(delta < 0, 0), 14)
+    ind['RSI'] = 100 - (100 / (1 + gain / loss))
+
+    # 종목별 최신 행 + 최소 데이터 요구량 (60거래일)
+    counts = g.size()
+    latest = ind.groupby('ticker', sort=True).tail(1).set_index('ticker')
+    latest = latest[counts.reindex(latest.index) >= 60]
+    return latest.dropna(subset=['MA20', 'MA50'])
+
 
 class EnhancedWaveTransitionAnalyzerV3:
-    def __init__(self, investor_data_path, stock_list_path, days_back=180):
-        # Load price data from DB
-        print(f"Loading price data from DB (최근 {days_back}일)...")
-        with get_db_connection() as conn:
-            self.price_data = pd.read_sql(f"""
-                SELECT ticker, date, open, high, low, close, volume
-                FROM daily_prices
-                WHERE date >= CURRENT_DATE - INTERVAL '{days_back} days'
-                ORDER BY ticker, date
-            """, conn)
+    def __init__(self, investor_data_path, stock_list_path, days_back=180, source='auto'):
+        """
+        investor_data_path가 None이면 수급 데이터는 investor_flows 테이블에서 필요한 기간만 조회
+        source: 가격 패널 출처 ('auto'면 price_store 스냅샷 우선, 없으면 daily_prices,
+                'duckdb'면 가격 / 수급 모두 analytics_db 미러에서 조회)
+        """
+        # Load price data (price_store 스냅샷 또는 DB)
+        print(f"Loading price data (최근 {days_back}일)...")
+        self.price_data = load_price_panel(days_back=days_back,
+                                           columns=['open', 'high', 'low', 'close', 'volume'],
+                                           source=source)
         print(f"   ✅ {len(self.price_data):,}행 로드")
 
         self.stock_list = pd.read_csv(stock_list_path)
@@ -29,7 +100,12 @@ class EnhancedWaveTransitionAnalyzerV3:
         # 수급 데이터는 선택적으로 로드
         self.investor_data = None
         try:
-            if investor_data_path and os.path.exists(investor_data_path):
+            if investor_data_path is None:
+                last_dates = self.price_data.groupby('ticker')['date'].max().to_dict()
+                self.investor_data = load_investor_window(
+                    last_dates, backend='duckdb' if source == 'duckdb' else None)
+                print(f"   ✅ 수급 데이터 {len(self.investor_data):,}행 로드 (investor_flows)")
+            elif os.path.exists(investor_data_path):
                 self.investor_data = pd.read_csv(investor_data_path)
                 if 'ticker' in self.investor_data.columns:
                     self.investor_data['ticker'] = self.investor_data['ticker'].astype(str).str.zfill(6)
@@ -151,11 +227,84 @@ class EnhancedWaveTransitionAnalyzerV3:
             'Position52': pos52
         }
 
-    def run_analysis(self):
+    def compute_indicator_panel(self, workers=1):
+        """
+        전 종목 지표 (indicator_panel) → 60거래일 이상인 종목의 최신 행 (ticker 오름차순)
+        workers > 1이면 panel_executor로 종목 shard를 병렬 계산 (가격 패널은 공유 메모리)
+        """
+        return run_sharded(self.price_data, indicator_panel, workers=workers,
+                           columns=['high', 'low', 'close', 'volume'])
+
+    def investor_scores(self, latest_dates):
+        """종목별 최신 거래일 - 7일 이후 기관/외국인 순매수 합계 → 가산점 (각 5점)"""
+        if self.investor_data is None or self.investor_data.empty:
+            return pd.Series(0, index=latest_dates.index)
+
+        inv = self.investor_data.merge(latest_dates.rename('latest_date'),
+                                       left_on='ticker', right_index=True)
+        inv = inv[inv['date'] >= inv['latest_date'] - pd.Timedelta(days=INVESTOR_WINDOW_DAYS)]
+        sums = inv.groupby('ticker')[['institutional_net_buy', 'foreigner_net_buy']].sum()
+        bonus = (sums['institutional_net_buy'] > 0) * 5 + (sums['foreigner_net_buy'] > 0) * 5
+        return bonus.reindex(latest_dates.index, fill_value=0).astype(int)
+
+    def run_analysis(self, workers=1):
+        """전 종목 지표 → 파동 단계 규칙을 boolean mask로 적용 (analyze_stock 루프와 같은 결과)"""
         print("Starting Wave Analysis...")
+        latest = self.compute_indicator_panel(workers)
+
+        # 종목명 (목록에 없는 종목은 제외: 기존 루프에서 조회 실패로 건너뛰던 것과 동일)
+        names = self.stock_list.drop_duplicates('ticker').set_index('ticker')['name']
+        latest = latest[latest.index.isin(names.index)]
+
+        ma20, ma50, ma200 = latest['MA20'], latest['MA50'], latest['MA200']
+        ma_golden = ma20 > ma50
+        ma_aligned = ma_golden & ((ma50 > ma200) | ma200.isna())
+
+        pos52 = latest['Position52'].fillna(0.5)
+        vol_ratio = pd.Series(np.where(latest['VolMA20'] > 0, latest['volume'] / latest['VolMA20'], 1.0),
+                              index=latest.index)
+        rsi = latest['RSI'].fillna(50)
+
+        conditions = [
+            # 1. 2단계 중기 (Strong Uptrend) - 90점
+            ma_aligned & pos52.between(0.6, 0.95) & (vol_ratio >= 1.3) & rsi.between(55, 85),
+            # 2. 2단계 초기 (Early Uptrend) - 80점
+            ma_golden & pos52.between(0.4, 0.75) & (latest['close'] > ma20) & (vol_ratio >= 1.1),
+            # 3. 1단계 -> 2단계 전환 (Transition) - 70점
+            ((ma20 - ma50).abs() / ma50 < 0.05) & pos52.between(0.25, 0.6) & rsi.between(45, 65),
+            # 4. 일반 상승 추세 (General Uptrend) - 60점
+            ma_golden & pos52.between(0.3, 0.8),
+        ]
+        score = np.select(conditions, [90, 80, 70, 60], default=0)
+        wave_stage = np.select(conditions, ["Strong Uptrend", "Early Uptrend", "Transition", "General Uptrend"],
+                               default="Unknown")
+
+        # 수급 점수 가산 (Investor Trends) - 선택적
+        final_score = score + self.investor_scores(latest['date']).to_numpy()
+
+        results_df = pd.DataFrame({
+            'date': latest['date'].to_numpy(),
+            'ticker': latest.index.to_numpy(),
+            'name': names.reindex(latest.index).to_numpy(),
+            'wave_stage': wave_stage,
+            'score': final_score,
+            'close': latest['close'].to_numpy(),
+            'volume': latest['volume'].to_numpy(),
+            'MA20': ma20.to_numpy(),
+            'MA50': ma50.to_numpy(),
+            'RSI': rsi.to_numpy(),
+            'Position52': pos52.to_numpy(),
+        })
+        if not results_df.empty:
+            results_df = results_df.sort_values(by='score', ascending=False)
+
+        return results_df
+
+    def run_analysis_legacy(self):
+        """종목별 analyze_stock 루프 (비교/검증용)"""
         unique_tickers = self.price_data['ticker'].unique()
         results = []
-        
+
         for ticker in tqdm(unique_tickers):
             try:
                 res = self.analyze_stock(ticker)
@@ -164,22 +313,35 @@ class EnhancedWaveTransitionAnalyzerV3:
             except Exception as e:
                 # print(f"Error analyzing {ticker}: {e}")
                 continue
-                
+
         results_df = pd.DataFrame(results)
         if not results_df.empty:
             results_df = results_df.sort_values(by='score', ascending=False)
-            
+
         return results_df
 
 if __name__ == "__main__":
-    INVESTOR_FILE = "all_institutional_trend_data.csv"
+    import argparse
+
     STOCK_LIST_FILE = "korean_stocks_list.csv"
     OUTPUT_FILE = "wave_transition_analysis_results.csv"
 
-    # DB 버전: PRICE_FILE 불필요
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--investor-csv", metavar="PATH",
+                        help="Read investor flows from a CSV (e.g. all_institutional_trend_data.csv) "
+                             "instead of the investor_flows table")
+    parser.add_argument("--days-back", type=int, default=180, help="Calendar days of price history to load")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for the indicator pass (shared-memory panel, 0 = all cores)")
+    parser.add_argument("--source", choices=["auto", "store", "db", "duckdb"], default="auto",
+                        help="Price panel source (price_store snapshot, daily_prices or the DuckDB mirror)")
+    args = parser.parse_args()
+
+    # DB 버전: PRICE_FILE 불필요, 수급은 investor_flows에서 필요한 기간만
     print("Running analysis with DB-based price data...")
-    analyzer = EnhancedWaveTransitionAnalyzerV3(INVESTOR_FILE, STOCK_LIST_FILE, days_back=180)
-    results = analyzer.run_analysis()
+    analyzer = EnhancedWaveTransitionAnalyzerV3(args.investor_csv, STOCK_LIST_FILE, days_back=args.days_back,
+                                                source=args.source)
+    results = analyzer.run_analysis(workers=args.workers or None)
     if not results.empty:
         results.to_csv(OUTPUT_FILE, index=False)
         print(f"Analysis saved to {OUTPUT_FILE}. Top 5 stocks:")
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DuckDB 분석용 미러 (선택 사항, .cache/analytics.duckdb)
+- daily_prices / investor_flows / stock_pool_history / ai_analysis_reports를 로컬 DuckDB 파일로 복제
+  → 무거운 분석 스캔(전 종목 다일 구간, 선행 수익률 조인, 풀 이력 집계)이 서비스 Postgres에 부하를 주지 않음
+- 증분 갱신: 테이블마다 변경 시각 컬럼(created_at / updated_at)이 직전 동기화 이후인 행만 COPY로 받아 upsert,
+  날짜 컬럼의 월별 행 수가 Postgres와 다른 월은 다시 받고, Postgres에서 사라진 월(보관 기간 정리)은 삭제
+- 읽기: data_access.load_panel(backend='duckdb'), data_access.query(sql, backend='duckdb'),
+  분석 스크립트는 --source duckdb (또는 ANALYTICS_BACKEND=duckdb)
+- DuckDB 파일은 쓰는 프로세스가 하나뿐이므로 읽기는 read_only 연결, 갱신 중에는 읽기가 잠시 실패할 수 있음
+
+사용법:
+    python analytics_db.py --refresh            # 변경분만 갱신 (처음이면 전체)
+    python analytics_db.py --refresh --full     # 전체 재생성
+    python analytics_db.py --status
+    python analytics_db.py --sql "SELECT COUNT(*) FROM daily_prices"
+"""
+import io
+import os
+import time
+from datetime import timedelta
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from db_config import get_db_connection
+
+DEFAULT_DB_PATH = os.getenv('ANALYTICS_DB_PATH') or \
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'analytics.duckdb')
+
+# 동시에 커밋 중이던 트랜잭션을 놓치지 않도록 직전 동기화 시각보다 조금 앞부터 확인
+SYNC_OVERLAP = timedelta(minutes=5)
+
+# DuckDB 타입 → (Postgres에서 꺼낼 때 캐스트, Arrow 타입)
+_TYPES = {
+    'VARCHAR': ('text', pa.string()),
+    'DATE': ('date', pa.date32()),
+    'INTEGER': ('int4', pa.int32()),
+    'BIGINT': ('int8', pa.int64()),
+    'DOUBLE': ('float8', pa.float64()),
+    'TIMESTAMP': ('timestamp', pa.timestamp('us')),
+}
+
+# 테이블별 미러 설정: 컬럼 (이름, DuckDB 타입), 기본키, 변경 시각 컬럼, 월별 대조용 날짜 컬럼
+MIRRORS = {
+    'daily_prices': {
+        'columns': [('ticker', 'VARCHAR'), ('date', 'DATE'), ('open', 'INTEGER'), ('high', 'INTEGER'),
+                    ('low', 'INTEGER'), ('close', 'INTEGER'), ('volume', 'BIGINT'), ('created_at', 'TIMESTAMP')],
+        'key': ['ticker', 'date'],
+        'changed': 'created_at',
+        'period': 'date',
+    },
+    'investor_flows': {
+        'columns': [('ticker', 'VARCHAR'), ('date', 'DATE'), ('close', 'DOUBLE'),
+                    ('institutional_net_buy', 'BIGINT'), ('foreigner_net_buy', 'BIGINT'),
+                    ('updated_at', 'TIMESTAMP')],
+        'key': ['ticker', 'date'],
+        'changed': 'updated_at',
+        'period': 'date',
+    },
+    'stock_pool_history': {
+        'columns': [('id', 'INTEGER'), ('ticker', 'VARCHAR'), ('name', 'VARCHAR'), ('close', 'DOUBLE'),
+                    ('trading_value', 'BIGINT'), ('change_5d', 'DOUBLE'), ('vol_ratio', 'DOUBLE'),
+                    ('final_score', 'DOUBLE'), ('status', 'VARCHAR'), ('added_date', 'DATE'),
+                    ('snapshot_date', 'DATE'), ('created_at', 'TIMESTAMP')],
+        'key': ['id'],
+        'changed': 'created_at',
+        'period': 'snapshot_date',
+    },
+    'ai_analysis_reports': {
+        'columns': [('id', 'INTEGER'), ('ticker', 'VARCHAR'), ('report_date', 'DATE'), ('summary', 'VARCHAR'),
+                    ('recommendation', 'VARCHAR'), ('confidence_score', 'DOUBLE'),
+                    ('momentum_analysis', 'VARCHAR'), ('liquidity_analysis', 'VARCHAR'),
+                    ('risk_factors', 'VARCHAR'), ('created_at', 'TIMESTAMP')],
+        'key': ['id'],
+        'changed': 'created_at',
+        'period': 'report_date',
+    },
+}
+
+
+def _import_duckdb():
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError("DuckDB 미러를 쓰려면 duckdb 패키지가 필요합니다 (pip install duckdb)") from e
+    return duckdb
+
+
+def connect(path=DEFAULT_DB_PATH, read_only=True):
+    """미러 연결 (읽기 전용 기본, 파일이 없으면 FileNotFoundError)"""
+    duckdb = _import_duckdb()
+    if read_only and not os.path.exists(path):
+        raise FileNotFoundError(f"분석용 미러가 없습니다: {path} (python analytics_db.py --refresh)")
+    return duckdb.connect(path, read_only=read_only)
+
+
+def _create_tables(con):
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS _mirror_sync (
+            table_name VARCHAR PRIMARY KEY, synced_at TIMESTAMP, rows BIGINT
+        )
+    """)
+    for table, spec in MIRRORS.items():
+        cols = ', '.join(f"{name} {kind}" for name, kind in spec['columns'])
+        con.execute(f"CREATE TABLE IF NOT EXISTS {table} ({cols}, PRIMARY KEY ({', '.join(spec['key'])}))")
+
+
+def _fetch(cur, table, where='', params=()):
+    """Postgres 행 → Arrow Table (COPY CSV, 미러 컬럼 타입으로 캐스트)"""
+    spec = MIRRORS[table]
+    exprs = [f"{name}::{_TYPES[kind][0]}" for name, kind in spec['columns']]
+    names = [name for name, _ in spec['columns']]
+    sql = cur.mogrify(f"SELECT {', '.join(exprs)} FROM {table} {where}", params).decode()
+    buf = io.BytesIO()
+    cur.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv)", buf)
+    if buf.tell() == 0:
+        return pa.schema([(name, _TYPES[kind][1]) for name, kind in spec['columns']]).empty_table()
+    buf.seek(0)
+    return pa_csv.read_csv(
+        buf,
+        read_options=pa_csv.ReadOptions(column_names=names, use_threads=False),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: _TYPES[kind][1] for name, kind in spec['columns']},
+            strings_can_be_null=True, quoted_strings_can_be_null=False),
+    )
+
+
+def _upsert(con, table, data):
+    if data.num_rows == 0:
+        return 0
+    con.register('_incoming', data)
+    try:
+        con.execute(f"INSERT OR REPLACE INTO {table} SELECT * FROM _incoming")
+    finally:
+        con.unregister('_incoming')
+    return data.num_rows
+
+
+def _month_counts_pg(cur, table, period):
+    cur.execute(f"SELECT to_char({period}, 'YYYY-MM'), COUNT(*) FROM {table} GROUP BY 1")
+    return dict(cur.fetchall())
+
+
+def _month_counts_mirror(con, table, period):
+    return dict(con.execute(f"SELECT strftime({period}, '%Y-%m'), COUNT(*) FROM {table} GROUP BY 1").fetchall())
+
+
+def refresh_table(con, cur, table, since=None):
+    """
+    테이블 하나 갱신 → {'upserted': 받은 행 수, 'months': 다시 받은 / 지운 월 수}
+    since가 None이면 전체 재생성
+    """
+    spec = MIRRORS[table]
+    period = spec['period']
+    if since is None:
+        con.execute(f"DELETE FROM {table}")
+        upserted = _upsert(con, table, _fetch(cur, table))
+        return {'upserted': upserted, 'months': 0}
+
+    upserted = _upsert(con, table, _fetch(cur, table, f"WHERE {spec['changed']} >= %s", (since,)))
+
+    # 행 수가 다른 월 = 삭제(보관 기간 정리 등)가 있었던 월 → 월 단위로 다시 받음
+    pg_counts = _month_counts_pg(cur, table, period)
+    mirror_counts = _month_counts_mirror(con, table, period)
+    stale = sorted(m for m in set(pg_counts) | set(mirror_counts)
+                   if pg_counts.get(m) != mirror_counts.get(m))
+    for month in stale:
+        con.execute(f"DELETE FROM {table} WHERE strftime({period}, '%Y-%m') = ?", [month])
+        if month in pg_counts:
+            upserted += _upsert(con, table, _fetch(cur, table, f"WHERE to_char({period}, 'YYYY-MM') = %s",
+                                                   (month,)))
+    return {'upserted': upserted, 'months': len(stale)}
+
+
+def refresh_mirror(path=DEFAULT_DB_PATH, tables=None, full=False, verbose=True):
+    """미러 갱신 → 테이블별 결과 (처음이거나 full=True면 전체 재생성)"""
+    # 전체 재생성은 파일부터 새로 (DELETE로 비운 블록은 파일 크기를 줄이지 않음)
+    if full and tables is None:
+        for name in (path, path + '.wal'):
+            if os.path.exists(name):
+                os.remove(name)
+    tables = list(tables or MIRRORS)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    start_time = time.perf_counter()
+    results = {}
+
+    con = connect(path, read_only=False)
+    try:
+        _create_tables(con)
+        state = dict(con.execute("SELECT table_name, synced_at FROM _mirror_sync").fetchall())
+        with get_db_connection() as conn:
+            cur = conn.cursor()
+            for table in tables:
+                cur.execute("SELECT LOCALTIMESTAMP")
+                synced_at = cur.fetchone()[0]
+                since = None if full or table not in state else state[table] - SYNC_OVERLAP
+                con.execute("BEGIN")
+                result = refresh_table(con, cur, table, since)
+                rows = con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                con.execute("INSERT OR REPLACE INTO _mirror_sync VALUES (?, ?, ?)", [table, synced_at, rows])
+                con.execute("COMMIT")
+                result.update(rows=rows, mode='전체' if since is None else '증분')
+                results[table] = result
+        con.execute("CHECKPOINT")
+    finally:
+        con.close()
+
+    if verbose:
+        for table, r in results.items():
+            print(f"🦆 {table} ({r['mode']}): {r['upserted']:,}행 반영, 다시 받은 월 {r['months']}개 → {r['rows']:,}행")
+        print(f"   {path} 갱신 {time.perf_counter() - start_time:.1f}초")
+    return results
+
+
+def refresh_after_update(path=DEFAULT_DB_PATH, tables=None):
+    """수집/파이프라인 스크립트 마지막에 호출 (미러를 만든 적이 있을 때만, 실패해도 본 작업은 유지)"""
+    if not os.path.exists(path):
+        return None
+    try:
+        return refresh_mirror(path, tables)
+    except Exception as e:
+        print(f"⚠️  분석용 미러 갱신 실패 (다음 실행 때 재시도): {e}")
+        return None
+
+
+def print_status(path=DEFAULT_DB_PATH):
+    if not os.path.exists(path):
+        print(f"📭 분석용 미러 없음: {path} (python analytics_db.py --refresh)")
+        return
+    con = connect(path)
+    try:
+        print(f"🦆 {path} ({os.path.getsize(path) / 1e6:.1f}MB)")
+        for table, synced_at, rows in con.execute("SELECT * FROM _mirror_sync ORDER BY 1").fetchall():
+            print(f"   {table:<22} {rows:>10,}행  동기화 {synced_at}")
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Local DuckDB mirror for analytics queries')
+    parser.add_argument('--path', default=DEFAULT_DB_PATH)
+    parser.add_argument('--refresh', action='store_true', help='Apply rows changed since the last sync')
+    parser.add_argument('--full', action='store_true', help='With --refresh: rebuild every table')
+    parser.add_argument('--tables', nargs='+', choices=list(MIRRORS), help='Tables to refresh (default: all)')
+    parser.add_argument('--status', action='store_true', help='Show mirrored tables and sync times')
+    parser.add_argument('--sql', help='Run a read-only query against the mirror and print the result')
+    args = parser.parse_args()
+
+    if args.refresh:
+        refresh_mirror(args.path, args.tables, full=args.full)
+    if args.sql:
+        con = connect(args.path)
+        try:
+            print(con.execute(args.sql).df().to_string())
+        finally:
+            con.close()
+    if args.status or not (args.refresh or args.sql):
+        print_status(args.path)
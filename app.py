@@ -20,6 +20,7 @@ st.set_page_config(
 # Dashboard (Home) 페이지
 from page_modules import dashboard_compact as dashboard
 from sidebar_utils import render_sidebar_badges
+from db_config import query_run
 
 # Streamlit 기본 네비게이션 숨기기
 st.markdown("""
@@ -53,8 +54,10 @@ if st.sidebar.button("✅ Trading", use_container_width=True, type="primary" if
 
 st.sidebar.markdown("---")
 
-# 사이드바 배지 렌더링
-render_sidebar_badges()
+# 페이지 렌더 1회 = 쿼리 계측 실행 단위 (DB_QUERY_STATS=1일 때 N+1 탐지)
+with query_run('page:dashboard'):
+    # 사이드바 배지 렌더링
+    render_sidebar_badges()
 
-# 메인 대시보드 렌더링
-dashboard.render()
+    # 메인 대시보드 렌더링
+    dashboard.render()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+analysis2 파동 분석 벤치마크: 종목별 analyze_stock 루프 vs 전 종목 grouped rolling (run_analysis)
+- 기본은 합성 패널 (2,790종목 × 125거래일 ≈ 180일, DB 불필요)
+- --source store/db면 실제 daily_prices 패널 + korean_stocks_list.csv 사용
+- 두 결과가 완전히 같은지 확인한 뒤 시간 비교
+
+사용법:
+    python bench_analysis2.py
+    python bench_analysis2.py --tickers 2790 --days 260
+    python bench_analysis2.py --source store --days-back 180
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis2 import EnhancedWaveTransitionAnalyzerV3
+
+
+def synthetic_panel(n_tickers, n_days, seed=0):
+    """(ticker, date) 정렬 합성 OHLCV 패널 (일부 종목은 60거래일 미만, 일부는 거래 정지로 거래량 0)"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end='2025-12-30', periods=n_days)
+    tickers = np.array([f"{i:06d}" for i in range(1, n_tickers + 1)])
+
+    close = np.round(rng.lognormal(9, 1, n_tickers)[:, None] *
+                     np.cumprod(1 + rng.normal(0.001, 0.02, (n_tickers, n_days)), axis=1), -1)
+    spread = np.abs(rng.normal(0, 0.01, (n_tickers, n_days)))
+    volume = rng.integers(0, 2_000_000, (n_tickers, n_days))
+    volume[::97] = 0
+
+    df = pd.DataFrame({
+        'ticker': np.repeat(tickers, n_days),
+        'date': np.tile(dates, n_tickers),
+        'open': close.ravel(),
+        'high': np.round(close * (1 + spread), -1).ravel(),
+        'low': np.round(close * (1 - spread), -1).ravel(),
+        'close': close.ravel(),
+        'volume': volume.ravel(),
+    })
+    # 신규 상장 종목 흉내: 최근 40거래일만 있는 종목
+    short = set(tickers[::53])
+    df = df[~df['ticker'].isin(short) | (df['date'] >= dates[-40])]
+    return df.reset_index(drop=True), tickers
+
+
+def synthetic_flows(tickers, dates, seed=1):
+    """최근 10거래일 수급 (일부 종목은 수급 없음)"""
+    rng = np.random.default_rng(seed)
+    with_flows = tickers[rng.random(len(tickers)) < 0.8]
+    recent = dates[-10:]
+    n = len(with_flows) * len(recent)
+    return pd.DataFrame({
+        'ticker': np.repeat(with_flows, len(recent)),
+        'date': np.tile(recent, len(with_flows)),
+        'institutional_net_buy': rng.integers(-50_000, 50_000, n),
+        'foreigner_net_buy': rng.integers(-50_000, 50_000, n),
+    })
+
+
+def make_analyzer(price_data, stock_list, investor_data):
+    """DB/CSV 로딩 없이 분석기 구성"""
+    analyzer = EnhancedWaveTransitionAnalyzerV3.__new__(EnhancedWaveTransitionAnalyzerV3)
+    analyzer.price_data = price_data
+    analyzer.stock_list = stock_list
+    analyzer.investor_data = investor_data
+    return analyzer
+
+
+def timeit(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark analysis2 wave scoring')
+    parser.add_argument('--tickers', type=int, default=2790)
+    parser.add_argument('--days', type=int, default=125, help='Trading days per ticker (synthetic panel)')
+    parser.add_argument('--source', choices=['synthetic', 'store', 'db'], default='synthetic')
+    parser.add_argument('--days-back', type=int, default=180, help='Calendar days to load (store/db)')
+    parser.add_argument('--stock-list', default='korean_stocks_list.csv')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.source == 'synthetic':
+        df, tickers = synthetic_panel(args.tickers, args.days)
+        # 종목 목록에서 일부 종목 누락 → 두 경로 모두 결과에서 제외되어야 함
+        stock_list = pd.DataFrame({'ticker': tickers[::7][:-1], 'name': [f"종목{t}" for t in tickers[::7][:-1]]})
+        stock_list = pd.concat([stock_list, pd.DataFrame({'ticker': tickers[1::7], 'name': 'X'})])
+        investor = synthetic_flows(tickers, np.sort(df['date'].unique()))
+    else:
+        from price_store import load_price_panel
+        df = load_price_panel(days_back=args.days_back, columns=['open', 'high', 'low', 'close', 'volume'],
+                              source=args.source)
+        stock_list = pd.read_csv(args.stock_list)
+        stock_list['ticker'] = stock_list['ticker'].astype(str).str.zfill(6)
+        # 합성 종목(실제 목록에 없는 종목)도 비교 대상에 포함
+        extra = df.loc[~df['ticker'].isin(stock_list['ticker']), 'ticker'].unique()
+        stock_list = pd.concat([stock_list, pd.DataFrame({'ticker': extra, 'name': extra})])
+        investor = None
+
+    analyzer = make_analyzer(df, stock_list, investor)
+    print(f"📊 패널: {len(df):,}행, {df['ticker'].nunique():,}종목 ({args.source})")
+
+    t_legacy, legacy = timeit(analyzer.run_analysis_legacy, 1)
+    t_fast, fast = timeit(analyzer.run_analysis, args.repeat)
+
+    pd.testing.assert_frame_equal(legacy.reset_index(drop=True), fast.reset_index(drop=True),
+                                  check_dtype=False, check_exact=True)
+
+    print(f"\n{'method':<26} {'seconds':>9}")
+    print('-' * 36)
+    print(f"{'loop (analyze_stock)':<26} {t_legacy:>9.3f}")
+    print(f"{'run_analysis (panel)':<26} {t_fast:>9.4f}")
+    print(f"\n⚡ {t_legacy / t_fast:,.0f}x 빠름, {len(fast):,}종목 결과 완전 일치 "
+          f"(단계 분포: {fast['wave_stage'].value_counts().to_dict()})")
+
+
+if __name__ == "__main__":
+    main()
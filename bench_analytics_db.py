@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DuckDB 분석용 미러 (analytics_db.py) 벤치마크
+- 미러 갱신 시간: 전체 재생성 / 변경 없는 증분 갱신 (실제 미러 파일을 다시 만듦, 캐시라 그대로 사용 가능)
+- 같은 분석 읽기를 Postgres와 DuckDB 미러에서 실행해 시간과 결과 비교
+  · 패널: data_access.load_panel (최근 N일 전 종목 OHLCV)
+  · 선행 수익률: 종목별 20거래일 선행 수익률의 월별 평균 / 상승 비율 (윈도 함수 + 집계, 전체 기간 스캔)
+  · 수급 조인: 월별 외국인 순매수 상위 종목의 다음 거래일 수익률 (daily_prices × investor_flows)
+- 서비스 DB 부하: 각 백엔드 실행 전후 pg_stat_database의 tup_returned / blks 차이
+
+사용법:
+    python bench_analytics_db.py
+    python bench_analytics_db.py --days 365 --repeat 5
+"""
+import argparse
+import os
+import statistics
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+import analytics_db
+from data_access import load_panel, query
+from db_config import get_db_connection
+
+COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+FORWARD_RETURNS = """
+    SELECT CAST(date_trunc('month', date) AS DATE) AS month,
+           COUNT(*) AS n,
+           AVG(fwd) AS avg_fwd,
+           AVG(CASE WHEN fwd > 0 THEN 1.0 ELSE 0.0 END) AS hit_rate
+    FROM (
+        SELECT ticker, date,
+               CAST(LEAD(close, 20) OVER (PARTITION BY ticker ORDER BY date) AS DOUBLE PRECISION)
+                   / NULLIF(close, 0) - 1 AS fwd
+        FROM daily_prices
+    ) r
+    WHERE fwd IS NOT NULL
+    GROUP BY 1 ORDER BY 1
+"""
+
+FLOW_JOIN = """
+    SELECT CAST(date_trunc('month', p.date) AS DATE) AS month,
+           COUNT(*) AS n,
+           AVG(p.next_ret) AS avg_next_ret
+    FROM (
+        SELECT ticker, date,
+               CAST(LEAD(close) OVER (PARTITION BY ticker ORDER BY date) AS DOUBLE PRECISION)
+                   / NULLIF(close, 0) - 1 AS next_ret
+        FROM daily_prices
+    ) p
+    JOIN (
+        SELECT ticker, date,
+               RANK() OVER (PARTITION BY date ORDER BY foreigner_net_buy DESC) AS rnk
+        FROM investor_flows
+        WHERE foreigner_net_buy IS NOT NULL
+    ) f ON f.ticker = p.ticker AND f.date = p.date
+    WHERE f.rnk <= 20 AND p.next_ret IS NOT NULL
+    GROUP BY 1 ORDER BY 1
+"""
+
+
+def timeit(fn, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def pg_load():
+    """→ (tup_returned, blks_hit + blks_read) 현재 DB 누적값"""
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT pg_stat_clear_snapshot()")
+        cur.execute("""
+            SELECT tup_returned, blks_hit + blks_read FROM pg_stat_database WHERE datname = current_database()
+        """)
+        return cur.fetchone()
+
+
+def measured(fn, repeat):
+    """→ (중앙값 초, 결과, 실행 1회당 tup_returned, 실행 1회당 블록)"""
+    before = pg_load()
+    elapsed, result = timeit(fn, repeat)
+    time.sleep(1.1)     # 백엔드 통계는 유휴 상태에서 최대 1초 간격으로 반영됨
+    after = pg_load()
+    return elapsed, result, (after[0] - before[0]) / repeat, (after[1] - before[1]) / repeat
+
+
+def same_frame(a, b):
+    # postgres는 date 객체, duckdb는 datetime64 → 날짜로 맞춰 비교
+    assert (pd.to_datetime(a['month']).values == pd.to_datetime(b['month']).values).all()
+    assert (a['n'].astype(int).values == b['n'].astype(int).values).all()
+    for col in a.columns[2:]:
+        assert np.allclose(a[col].astype(float), b[col].astype(float)), col
+
+
+def check_panel(pg, dk):
+    assert len(pg) == len(dk)
+    assert (pg.tickers == dk.tickers).all() and (pg.codes == dk.codes).all() and (pg.dates == dk.dates).all()
+    for c in COLUMNS:
+        assert (pg[c] == dk[c]).all(), c
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the DuckDB analytics mirror against Postgres reads')
+    parser.add_argument('--days', type=int, default=180, help='Days of history for the panel load')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per read (median reported)')
+    args = parser.parse_args()
+
+    print("🦆 미러 갱신")
+    start = time.perf_counter()
+    results = analytics_db.refresh_mirror(full=True, verbose=False)
+    full_t = time.perf_counter() - start
+    start = time.perf_counter()
+    analytics_db.refresh_mirror(verbose=False)
+    incr_t = time.perf_counter() - start
+    rows = sum(r['rows'] for r in results.values())
+    size = os.path.getsize(analytics_db.DEFAULT_DB_PATH) / 1e6
+    print(f"   전체 재생성 {full_t:.2f}초 ({rows:,}행, {size:.1f}MB), 변경 없는 증분 갱신 {incr_t:.2f}초\n")
+
+    panel_start = date.today() - timedelta(days=args.days)
+    reads = {
+        f'패널 {args.days}일': lambda backend: load_panel(start=panel_start, columns=COLUMNS, backend=backend),
+        '선행 수익률': lambda backend: query(FORWARD_RETURNS, backend=backend),
+        '수급 조인': lambda backend: query(FLOW_JOIN, backend=backend),
+    }
+
+    print(f"{'읽기':<12} {'postgres(s)':>12} {'duckdb(s)':>10} {'배속':>6} {'PG 행(pg)':>12} {'PG 행(duck)':>12} "
+          f"{'PG 블록(pg)':>12} {'PG 블록(duck)':>13}")
+    for name, read in reads.items():
+        pg_t, pg_res, pg_tup, pg_blk = measured(lambda: read('postgres'), args.repeat)
+        dk_t, dk_res, dk_tup, dk_blk = measured(lambda: read('duckdb'), args.repeat)
+        if name.startswith('패널'):
+            check_panel(pg_res, dk_res)
+        else:
+            same_frame(pg_res, dk_res)
+        print(f"{name:<12} {pg_t:>12.3f} {dk_t:>10.3f} {pg_t / dk_t:>5.1f}x {pg_tup:>12,.0f} {dk_tup:>12,.0f} "
+              f"{pg_blk:>12,.0f} {dk_blk:>13,.0f}")
+
+    print("\n✅ 두 백엔드 결과 일치 (PG 행/블록: 실행 1회당 서비스 DB에서 읽은 튜플 / 버퍼 접근 수, 통계 조회 자체 포함)")
+
+
+if __name__ == "__main__":
+    main()
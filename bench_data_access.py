@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+바이너리 COPY 패널 로더 (data_access.load_panel) vs pd.read_sql 벤치마크
+- 종목 수(universe)별로 최근 N일 OHLCV 패널 적재 시간 비교
+  · read_sql: 기존 방식 (행 단위 튜플 → DataFrame)
+  · panel: load_panel (numpy 배열까지)
+  · panel→frame: load_panel().to_frame() (price_store.load_from_db 경로)
+- 값 / 정렬 / 날짜가 read_sql 결과와 같은지 확인
+- NULL 거래량: 일부 행의 거래량을 NULL로 바꾼 조회로 두 백엔드 모두 NaN이 되는지 확인
+  (센티널 NA_VOLUME이 DataFrame에 그대로 남으면 거래량 합계 / 평균이 깨짐, duckdb는 미러가 있을 때만)
+
+사용법:
+    python bench_data_access.py
+    python bench_data_access.py --days 180 --sizes 100 500 1000 0 --repeat 5
+"""
+import argparse
+import os
+import statistics
+import time
+import warnings
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+import analytics_db
+from data_access import _build_panel, _load_duckdb, _load_postgres, _select_sql, load_panel
+from db_config import get_db_connection
+
+COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# 종가가 7의 배수인 행은 거래량 NULL (두 백엔드 공통 SQL)
+NULL_VOLUME_SOURCE = """(SELECT ticker, date, open, high, low, close,
+                              CASE WHEN mod(close, 7) = 0 THEN NULL ELSE volume END AS volume
+                       FROM daily_prices) p"""
+
+# pandas는 psycopg2 연결에 대해 경고만 냄 (동작은 동일)
+warnings.filterwarnings('ignore', message='pandas only supports SQLAlchemy')
+
+
+def read_sql_panel(start, tickers):
+    with get_db_connection() as conn:
+        return pd.read_sql(f"""
+            SELECT ticker, date, {', '.join(COLUMNS)} FROM daily_prices
+            WHERE date >= %s AND ticker = ANY(%s)
+            ORDER BY ticker, date
+        """, conn, params=(start, tickers))
+
+
+def timeit(fn, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def check(panel, ref):
+    df = panel.to_frame()
+    assert len(df) == len(ref)
+    assert (df['ticker'].to_numpy() == ref['ticker'].to_numpy()).all()
+    assert (df['date'].to_numpy() == pd.to_datetime(ref['date']).to_numpy()).all()
+    for c in COLUMNS:
+        assert (df[c].to_numpy() == ref[c].to_numpy().astype(df[c].dtype)).all(), c
+
+
+def check_null_volume(start):
+    """거래량 NULL 행 → to_frame()에서 NaN (read_sql과 같은 값), 센티널이 남지 않는지"""
+    with get_db_connection() as conn:
+        ref = pd.read_sql(f"""
+            SELECT ticker, date, {', '.join(COLUMNS)} FROM {NULL_VOLUME_SOURCE}
+            WHERE date >= %s ORDER BY ticker, date
+        """, conn, params=(start,))
+
+    backends = {'postgres': _load_postgres}
+    if os.path.exists(analytics_db.DEFAULT_DB_PATH):
+        backends['duckdb'] = _load_duckdb
+    for backend, load in backends.items():
+        sql, params = _select_sql(COLUMNS, start, None, None, backend)
+        sql = sql.replace(' FROM daily_prices', f' FROM {NULL_VOLUME_SOURCE}')
+        df = _build_panel(*load(sql, params, COLUMNS), COLUMNS, 'int32').to_frame()
+        assert len(df) == len(ref)
+        assert df['volume'].isna().sum() == ref['volume'].isna().sum() > 0, backend
+        assert df['volume'].min() >= 0, backend
+        assert np.allclose(df['volume'].to_numpy(), ref['volume'].to_numpy(dtype=float), equal_nan=True), backend
+        print(f"✅ NULL 거래량 {df['volume'].isna().sum():,}행 → NaN ({backend}, dtype {df['volume'].dtype})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the binary COPY panel loader against read_sql')
+    parser.add_argument('--days', type=int, default=180, help='Days of history per ticker')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500, 1000, 0],
+                        help='Universe sizes (0 = every ticker)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per loader (median reported)')
+    args = parser.parse_args()
+
+    start = date.today() - timedelta(days=args.days)
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT DISTINCT ticker FROM daily_prices WHERE date >= %s ORDER BY 1", (start,))
+        universe = [r[0] for r in cur.fetchall()]
+
+    print(f"📊 최근 {args.days}일 ({start} ~), 전체 {len(universe):,}종목\n")
+    print(f"{'종목':>6} {'행':>9} {'read_sql(s)':>12} {'panel(s)':>9} {'panel→frame(s)':>15} {'배속':>6} {'panel MB':>9}")
+    for size in args.sizes:
+        tickers = universe if size == 0 else universe[:size]
+        t_sql, ref = timeit(lambda: read_sql_panel(start, tickers), args.repeat)
+        t_panel, panel = timeit(lambda: load_panel(start=start, columns=COLUMNS, tickers=tickers), args.repeat)
+        t_frame, _ = timeit(lambda: load_panel(start=start, columns=COLUMNS, tickers=tickers).to_frame(),
+                            args.repeat)
+        check(panel, ref)
+        nbytes = sum(a.nbytes for a in panel.values.values()) + panel.codes.nbytes + panel.dates.nbytes
+        print(f"{len(tickers):>6,} {len(panel):>9,} {t_sql:>12.3f} {t_panel:>9.3f} {t_frame:>15.3f} "
+              f"{t_sql / t_panel:>5.1f}x {nbytes / 1e6:>9.1f}")
+
+    print("\n✅ 모든 크기에서 read_sql 결과와 일치")
+    check_null_volume(start)
+    print(f"   dtype: 가격 {panel['close'].dtype}, 거래량 {panel['volume'].dtype}, 날짜 {panel.dates.dtype}, "
+          f"종목 코드 {panel.codes.dtype} (조회 테이블 {len(panel.tickers):,}개)")
+    assert np.all(np.diff(panel.offsets) > 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+수집 + DB 저장 파이프라인 벤치마크 (로컬 대역 서버 + 로컬 PostgreSQL)
+- 종목 번갈아 실행: 종목 하나 수집 → INSERT → 다음 종목 (예전 방식)
+- 전체 수집 후 저장: 비동기 수집이 모두 끝난 뒤 bulk_loader로 한 번에 저장 (--no-stream)
+- 병행: 끝난 종목부터 db_async 배치 writer로 저장하면서 다음 종목 수집 (update_daily_prices 기본)
+- 대상은 daily_prices 구조를 복사한 daily_prices_bench 테이블 (벤치마크 후 삭제)
+
+사용법:
+    python bench_db_async.py
+    python bench_db_async.py --tickers 500 --pages 20 --latency 0.02 --concurrency 16
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+from psycopg2.extras import execute_values
+
+from bench_fetch_engine import wait_for_server
+from bulk_loader import PRICE_COLUMNS, DailyPriceLoader, prepare_price_frame
+from db_config import get_db_connection
+from naver_fetcher import fetch_daily_prices
+from update_daily_prices import stream_new_rows
+
+BENCH_TABLE = 'daily_prices_bench'
+
+
+class BenchPriceLoader(DailyPriceLoader):
+    table = BENCH_TABLE
+    staging_table = 'daily_prices_bench_staging'
+
+
+def reset_table():
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        cur.execute(f"CREATE TABLE {BENCH_TABLE} (LIKE daily_prices INCLUDING ALL)")
+
+
+def table_rows():
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"SELECT COUNT(*) FROM {BENCH_TABLE}")
+        return cur.fetchone()[0]
+
+
+def run_alternating(jobs, engine_kwargs):
+    """종목마다 수집이 끝나야 저장, 저장이 끝나야 다음 종목 수집"""
+    for job in jobs:
+        frames = {}
+        fetch_daily_prices([job], lambda t, df: frames.update({t: df}) if df is not None else None,
+                           **engine_kwargs)
+        for df in frames.values():
+            df = prepare_price_frame(df).astype(object)
+            df = df.where(df.notna(), None)
+            with get_db_connection() as conn:
+                execute_values(conn.cursor(), f"""
+                    INSERT INTO {BENCH_TABLE} ({', '.join(PRICE_COLUMNS)})
+                    VALUES %s
+                    ON CONFLICT (ticker, date) DO NOTHING
+                """, list(df.itertuples(index=False, name=None)))
+
+
+def run_fetch_then_save(jobs, engine_kwargs):
+    frames = {}
+    fetch_daily_prices(jobs, lambda t, df: frames.update({t: df}) if df is not None else None,
+                       **engine_kwargs)
+    with BenchPriceLoader(verbose=False) as loader:
+        for df in frames.values():
+            loader.write(df)
+
+
+def run_streamed(jobs, engine_kwargs, batch_rows):
+    _, _, write_stats = stream_new_rows(jobs, {}, loader=BenchPriceLoader, batch_rows=batch_rows,
+                                        **engine_kwargs)
+    return write_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fetch + DB write pipelining')
+    parser.add_argument('--tickers', type=int, default=300)
+    parser.add_argument('--pages', type=int, default=20, help='Pages per ticker (10 rows each)')
+    parser.add_argument('--latency', type=float, default=0.02, help='Stub server response delay (s)')
+    parser.add_argument('--port', type=int, default=8771)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--batch-rows', type=int, default=5000)
+    parser.add_argument('--skip-alternating', action='store_true')
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen([sys.executable, 'naver_stub_server.py', '--port', str(args.port),
+                               '--latency', str(args.latency), '--days', str(args.pages * 10)])
+    try:
+        if not wait_for_server(base_url):
+            print("❌ 대역 서버 기동 실패")
+            return
+
+        jobs = [(f"{i:06d}", args.pages) for i in range(1, args.tickers + 1)]
+        engine_kwargs = {'base_url': base_url, 'max_per_host': args.concurrency, 'parse_workers': 0}
+        print(f"📊 {args.tickers}종목 × {args.pages}페이지 (응답 지연 {args.latency * 1000:.0f}ms, "
+              f"동시 {args.concurrency})\n")
+
+        modes = [('fetch all → save', lambda: run_fetch_then_save(jobs, engine_kwargs)),
+                 ('streamed (db_async)', lambda: run_streamed(jobs, engine_kwargs, args.batch_rows))]
+        if not args.skip_alternating:
+            modes.insert(0, ('alternating per ticker', lambda: run_alternating(jobs, engine_kwargs)))
+
+        print(f"{'mode':<24} {'seconds':>8} {'rows':>9} {'rows/s':>9}")
+        print('-' * 54)
+        results = {}
+        for label, func in modes:
+            reset_table()
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            rows = table_rows()
+            results[label] = (elapsed, rows)
+            print(f"{label:<24} {elapsed:>8.2f} {rows:>9,} {rows / elapsed:>9,.0f}")
+
+        counts = {rows for _, rows in results.values()}
+        assert len(counts) == 1, f"저장 행 수 불일치: {results}"
+        base = results['fetch all → save'][0]
+        print(f"\n⚡ 병행 저장: 전체 수집 후 저장 대비 {base / results['streamed (db_async)'][0]:.2f}x")
+    finally:
+        server.terminate()
+        server.wait()
+        with get_db_connection() as conn:
+            conn.cursor().execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+db_config 연결 풀 동시성 벤치마크
+- 스레드 N개가 작은 풀(maxconn)을 함께 사용: 오류 없이 전부 처리되는지, 대기 시간 / 최대 동시 사용 수 확인
+- 풀 안의 연결을 서버에서 강제로 끊은 뒤 다음 checkout이 새 연결로 복구되는지 확인
+- autocommit 전용 연결로 VACUUM 실행
+
+사용법:
+    python bench_db_pool.py
+    python bench_db_pool.py --threads 32 --maxconn 4 --queries 200
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from db_config import DatabaseConfig, db_config, get_db_connection, stats, vacuum_analyze
+
+
+def worker(config, queries):
+    for _ in range(queries):
+        with config.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT COUNT(*) FROM daily_prices WHERE ticker = %s", ('005930',))
+                cur.fetchone()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the db_config connection pool under threads')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--maxconn', type=int, default=4)
+    parser.add_argument('--queries', type=int, default=100, help='Queries per thread')
+    args = parser.parse_args()
+
+    # 1) 동시 사용
+    config = DatabaseConfig()
+    config.init_pool(minconn=1, maxconn=args.maxconn)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        for future in [pool.submit(worker, config, args.queries) for _ in range(args.threads)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+    s = config.stats.snapshot()
+    total = args.threads * args.queries
+    assert s['queries'] == total and s['errors'] == 0 and s['in_use'] == 0
+    assert s['peak_in_use'] <= args.maxconn and s['opened'] <= args.maxconn
+    print(f"🧵 스레드 {args.threads}개 × {args.queries}쿼리, maxconn={args.maxconn}: "
+          f"{total:,}쿼리 {elapsed:.2f}초 ({total / elapsed:,.0f} q/s)")
+    print(f"   대기 평균 {s['wait_avg_ms']:.2f}ms / 최대 {s['wait_max_ms']:.1f}ms, "
+          f"최대 동시 사용 {s['peak_in_use']}, 연결 {s['opened']}개, 오류 {s['errors']}")
+    config.close_pool()
+
+    # 2) 끊긴 연결 복구
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT pg_backend_pid()")
+        pid = cur.fetchone()[0]
+    db_config.connection_pool.validate_after = 0
+    with db_config.maintenance_connection() as admin:
+        with admin.cursor() as cur:
+            cur.execute("SELECT pg_terminate_backend(%s)", (pid,))
+    threading.Event().wait(0.2)
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT pg_backend_pid()")
+        new_pid = cur.fetchone()[0]
+    assert new_pid != pid and stats()['discarded'] == 1
+    print(f"🔌 끊긴 연결 (pid {pid}) → checkout 때 버리고 새 연결 (pid {new_pid})로 복구")
+
+    # 3) VACUUM (autocommit 전용 연결)
+    start = time.perf_counter()
+    vacuum_analyze('stock_pool')
+    print(f"🔧 VACUUM ANALYZE stock_pool ({time.perf_counter() - start:.2f}초)")
+    print(f"\n📊 전역 풀 지표: {stats()}")
+
+
+if __name__ == "__main__":
+    main()
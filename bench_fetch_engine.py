@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+수집 엔진 처리량 벤치마크 (오프라인)
+- naver_stub_server.py를 별도 프로세스로 띄우고 (응답 지연으로 네트워크 대기 재현)
+- 기존 방식(multiprocessing.Pool + 종목별 requests.Session 순차 페이지) vs 비동기 엔진 비교
+- 2,790종목 × 40페이지 전체 백필 소요 시간 추정치 출력
+
+사용법:
+    python bench_fetch_engine.py --tickers 100 --pages 40 --latency 0.05
+"""
+import argparse
+import multiprocessing
+import subprocess
+import sys
+import time
+from functools import partial
+
+import requests
+
+from create_complete_daily_prices import get_daily_price
+from naver_fetcher import fetch_daily_prices
+
+FULL_TICKERS = 2790
+FULL_PAGES = 40
+
+
+def wait_for_server(base_url, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(f"{base_url}/item/sise_day.nhn?code=005930&page=1", timeout=1)
+            return True
+        except requests.RequestException:
+            time.sleep(0.1)
+    return False
+
+
+def bench_legacy(tickers, pages, base_url):
+    """기존 방식: cpu_count-1 프로세스, 종목당 페이지 순차 요청"""
+    workers = max(1, multiprocessing.cpu_count() - 1)
+    tasks = [(t, pages) for t in tickers]
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        results = list(pool.imap_unordered(partial(get_daily_price, base_url=base_url), tasks))
+    elapsed = time.perf_counter() - start
+    rows = sum(len(df) for df in results if df is not None)
+    return elapsed, rows
+
+
+def bench_async(tickers, pages, base_url, concurrency, parse_workers):
+    rows = [0]
+
+    def on_result(ticker, df):
+        if df is not None:
+            rows[0] += len(df)
+
+    stats = fetch_daily_prices([(t, pages) for t in tickers], on_result, base_url=base_url,
+                               max_per_host=concurrency, parse_workers=parse_workers)
+    return stats['elapsed'], rows[0], stats
+
+
+def report(label, elapsed, total_pages):
+    rate = total_pages / elapsed
+    full = FULL_TICKERS * FULL_PAGES / rate
+    print(f"{label:<28} {elapsed:8.2f}s  {rate:8.1f} pages/s  "
+          f"→ 전체 백필 추정 {full/60:6.1f}분")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fetch engine against local stub server')
+    parser.add_argument('--tickers', type=int, default=100)
+    parser.add_argument('--pages', type=int, default=FULL_PAGES)
+    parser.add_argument('--latency', type=float, default=0.05, help='Stub server response delay (s)')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 16, 32])
+    parser.add_argument('--parse-workers', type=int, default=None)
+    parser.add_argument('--skip-legacy', action='store_true')
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen([sys.executable, 'naver_stub_server.py', '--port', str(args.port),
+                               '--latency', str(args.latency),
+                               '--days', str(args.pages * 10)])
+    try:
+        if not wait_for_server(base_url):
+            print("❌ 대역 서버 기동 실패")
+            return
+
+        tickers = [f"{i:06d}" for i in range(1, args.tickers + 1)]
+        total_pages = args.tickers * args.pages
+        print(f"\n{'='*72}")
+        print(f"📊 {args.tickers}종목 × {args.pages}페이지 = {total_pages:,}요청 "
+              f"(응답 지연 {args.latency*1000:.0f}ms)")
+        print(f"{'='*72}")
+
+        legacy_rate = None
+        if not args.skip_legacy:
+            elapsed, rows = bench_legacy(tickers, args.pages, base_url)
+            legacy_rate = report("legacy Pool", elapsed, total_pages)
+
+        for c in args.concurrency:
+            elapsed, rows, stats = bench_async(tickers, args.pages, base_url, c, args.parse_workers)
+            rate = report(f"async (per-host={c})", elapsed, total_pages)
+            if legacy_rate:
+                print(f"{'':<28} ×{rate / legacy_rate:.1f} vs legacy | rows={rows:,} "
+                      f"errors={stats['errors']}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
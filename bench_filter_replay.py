@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+quick_filter 과거 재현 벤치마크: 날짜별 루프(score_universe + rank_scores) vs filter_replay (한 번에 계산)
+- 기본은 합성 패널 (2,790종목 × 260거래일, DB 불필요)
+- --source store/db면 실제 daily_prices 패널 사용
+- 날짜마다 [d - 60일, d] 구간을 잘라 quick_filter를 그대로 돌린 결과와 선정 종목/점수가 같은지 확인한 뒤 시간 비교
+- --nan-volume: 거래량 일부를 NaN(NULL 거래량)으로 바꾼 패널로 비교
+
+사용법:
+    python bench_filter_replay.py
+    python bench_filter_replay.py --tickers 2790 --days 260 --eval-days 200
+    python bench_filter_replay.py --source store --days-back 400
+    python bench_filter_replay.py --days 200 --eval-days 200 --nan-volume
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from bench_quick_filter import synthetic_panel, with_nan_volume
+from filter_replay import LOOKBACK_DAYS, compute_features, select_daily
+from quick_filter import rank_scores, score_universe
+
+
+def legacy_replay(df, dates, top_n):
+    """날짜마다 quick_filter 실행 (그날 거래가 있는 종목만, filter_replay와 같은 후보 정의)"""
+    picks = {}
+    for d in dates:
+        window = df[(df['date'] >= d - pd.Timedelta(days=LOOKBACK_DAYS)) & (df['date'] <= d)]
+        traded = window.loc[window['date'] == d, 'ticker']
+        window = window[window['ticker'].isin(traded)]
+        ranked = rank_scores(score_universe(window))
+        picks[d] = ranked.head(top_n)[['ticker', 'final_score']]
+    return picks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the quick_filter historical replay')
+    parser.add_argument('--tickers', type=int, default=2790)
+    parser.add_argument('--days', type=int, default=260, help='Trading days per ticker (synthetic panel)')
+    parser.add_argument('--source', choices=['synthetic', 'store', 'db'], default='synthetic')
+    parser.add_argument('--days-back', type=int, default=400, help='Calendar days to load (store/db)')
+    parser.add_argument('--eval-days', type=int, default=200, help='Most recent trading days to replay')
+    parser.add_argument('--top', type=int, default=500)
+    parser.add_argument('--nan-volume', action='store_true', help='Set a sample of volumes to NaN (NULL volume)')
+    args = parser.parse_args()
+
+    if args.source == 'synthetic':
+        df = synthetic_panel(args.tickers, args.days)
+    else:
+        from price_store import load_price_panel
+        df = load_price_panel(days_back=args.days_back, columns=['close', 'volume'], source=args.source)
+    df['date'] = pd.to_datetime(df['date'])
+    if args.nan_volume:
+        df = with_nan_volume(df)
+
+    dates = np.sort(df['date'].unique())[-args.eval_days:]
+    print(f"📊 패널: {len(df):,}행, {df['ticker'].nunique():,}종목, 재현 {len(dates)}거래일 ({args.source})")
+
+    start = time.perf_counter()
+    features = compute_features(df)
+    picks = select_daily(features, top_n=args.top)
+    t_fast = time.perf_counter() - start
+
+    start = time.perf_counter()
+    legacy = legacy_replay(df, pd.to_datetime(dates), args.top)
+    t_legacy = time.perf_counter() - start
+
+    # 동점 순서는 정렬 알고리즘에 따라 다를 수 있으므로 종목 집합 + 종목별 점수로 비교
+    by_date = dict(tuple(picks.groupby('date')))
+    for d, expected in legacy.items():
+        got = by_date.get(d, picks.iloc[0:0])
+        expected = expected.set_index('ticker')['final_score'].sort_index()
+        got = got.set_index('ticker')['final_score'].sort_index()
+        assert list(expected.index) == list(got.index), f"{d.date()}: 선정 종목 불일치"
+        np.testing.assert_allclose(got.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-9)
+
+    print(f"\n{'method':<32} {'seconds':>9}")
+    print('-' * 42)
+    print(f"{'per-date loop (quick_filter)':<32} {t_legacy:>9.2f}")
+    print(f"{'filter_replay (whole panel)':<32} {t_fast:>9.3f}")
+    print(f"\n⚡ {t_legacy / t_fast:,.0f}x 빠름, {len(legacy)}거래일 선정 결과 일치 "
+          f"(전체 {picks['date'].nunique()}거래일 {len(picks):,}건)")
+
+
+if __name__ == "__main__":
+    main()
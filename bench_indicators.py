@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+indicators 증분 지표 검증 + 벤치마크
+- 패리티: 기존 계산 (pandas rolling/ewm, analysis2._calculate_rsi, Wilder 정의) 과 warm() 결과 비교
+- populate_monitoring_history.calculate_rsi 는 시작 구간 처리만 다르므로 수렴 이후 구간에서 비교
+- 증분: 마지막 하루를 빼고 warm → save/load → update(마지막 하루) 결과가 전체 warm과 같은지 확인
+- NULL 거래량: 거래량 일부를 NaN으로 바꿔 vol_ma20이 pandas rolling과 같은 날 NaN에서 돌아오는지 확인
+- 시간: 하루 추가 시 전체 재계산 (grouped rolling) vs 상태 update()
+
+사용법:
+    python bench_indicators.py
+    python bench_indicators.py --tickers 2790 --days 300
+    python bench_indicators.py --source store --days-back 400
+"""
+import argparse
+import copy
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis2 import EnhancedWaveTransitionAnalyzerV3
+from bench_analysis2 import synthetic_panel
+from indicators import DEFAULT_INDICATORS, IndicatorState
+from populate_monitoring_history import calculate_rsi as legacy_wilder_rsi
+
+SPEC = dict(DEFAULT_INDICATORS, rsi14_sma=('rsi_sma', 'close', 14))
+
+
+def wilder_reference(close, period=14):
+    """Wilder RSI 정의대로 한 종목 계산"""
+    out = np.full(len(close), np.nan)
+    delta = np.diff(close)
+    if len(delta) < period:
+        return out
+    gain, loss = np.maximum(delta, 0), np.maximum(-delta, 0)
+    ag, al = gain[:period].mean(), loss[:period].mean()
+    for i in range(period, len(close)):
+        if i > period:
+            ag = (ag * (period - 1) + gain[i - 1]) / period
+            al = (al * (period - 1) + loss[i - 1]) / period
+        out[i] = 50.0 if ag == 0 and al == 0 else (100.0 if al == 0 else 100 - 100 / (1 + ag / al))
+    return out
+
+
+def full_recompute(df):
+    """기존 방식: 전체 구간 grouped rolling 재계산"""
+    g = df.groupby('ticker', sort=True)
+    out = pd.DataFrame({'ticker': df['ticker'], 'date': df['date']})
+    for name, (kind, source, window, *rest) in SPEC.items():
+        if kind == 'sma':
+            out[name] = g[source].rolling(window).mean().reset_index(level=0, drop=True)
+        elif kind in ('max', 'min'):
+            r = g[source].rolling(window, min_periods=rest[0] if rest else None)
+            out[name] = getattr(r, kind)().reset_index(level=0, drop=True)
+        elif kind == 'ema':
+            out[name] = g[source].transform(lambda s: s.ewm(span=window, adjust=False, min_periods=window).mean())
+    out['rsi14_sma'] = g['close'].transform(lambda s: EnhancedWaveTransitionAnalyzerV3._calculate_rsi(None, s))
+    out['rsi14'] = g['close'].transform(lambda s: pd.Series(wilder_reference(s.to_numpy()), index=s.index))
+    return out
+
+
+def timeit(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check and benchmark incremental indicators')
+    parser.add_argument('--tickers', type=int, default=2790)
+    parser.add_argument('--days', type=int, default=300, help='Trading days per ticker (synthetic panel)')
+    parser.add_argument('--source', choices=['synthetic', 'store', 'db'], default='synthetic')
+    parser.add_argument('--days-back', type=int, default=400, help='Calendar days to load (store/db)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.source == 'synthetic':
+        df, _ = synthetic_panel(args.tickers, args.days)
+    else:
+        from price_store import load_price_panel
+        df = load_price_panel(days_back=args.days_back, source=args.source)
+    df = df.sort_values(['ticker', 'date']).reset_index(drop=True)
+    print(f"📊 패널: {len(df):,}행, {df['ticker'].nunique():,}종목 ({args.source})")
+
+    # 1. 패리티: warm(keep_history) vs 기존 계산
+    t_warm, history = timeit(lambda: IndicatorState(SPEC).warm(df, keep_history=True), 1)
+    history = history.sort_values(['ticker', 'date']).reset_index(drop=True)
+    reference = full_recompute(df)
+    for name in SPEC:
+        a, b = history[name].to_numpy(), reference[name].to_numpy()
+        assert np.array_equal(np.isnan(a), np.isnan(b)), f"{name}: NaN 위치 불일치"
+        assert np.allclose(a, b, rtol=1e-9, atol=1e-9, equal_nan=True), \
+            f"{name}: 최대 오차 {np.nanmax(np.abs(a - b))}"
+    print(f"✅ 패리티: {', '.join(SPEC)} (rtol 1e-9)")
+
+    # NULL 거래량: NaN이 20일 창을 벗어나는 날 vol_ma20도 바로 값으로 돌아와야 함
+    nan_df = df.copy()
+    nan_df['volume'] = nan_df['volume'].astype(float)
+    nan_df.loc[nan_df.index[::37], 'volume'] = np.nan
+    nan_spec = {'vol_ma20': DEFAULT_INDICATORS['vol_ma20']}
+    ours = IndicatorState(nan_spec).warm(nan_df, keep_history=True).sort_values(['ticker', 'date'])['vol_ma20']
+    ref = nan_df.groupby('ticker', sort=True)['volume'].rolling(20).mean().reset_index(level=0, drop=True)
+    a, b = ours.to_numpy(), ref.to_numpy()
+    assert np.array_equal(np.isnan(a), np.isnan(b)), "vol_ma20: NULL 거래량 뒤 NaN 구간 불일치"
+    assert np.allclose(a, b, rtol=1e-9, atol=1e-9, equal_nan=True)
+    print(f"✅ NULL 거래량 {nan_df['volume'].isna().sum():,}행: vol_ma20 NaN 구간 = pandas rolling")
+
+    # populate_monitoring_history.calculate_rsi: 시작 구간 처리 차이는 (13/14)^k로 줄어듦 → 100거래일 이후 비교
+    diffs = []
+    for ticker, s in df.groupby('ticker')['close']:
+        if len(s) > 120:
+            legacy = legacy_wilder_rsi(s.to_numpy())
+            ours = history.loc[history['ticker'] == ticker, 'rsi14'].to_numpy()
+            # 하락이 없는 구간: 기존 함수는 rs=0 → RSI 0, 여기서는 100 (50: 변화 없음) → 비교 제외
+            keep = ~np.isin(ours[100:], [50.0, 100.0])
+            diffs.append(np.nanmax(np.abs(legacy[100:] - ours[100:])[keep], initial=0))
+        if len(diffs) >= 200:
+            break
+    if diffs:
+        print(f"✅ populate_monitoring_history.calculate_rsi 대비 (100거래일 이후) 최대 차이 {max(diffs):.2e}")
+
+    # 2. 증분: 마지막 거래일 제외 warm → save/load → update == 전체 warm
+    last_day = df['date'].max()
+    state = IndicatorState(SPEC)
+    state.warm(df[df['date'] < last_day])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'state.npz')
+        state.save(path)
+        size = os.path.getsize(path)
+        t_load, state = timeit(lambda: IndicatorState.load(path), 1)
+
+    day = df[df['date'] == last_day]
+    incremental = state.update(day).sort_values('ticker').reset_index(drop=True)
+    expected = history[history['date'] == last_day].sort_values('ticker').reset_index(drop=True)
+    pd.testing.assert_frame_equal(incremental, expected, check_exact=True)
+    assert len(state.update(day)) == 0, "같은 날을 다시 넣으면 건너뛰어야 함"
+    print(f"✅ 증분 update == 전체 warm ({len(incremental):,}종목, 상태 파일 {size/1024/1024:.1f}MB)")
+
+    # 3. 하루 추가 비용
+    t_full, _ = timeit(lambda: full_recompute(df), 1)
+
+    base = IndicatorState(SPEC)
+    base.warm(df[df['date'] < last_day])
+    copies = [copy.deepcopy(base) for _ in range(args.repeat)]
+    update_day = lambda: copies.pop().update(day)
+
+    t_update, _ = timeit(update_day, args.repeat)
+
+    print(f"\n{'method':<34} {'seconds':>9}")
+    print('-' * 44)
+    print(f"{'full recompute (rolling/ewm/loop)':<34} {t_full:>9.3f}")
+    print(f"{'warm (replay all days)':<34} {t_warm:>9.3f}")
+    print(f"{'load state':<34} {t_load:>9.4f}")
+    print(f"{'update one day':<34} {t_update:>9.4f}")
+    print(f"\n⚡ 하루 추가: 전체 재계산 대비 {t_full / (t_update + t_load):,.0f}x 빠름 (상태 로드 포함)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+panel_executor 공유 메모리 병렬 실행 벤치마크
+- 기본은 합성 다년 패널 (2,790종목 × 750거래일 ≈ 3년, DB 불필요)
+- analysis2.indicator_panel / quick_filter.score_universe / populate_monitoring_history.monitoring_rows를
+  workers 1, 2, 4, 8로 실행해 결과가 workers=1과 완전히 같은지 확인하고 시간 비교
+- 워커로 넘기는 데이터 크기: 패널 pickle vs 공유 메모리 spec
+
+사용법:
+    python bench_panel_executor.py
+    python bench_panel_executor.py --days 1000 --workers 1 2 4 8
+    python bench_panel_executor.py --task analysis2
+"""
+import argparse
+import os
+import pickle
+import time
+
+import pandas as pd
+
+from analysis2 import indicator_panel
+from bench_analysis2 import synthetic_panel
+from panel_executor import SharedPanel, run_sharded
+from populate_monitoring_history import monitoring_rows
+from quick_filter import score_universe
+
+TASKS = {
+    'analysis2': (indicator_panel, ['high', 'low', 'close', 'volume']),
+    'quick_filter': (score_universe, ['close', 'volume']),
+    'monitoring': (monitoring_rows, ['open', 'high', 'low', 'close', 'volume']),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the shared-memory panel executor')
+    parser.add_argument('--tickers', type=int, default=2790)
+    parser.add_argument('--days', type=int, default=750, help='Trading days per ticker (synthetic panel)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--task', choices=list(TASKS), nargs='+', default=list(TASKS))
+    args = parser.parse_args()
+
+    df, _ = synthetic_panel(args.tickers, args.days)
+    print(f"📊 패널: {len(df):,}행, {df['ticker'].nunique():,}종목 | CPU {os.cpu_count()}개")
+
+    start = time.perf_counter()
+    with SharedPanel.create(df) as panel:
+        setup = time.perf_counter() - start
+        print(f"   공유 메모리 적재 {setup:.3f}초 | 워커 전달: 패널 pickle "
+              f"{len(pickle.dumps(df)) / 1024 / 1024:.1f}MB → spec {len(pickle.dumps(panel.spec)) / 1024:.1f}KB")
+
+    for name in args.task:
+        func, columns = TASKS[name]
+        print(f"\n[{name}]")
+        print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+        base_time = base = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            result = run_sharded(df, func, workers=workers, columns=columns)
+            elapsed = time.perf_counter() - start
+            if base is None:
+                base_time, base = elapsed, result
+            else:
+                pd.testing.assert_frame_equal(base, result, check_exact=True)
+            print(f"{workers:>8} {elapsed:>9.3f} {base_time / elapsed:>7.2f}x")
+        print(f"✅ 모든 workers 결과 일치 ({len(base):,}행)")
+
+    if os.cpu_count() < max(args.workers):
+        print(f"\n💡 CPU {os.cpu_count()}개 환경: CPU 수를 넘는 workers는 병렬 이득 없이 분할 오버헤드만 측정됨")
+
+
+if __name__ == "__main__":
+    main()
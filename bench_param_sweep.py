@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+param_sweep 검증 + 벤치마크
+- rank_matrix 상위 N이 filter_replay.select_daily 선정 결과와 같은지 확인
+- simulate 결과가 거래 하나씩 evaluate_stock 순서대로 따라가는 루프와 같은지 확인
+- 설정 수 / 워커 수별 처리 속도 (캐시 없이)
+
+사용법:
+    python bench_param_sweep.py
+    python bench_param_sweep.py --source store --configs 500 --workers 1 2 4
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from bench_quick_filter import synthetic_panel
+from filter_replay import compute_features, select_daily
+from param_sweep import (BASE_PARAMS, DEFAULT_GRID, build_context, random_configs, rank_matrix,
+                         run_sweep, simulate)
+
+
+def reference_returns(ctx, score, rank, params):
+    """진입 종목마다 보유일을 하나씩 늘리며 evaluate_stock 규칙 확인 → 청산 수익률 목록"""
+    returns, holds = [], []
+    for i in range(ctx['last_entry'] + 1):
+        for j in np.flatnonzero(rank[i] <= params['top_n']):
+            entry_price, initial = ctx['close'][i, j], score[i, j]
+            for k in range(1, params['max_hold'] + 1):
+                r = i + k
+                reasons = []
+                if k >= params['max_hold']:
+                    reasons.append('max_hold')
+                if k >= params['min_hold']:
+                    current = score[r, j]
+                    if not np.isnan(current) and (current - initial) / initial * 100 < -params['score_drop']:
+                        reasons.append('score')
+                    if ctx['rsi'][r, j] > params['rsi_max'] and ctx['close'][r, j] < ctx['ma5'][r, j]:
+                        reasons.append('rsi')
+                    if ctx['vol_ratio_3_60'][r, j] < params['vol_drop']:
+                        reasons.append('volume')
+                    if rank[r, j] > params['keep_rank']:
+                        reasons.append('rank')
+                if reasons:
+                    break
+            returns.append((ctx['close_ff'][r, j] / entry_price - 1) * 100)
+            holds.append(k)
+    return np.array(returns), np.array(holds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate and benchmark param_sweep')
+    parser.add_argument('--tickers', type=int, default=2790)
+    parser.add_argument('--days', type=int, default=260, help='Trading days per ticker (synthetic panel)')
+    parser.add_argument('--source', choices=['synthetic', 'store', 'db'], default='synthetic')
+    parser.add_argument('--days-back', type=int, default=400, help='Calendar days to load (store/db)')
+    parser.add_argument('--configs', type=int, default=500)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2])
+    args = parser.parse_args()
+
+    if args.source == 'synthetic':
+        df = synthetic_panel(args.tickers, args.days)
+    else:
+        from price_store import load_price_panel
+        df = load_price_panel(days_back=args.days_back, columns=['close', 'volume'], source=args.source)
+
+    start = time.perf_counter()
+    ctx = build_context(df, max_hold=max(DEFAULT_GRID['max_hold']))
+    print(f"📊 패널 {len(df):,}행 → {len(ctx['dates'])}거래일 × {len(ctx['tickers']):,}종목 행렬 "
+          f"({time.perf_counter() - start:.1f}초, {args.source})")
+
+    # 1) 순위 행렬 vs filter_replay
+    params = dict(BASE_PARAMS)
+    score, rank = rank_matrix(ctx, params)
+    picks = select_daily(compute_features(df), params, top_n=params['keep_rank'])
+    di, ti = np.nonzero(rank <= params['keep_rank'])
+    got = pd.DataFrame({'date': ctx['dates'][di], 'ticker': ctx['tickers'][ti], 'final_score': score[di, ti]})
+    got = got.sort_values(['date', 'ticker']).reset_index(drop=True)
+    expected = picks[['date', 'ticker', 'final_score']].sort_values(['date', 'ticker']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False, rtol=1e-12)
+    print(f"✅ 순위 행렬 상위 {params['keep_rank']} = filter_replay 선정 ({len(got):,}건)")
+
+    # 2) 벡터 시뮬레이션 vs 거래별 루프
+    for params in random_configs(DEFAULT_GRID, 3, seed=7) + [dict(BASE_PARAMS)]:
+        score, rank = rank_matrix(ctx, params)
+        fast = simulate(ctx, score, rank, params)
+        returns, holds = reference_returns(ctx, score, rank, params)
+        assert fast['trades'] == len(returns)
+        np.testing.assert_allclose([fast['avg_return'], fast['avg_hold'], fast['win_rate']],
+                                   [returns.mean(), holds.mean(), (returns > 0).mean() * 100], rtol=1e-12)
+    print("✅ 청산 시뮬레이션 = 거래별 루프 (4개 설정)")
+
+    # 3) 처리 속도
+    configs = random_configs(DEFAULT_GRID, args.configs, seed=0)
+    print(f"\n{'workers':>7} {'configs':>8} {'seconds':>9} {'configs/s':>10}")
+    print('-' * 38)
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        results = run_sweep(ctx, [dict(p) for p in configs], workers, cache_path=None, verbose=False)
+        elapsed = time.perf_counter() - start
+        print(f"{workers:>7} {len(results):>8,} {elapsed:>9.2f} {len(results) / elapsed:>10.1f}")
+        if baseline is None:
+            baseline = results
+        else:
+            pd.testing.assert_frame_equal(results, baseline)
+    print("\n✅ 워커 수와 관계없이 결과 동일")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+파서 벤치마크: pd.read_html(+BeautifulSoup) vs naver_parser (lxml XPath)
+- test/fixtures/naver/*.html (EUC-KR로 저장된 sise_day / frgn 페이지) 사용
+- 값 일치 여부를 먼저 확인한 뒤 페이지당 파싱 시간 비교
+
+사용법:
+    python bench_parser.py                 # 저장된 fixture로 측정
+    python bench_parser.py --regenerate    # naver_stub_server 렌더러로 fixture 재생성
+"""
+import argparse
+import glob
+import os
+import time
+from datetime import date
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from naver_parser import parse_sise_day, parse_frgn
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test', 'fixtures', 'naver')
+
+
+def legacy_sise_day(html):
+    """기존 create_complete_daily_prices / update_daily_prices 방식"""
+    tables = pd.read_html(StringIO(html))
+    df = tables[0].dropna()
+    return df.rename(columns={
+        '날짜': 'date', '종가': 'close', '전일비': 'diff',
+        '시가': 'open', '고가': 'high', '저가': 'low', '거래량': 'volume'
+    })
+
+
+def legacy_frgn(html):
+    """기존 all_institutional_trend_data_fast 방식 (BeautifulSoup + str(tbl) 탐색 + read_html)"""
+    soup = BeautifulSoup(html, "lxml")
+    target_table = None
+    for tbl in soup.select("table"):
+        if "기관" in str(tbl) and "외국인" in str(tbl):
+            target_table = tbl
+            break
+    df = pd.read_html(StringIO(str(target_table)))[0].dropna()
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = [c[1] if c[1] else c[0] for c in df.columns]
+    df = df.iloc[:, [0, 5, 6]]
+    df.columns = ['date', 'institutional_net_buy', 'foreigner_net_buy']
+    return df
+
+
+def regenerate(as_of=date(2025, 12, 30)):
+    from naver_stub_server import render_sise_day, render_frgn
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    pages = [
+        ('sise_day_005930_p1.html', render_sise_day('005930', 1, 400, as_of)),
+        ('sise_day_005930_p40.html', render_sise_day('005930', 40, 395, as_of)),  # 마지막 페이지 (5행)
+        ('frgn_005930_p1.html', render_frgn('005930', 1, 400, as_of)),
+        ('frgn_005930_p20.html', render_frgn('005930', 20, 390, as_of)),          # 마지막 페이지 (10행)
+    ]
+    for name, html in pages:
+        with open(os.path.join(FIXTURE_DIR, name), 'wb') as f:
+            f.write(html.encode('euc-kr'))
+    print(f"✅ fixture {len(pages)}개 생성: {FIXTURE_DIR}")
+
+
+def check_parity(kind, legacy_df, cols):
+    dates = pd.to_datetime(legacy_df['date']).values.astype('datetime64[D]')
+    assert np.array_equal(dates, cols['date']), f"{kind}: date 불일치"
+    fields = ['close', 'open', 'high', 'low', 'volume'] if kind == 'sise_day' else \
+        ['institutional_net_buy', 'foreigner_net_buy']
+    for f in fields:
+        assert np.array_equal(legacy_df[f].astype(np.int64).values, cols[f]), f"{kind}: {f} 불일치"
+
+
+def timeit(func, html, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(html)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark naver_parser against pd.read_html')
+    parser.add_argument('--regenerate', action='store_true', help='Rewrite fixture pages')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    if args.regenerate or not glob.glob(os.path.join(FIXTURE_DIR, '*.html')):
+        regenerate()
+
+    print(f"\n{'fixture':<28} {'rows':>5} {'legacy ms':>10} {'lxml ms':>9} {'speedup':>8}")
+    print('-' * 64)
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.html'))):
+        name = os.path.basename(path)
+        with open(path, 'rb') as f:
+            html = f.read().decode('euc-kr')
+
+        kind = 'sise_day' if name.startswith('sise_day') else 'frgn'
+        legacy, fast = (legacy_sise_day, parse_sise_day) if kind == 'sise_day' else (legacy_frgn, parse_frgn)
+
+        cols = fast(html)
+        check_parity(kind, legacy(html), cols)
+
+        t_legacy = timeit(legacy, html, max(1, args.repeat // 10))
+        t_fast = timeit(fast, html, args.repeat)
+        print(f"{name:<28} {len(cols['date']):>5} {t_legacy:>10.2f} {t_fast:>9.3f} {t_legacy / t_fast:>7.1f}x")
+
+    print("\n✅ 모든 fixture에서 값 일치 (date / OHLCV / 기관·외국인 순매매)")
+
+
+if __name__ == "__main__":
+    main()
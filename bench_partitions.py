@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+daily_prices 월별 파티션 전/후 벤치마크
+- daily_prices를 두 벤치 테이블로 복사: 단일 테이블(기존 인덱스 구성) / 월별 파티션 (migrations/partition_price_tables.sql 구성)
+- 날짜 범위 조회 (quick_filter 60일 패널, 하루치 스냅샷, 종목 1개 이력): 결과 일치, 소요 시간, 스캔한 파티션 수
+- 하루치 upsert (bulk_loader 로더, 파티션이면 ensure_month_partitions 포함)
+- 보관 기간 정리: 하루 전진 (경계 달 DELETE) / 한 달 전진 (파티션 DROP) vs DELETE + VACUUM ANALYZE
+
+사용법:
+    python bench_partitions.py
+    python bench_partitions.py --repeat 9
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+from bulk_loader import PRICE_COLUMNS, DailyPriceLoader
+from db_config import get_db_connection
+from partitions import drop_before, is_partitioned
+
+FLAT = 'daily_prices_bench_flat'
+PART = 'daily_prices_bench_part'
+COLUMNS = 'ticker, date, open, high, low, close, volume'
+
+
+def setup():
+    """벤치 테이블 2개 생성 → (행 수, 최소 날짜, 최대 날짜)"""
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        for table in (FLAT, PART):
+            cur.execute(f"DROP TABLE IF EXISTS {table} CASCADE")
+        cur.execute(f"""
+            CREATE TABLE {FLAT} (
+                id SERIAL PRIMARY KEY, ticker VARCHAR(6) NOT NULL, date DATE NOT NULL,
+                open NUMERIC(12,2), high NUMERIC(12,2), low NUMERIC(12,2), close NUMERIC(12,2),
+                volume BIGINT, diff VARCHAR(20), created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (ticker, date)
+            )
+        """)
+        cur.execute(f"""
+            INSERT INTO {FLAT} (ticker, date, open, high, low, close, volume, created_at)
+            SELECT ticker, date, open, high, low, close, volume, created_at FROM daily_prices
+        """)
+        cur.execute(f"CREATE INDEX ON {FLAT} (ticker)")
+        cur.execute(f"CREATE INDEX ON {FLAT} (date)")
+        cur.execute(f"CREATE INDEX ON {FLAT} (ticker, date DESC)")
+
+        cur.execute(f"""
+            CREATE TABLE {PART} (LIKE {FLAT} INCLUDING DEFAULTS) PARTITION BY RANGE (date)
+        """)
+        cur.execute(f"SELECT MIN(date), MAX(date), COUNT(*) FROM {FLAT}")
+        lo, hi, rows = cur.fetchone()
+        cur.execute("SELECT ensure_month_partitions(%s, %s, %s)", (PART, lo, hi))
+        cur.execute(f"INSERT INTO {PART} SELECT * FROM {FLAT}")
+        cur.execute(f"ALTER TABLE {PART} ADD PRIMARY KEY (ticker, date)")
+        cur.execute(f"CREATE INDEX ON {PART} (date)")
+    # ANALYZE는 트랜잭션 밖에서도 되지만 통계가 있어야 계획이 비교 가능
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"ANALYZE {FLAT}")
+        cur.execute(f"ANALYZE {PART}")
+    return rows, lo, hi
+
+
+def queries(lo, hi):
+    return {
+        'quick_filter 60일 패널': (f"SELECT {COLUMNS} FROM {{t}} WHERE date >= %s ORDER BY ticker, date",
+                                 (hi - timedelta(days=60),)),
+        '하루치 스냅샷': (f"SELECT {COLUMNS} FROM {{t}} WHERE date = %s ORDER BY ticker", (hi,)),
+        '종목 1개 200일': (f"SELECT {COLUMNS} FROM {{t}} WHERE ticker = %s AND date >= %s ORDER BY date",
+                        ('005930', hi - timedelta(days=200))),
+    }
+
+
+def scanned_relations(cur, sql, params):
+    """EXPLAIN 계획에서 읽는 테이블(파티션) 수"""
+    cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+    plan = cur.fetchone()[0]
+    names = set()
+
+    def walk(node):
+        if 'Relation Name' in node:
+            names.add(node['Relation Name'])
+        for child in node.get('Plans', []):
+            walk(child)
+
+    walk(plan[0]['Plan'] if isinstance(plan, list) else json.loads(plan)[0]['Plan'])
+    return len(names)
+
+
+def time_query(cur, sql, params, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cur.execute(sql, params)
+        result = cur.fetchall()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def table_size(cur, table):
+    cur.execute("""
+        SELECT COALESCE(SUM(pg_total_relation_size(c.oid)), 0)
+        FROM pg_class c
+        WHERE c.oid = to_regclass(%s)
+           OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(%s))
+    """, (table, table))
+    return int(cur.fetchone()[0])
+
+
+def bench_upsert(table, day):
+    """하루치 행 upsert (로더 그대로, 대상 테이블만 교체)"""
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"SELECT {', '.join(PRICE_COLUMNS)} FROM {table} WHERE date = %s", (day,))
+        rows = cur.fetchall()
+    df = pd.DataFrame(rows, columns=PRICE_COLUMNS)
+    df['date'] = pd.Timestamp(day) + pd.Timedelta(days=45)      # 다음 달 (파티션 생성 포함)
+
+    loader_cls = type('BenchLoader', (DailyPriceLoader,), {'table': table,
+                                                           'staging_table': f"{table}_staging"})
+    start = time.perf_counter()
+    with loader_cls(verbose=False) as loader:
+        loader.write(df)
+    elapsed = time.perf_counter() - start
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"DROP TABLE IF EXISTS {table}_staging")
+    return elapsed, loader.stats['inserted']
+
+
+def bench_retention(table, cutoff):
+    start = time.perf_counter()
+    result = drop_before(table, cutoff)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark monthly partitioning of daily_prices')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per query (median reported)')
+    args = parser.parse_args()
+
+    print("🛠️  벤치 테이블 생성 중...")
+    rows, lo, hi = setup()
+    assert is_partitioned(PART) and not is_partitioned(FLAT)
+    print(f"   {rows:,}행 ({lo} ~ {hi})\n")
+
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        print(f"{'조회':<24} {'단일(ms)':>9} {'파티션(ms)':>10} {'스캔 파티션':>10}")
+        for name, (sql, params) in queries(lo, hi).items():
+            flat_t, flat_rows = time_query(cur, sql.format(t=FLAT), params, args.repeat)
+            part_t, part_rows = time_query(cur, sql.format(t=PART), params, args.repeat)
+            assert flat_rows == part_rows, name
+            scanned = scanned_relations(cur, sql.format(t=PART), params)
+            print(f"{name:<24} {flat_t * 1000:>9.1f} {part_t * 1000:>10.1f} {scanned:>10}")
+        conn.rollback()
+
+    print()
+    for table in (FLAT, PART):
+        elapsed, inserted = bench_upsert(table, hi)
+        print(f"⬆️  하루치 upsert {table}: {inserted:,}행 {elapsed * 1000:.0f}ms")
+
+    print()
+    cutoffs = [('하루 전진', lo + timedelta(days=1)),
+               ('한 달 전진', (lo.replace(day=1) + timedelta(days=32)).replace(day=1) + timedelta(days=1))]
+    for name, cutoff in cutoffs:
+        for table in (FLAT, PART):
+            elapsed, result = bench_retention(table, cutoff)
+            with get_db_connection() as conn:
+                size = table_size(conn.cursor(), table)
+            print(f"🗑️  {name} ({cutoff} 이전) {table}: {elapsed * 1000:>7.0f}ms "
+                  f"(파티션 {result['dropped']}개, {result['deleted']:,}행 DELETE, 크기 {size / 1e6:.1f}MB)")
+
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"SELECT COUNT(*), MIN(date) FROM {FLAT}")
+        flat_state = cur.fetchone()
+        cur.execute(f"SELECT COUNT(*), MIN(date) FROM {PART}")
+        assert cur.fetchone() == flat_state
+        for table in (FLAT, PART):
+            cur.execute(f"DROP TABLE IF EXISTS {table} CASCADE")
+    print(f"\n✅ 정리 후 두 테이블 일치: {flat_state[0]:,}행, 최소 날짜 {flat_state[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+daily_prices 저장 레이아웃 전/후 읽기 벤치마크 (migrations/compact_daily_prices.sql)
+- daily_prices를 두 벤치 테이블로 복사 (파티션 없이 레이아웃만 비교)
+  · 이전: id SERIAL + NUMERIC(12,2) 가격 + diff 텍스트 + (ticker), (date), (ticker, date DESC) 인덱스 + UNIQUE
+  · 이후: INTEGER 가격 + (ticker, date) 기본키 + date BRIN, (date, ticker) 순으로 적재
+- 행당 바이트 (힙), 인덱스 크기, pd.read_sql 적재 시간과 DataFrame dtype / 메모리 (전체, 최근 60일)
+- 두 레이아웃의 조회 결과가 같은 값인지 확인
+
+사용법:
+    python bench_price_layout.py
+    python bench_price_layout.py --repeat 5
+"""
+import argparse
+import statistics
+import time
+import warnings
+from datetime import timedelta
+
+import pandas as pd
+
+from db_config import get_db_connection
+
+WIDE = 'daily_prices_bench_wide'
+COMPACT = 'daily_prices_bench_compact'
+COLUMNS = 'ticker, date, open, high, low, close, volume'
+
+# pandas는 psycopg2 연결에 대해 경고만 냄 (동작은 동일)
+warnings.filterwarnings('ignore', message='pandas only supports SQLAlchemy')
+
+
+def setup():
+    """벤치 테이블 2개 생성 → (행 수, 최대 날짜)"""
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        for table in (WIDE, COMPACT):
+            cur.execute(f"DROP TABLE IF EXISTS {table}")
+
+        cur.execute(f"""
+            CREATE TABLE {WIDE} (
+                id SERIAL PRIMARY KEY, ticker VARCHAR(6) NOT NULL, date DATE NOT NULL,
+                open NUMERIC(12,2), high NUMERIC(12,2), low NUMERIC(12,2), close NUMERIC(12,2),
+                volume BIGINT, diff VARCHAR(20), created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (ticker, date)
+            )
+        """)
+        # diff는 네이버 원본 텍스트 형식 ('상승  1,200' / '하락  300' / '0')으로 재구성
+        cur.execute(f"""
+            INSERT INTO {WIDE} (ticker, date, open, high, low, close, volume, diff, created_at)
+            SELECT ticker, date, open, high, low, close, volume,
+                   CASE WHEN d > 0 THEN '상승  ' || to_char(d, 'FM999,999,999')
+                        WHEN d < 0 THEN '하락  ' || to_char(-d, 'FM999,999,999')
+                        ELSE '0' END,
+                   created_at
+            FROM (
+                SELECT *, close - LAG(close, 1, close) OVER (PARTITION BY ticker ORDER BY date) AS d
+                FROM daily_prices
+            ) p
+            ORDER BY ticker, date
+        """)
+        cur.execute(f"CREATE INDEX {WIDE}_ticker ON {WIDE} (ticker)")
+        cur.execute(f"CREATE INDEX {WIDE}_date ON {WIDE} (date)")
+        cur.execute(f"CREATE INDEX {WIDE}_ticker_date ON {WIDE} (ticker, date DESC)")
+
+        cur.execute(f"""
+            CREATE TABLE {COMPACT} (
+                ticker VARCHAR(6) NOT NULL, date DATE NOT NULL,
+                open INTEGER, high INTEGER, low INTEGER, close INTEGER,
+                volume BIGINT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cur.execute(f"""
+            INSERT INTO {COMPACT}
+            SELECT ticker, date, open::integer, high::integer, low::integer, close::integer, volume, created_at
+            FROM daily_prices ORDER BY date, ticker
+        """)
+        cur.execute(f"ALTER TABLE {COMPACT} ADD PRIMARY KEY (ticker, date)")
+        cur.execute(f"CREATE INDEX {COMPACT}_date ON {COMPACT} USING brin (date)")
+
+        cur.execute(f"ANALYZE {WIDE}")
+        cur.execute(f"ANALYZE {COMPACT}")
+        cur.execute(f"SELECT COUNT(*), MAX(date) FROM {COMPACT}")
+        return cur.fetchone()
+
+
+def sizes(cur, table, rows):
+    """→ (힙 바이트/행, {인덱스: 바이트})"""
+    cur.execute("SELECT pg_relation_size(%s)", (table,))
+    heap = cur.fetchone()[0]
+    cur.execute("""
+        SELECT indexrelid::regclass::text, pg_relation_size(indexrelid)
+        FROM pg_index WHERE indrelid = to_regclass(%s) ORDER BY 1
+    """, (table,))
+    return heap / rows, dict(cur.fetchall())
+
+
+def time_read_sql(conn, sql, params, repeat):
+    times, df = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = pd.read_sql(sql, conn, params=params)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the compact daily_prices layout on the read path')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per read (median reported)')
+    args = parser.parse_args()
+
+    print("🛠️  벤치 테이블 생성 중...")
+    rows, hi = setup()
+    print(f"   {rows:,}행\n")
+
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        for name, table in (('이전', WIDE), ('이후', COMPACT)):
+            per_row, indexes = sizes(cur, table, rows)
+            total = sum(indexes.values())
+            print(f"📦 {name} ({table}): 힙 {per_row:.1f} B/행, 인덱스 {len(indexes)}개 {total / 1e6:.1f}MB")
+            for index, size in indexes.items():
+                print(f"   {index:<44} {size / 1e6:>7.2f}MB")
+
+        reads = {
+            '전체': (f"SELECT {COLUMNS} FROM {{t}} ORDER BY ticker, date", None),
+            '최근 60일': (f"SELECT {COLUMNS} FROM {{t}} WHERE date >= %s ORDER BY ticker, date",
+                       (hi - timedelta(days=60),)),
+        }
+        print(f"\n{'read_sql':<10} {'이전(s)':>8} {'이후(s)':>8} {'배속':>6} {'이전 MB':>8} {'이후 MB':>8}  dtype (이전 → 이후)")
+        for name, (sql, params) in reads.items():
+            wide_t, wide_df = time_read_sql(conn, sql.format(t=WIDE), params, args.repeat)
+            compact_t, compact_df = time_read_sql(conn, sql.format(t=COMPACT), params, args.repeat)
+            for col in ('open', 'high', 'low', 'close'):
+                assert (wide_df[col].astype('float64') == compact_df[col].astype('float64')).all(), col
+            assert wide_df['ticker'].equals(compact_df['ticker']) and wide_df['volume'].equals(compact_df['volume'])
+            wide_mb = wide_df.memory_usage(deep=True).sum() / 1e6
+            compact_mb = compact_df.memory_usage(deep=True).sum() / 1e6
+            print(f"{name:<10} {wide_t:>8.2f} {compact_t:>8.2f} {wide_t / compact_t:>5.1f}x {wide_mb:>8.1f} "
+                  f"{compact_mb:>8.1f}  close: {wide_df['close'].dtype} → {compact_df['close'].dtype}")
+
+        for table in (WIDE, COMPACT):
+            cur.execute(f"DROP TABLE IF EXISTS {table}")
+    print("\n✅ 두 레이아웃 조회 결과 일치")
+
+
+if __name__ == "__main__":
+    main()
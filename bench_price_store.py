@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+가격 패널 로딩 벤치마크: pd.read_sql(daily_prices) vs price_store 스냅샷 (Arrow IPC, memory-map)
+- quick_filter(60일), analysis2(180일), populate_monitoring_history(90일)와 같은 조회 구간
+- 두 경로의 값이 같은지 먼저 확인한 뒤 시간 비교
+
+사용법:
+    python bench_price_store.py               # 스냅샷이 없으면 먼저 생성
+    python bench_price_store.py --refresh     # 증분 갱신 후 측정
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from db_config import get_db_connection
+from price_store import load_price_panel, read_manifest, refresh_store
+
+warnings.filterwarnings('ignore', message='pandas only supports SQLAlchemy')
+
+
+def legacy_load(days_back):
+    """기존 quick_filter / analysis2 방식"""
+    with get_db_connection() as conn:
+        df = pd.read_sql(f"""
+            SELECT ticker, date, open, high, low, close, volume
+            FROM daily_prices
+            WHERE date >= CURRENT_DATE - INTERVAL '{days_back} days'
+            ORDER BY ticker, date
+        """, conn)
+    df['date'] = pd.to_datetime(df['date'])
+    df['ticker'] = df['ticker'].astype(str).str.zfill(6)
+    return df
+
+
+def check_parity(legacy, panel):
+    assert len(legacy) == len(panel), f"행 수 불일치: {len(legacy)} vs {len(panel)}"
+    assert (legacy['ticker'].values == panel['ticker'].values).all(), "ticker 불일치"
+    assert (legacy['date'].values == panel['date'].values).all(), "date 불일치"
+    for c in ('open', 'high', 'low', 'close', 'volume'):
+        assert np.allclose(legacy[c].astype(float).values, panel[c].astype(float).values,
+                           equal_nan=True), f"{c} 불일치"
+
+
+def timeit(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark price_store against pd.read_sql')
+    parser.add_argument('--refresh', action='store_true', help='Refresh the snapshot before measuring')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.refresh or read_manifest() is None:
+        refresh_store()
+
+    print(f"\n{'window':<22} {'rows':>9} {'read_sql s':>11} {'store s':>9} {'speedup':>8}")
+    print('-' * 64)
+    for name, days in [('quick_filter 60d', 60), ('monitoring 90d', 90), ('analysis2 180d', 180)]:
+        t_legacy, legacy = timeit(lambda: legacy_load(days), args.repeat)
+        t_store, panel = timeit(lambda: load_price_panel(days_back=days, source='store'), args.repeat)
+        check_parity(legacy, panel)
+        print(f"{name:<22} {len(panel):>9,} {t_legacy:>11.3f} {t_store:>9.3f} {t_legacy / t_store:>7.1f}x")
+
+    print("\n✅ 모든 구간에서 값 일치 (ticker / date / OHLCV)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+quick_filter 점수 계산 벤치마크: 종목별 루프(calculate_stock_score) vs score_universe (한 번에 계산)
+- 기본은 합성 패널 (2,790종목 × 60거래일, DB 불필요)
+- --source store/db면 실제 daily_prices 패널 사용
+- 두 결과가 완전히 같은지 확인한 뒤 시간 비교
+- NULL 거래량(NaN)을 섞은 패널로 한 번 더 비교 (NaN이 다른 종목의 20일 평균으로 번지지 않는지)
+
+사용법:
+    python bench_quick_filter.py
+    python bench_quick_filter.py --tickers 2790 --days 60
+    python bench_quick_filter.py --source store --days-back 60
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from quick_filter import calculate_stock_score, score_universe
+
+
+def synthetic_panel(n_tickers, n_days, seed=0):
+    """(ticker, date) 정렬 합성 패널 (일부 종목은 20거래일 미만, 일부는 거래 정지로 거래량 0)"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end='2025-12-30', periods=n_days)
+    tickers = np.array([f"{i:06d}" for i in range(1, n_tickers + 1)])
+
+    close = np.round(rng.lognormal(9, 1, n_tickers)[:, None] *
+                     np.cumprod(1 + rng.normal(0, 0.02, (n_tickers, n_days)), axis=1), -1)
+    volume = rng.integers(0, 2_000_000, (n_tickers, n_days))
+    volume[::97] = 0
+
+    df = pd.DataFrame({
+        'ticker': np.repeat(tickers, n_days),
+        'date': np.tile(dates, n_tickers),
+        'close': close.ravel(),
+        'volume': volume.ravel(),
+    })
+    # 신규 상장 종목 흉내: 최근 10거래일만 있는 종목
+    short = set(tickers[::53])
+    df = df[~df['ticker'].isin(short) | (df['date'] >= dates[-10])]
+    return df.reset_index(drop=True)
+
+
+def with_nan_volume(df, frac=0.005, seed=1):
+    """거래량 일부를 NaN으로 (가격 패널의 NULL 거래량, 첫 종목 중간 행 / 마지막 종목 마지막 행 포함)"""
+    rng = np.random.default_rng(seed)
+    df = df.copy()
+    df['volume'] = df['volume'].astype(float)
+    rows = rng.choice(len(df), int(len(df) * frac), replace=False)
+    df.loc[np.r_[rows, 5, len(df) - 1], 'volume'] = np.nan
+    return df
+
+
+def legacy_scores(df):
+    """기존 filter_stocks 루프"""
+    stock_scores = []
+    for ticker in df['ticker'].unique():
+        stock_df = df[df['ticker'] == ticker]
+        score_data = calculate_stock_score(stock_df)
+        if score_data:
+            stock_scores.append(score_data)
+    return pd.DataFrame(stock_scores)
+
+
+def timeit(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark quick_filter scoring')
+    parser.add_argument('--tickers', type=int, default=2790)
+    parser.add_argument('--days', type=int, default=60, help='Trading days per ticker (synthetic panel)')
+    parser.add_argument('--source', choices=['synthetic', 'store', 'db'], default='synthetic')
+    parser.add_argument('--days-back', type=int, default=60, help='Calendar days to load (store/db)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.source == 'synthetic':
+        df = synthetic_panel(args.tickers, args.days)
+    else:
+        from price_store import load_price_panel
+        df = load_price_panel(days_back=args.days_back, columns=['close', 'volume'], source=args.source)
+
+    print(f"📊 패널: {len(df):,}행, {df['ticker'].nunique():,}종목 ({args.source})")
+
+    t_legacy, legacy = timeit(lambda: legacy_scores(df), 1)
+    t_fast, fast = timeit(lambda: score_universe(df), args.repeat)
+
+    pd.testing.assert_frame_equal(legacy.reset_index(drop=True), fast, check_dtype=False, check_exact=True)
+
+    print(f"\n{'method':<28} {'seconds':>9}")
+    print('-' * 38)
+    print(f"{'loop (calculate_stock_score)':<28} {t_legacy:>9.3f}")
+    print(f"{'score_universe':<28} {t_fast:>9.4f}")
+    print(f"\n⚡ {t_legacy / t_fast:,.0f}x 빠름, {len(fast):,}종목 점수 완전 일치")
+
+    nan_df = with_nan_volume(df)
+    legacy, fast = legacy_scores(nan_df), score_universe(nan_df)
+    pd.testing.assert_frame_equal(legacy.reset_index(drop=True), fast, check_dtype=False, check_exact=True)
+    print(f"✅ NULL 거래량 {nan_df['volume'].isna().sum():,}행 섞인 패널도 일치 "
+          f"(vol_ratio 0인 종목 {(fast['vol_ratio'] == 0).sum():,}개)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+daily_prices / investor_flows / daily_indicators / filter_replay_picks 스트리밍 벌크 로더
+- 청크 단위로 UNLOGGED 스테이징 테이블에 COPY FROM STDIN
+- 청크마다 스테이징 → 대상 테이블 집합 기반 upsert 1회 (INSERT ... SELECT ... ON CONFLICT)
+- 월별 파티션 테이블이면 upsert 전에 청크 날짜 범위의 파티션 자동 생성 (partitions.py)
+- 메모리는 청크 크기로 제한, 처리 속도(rows/sec) 보고
+"""
+import time
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from db_config import get_db_connection
+from partitions import ensure_sql, is_partitioned
+
+PRICE_COLUMNS = ['ticker', 'date', 'open', 'high', 'low', 'close', 'volume']
+STAGING_TABLE = 'daily_prices_staging'
+
+FLOW_COLUMNS = ['ticker', 'date', 'close', 'institutional_net_buy', 'foreigner_net_buy']
+FLOW_STAGING_TABLE = 'investor_flows_staging'
+
+INDICATOR_COLUMNS = ['ticker', 'date', 'ma5', 'ma20', 'ma50', 'ma200', 'ema12', 'ema26', 'rsi14',
+                     'vol_ma20', 'high52', 'low52', 'price_change', 'volume_change']
+INDICATOR_STAGING_TABLE = 'daily_indicators_staging'
+
+REPLAY_PICK_COLUMNS = ['ticker', 'date', 'rank', 'final_score', 'close', 'trading_value', 'change_5d', 'vol_ratio',
+                       'fwd_1d', 'fwd_3d', 'fwd_5d', 'fwd_7d']
+REPLAY_PICK_STAGING_TABLE = 'filter_replay_picks_staging'
+
+
+def prepare_price_frame(df):
+    """스크레이퍼/CSV 출력 → COPY 가능한 형태 (컬럼 순서, 원 단위 정수, 중복 제거, diff 텍스트는 버림)"""
+    df = df[[c for c in PRICE_COLUMNS if c in df.columns]].copy()
+    for col in PRICE_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+
+    df['ticker'] = df['ticker'].astype(str).str.zfill(6)
+    df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
+    for col in ('open', 'high', 'low', 'close', 'volume'):
+        df[col] = pd.to_numeric(df[col], errors='coerce').round().astype('Int64')
+    df = df.drop_duplicates(subset=['ticker', 'date'], keep='last')
+    return df[PRICE_COLUMNS]
+
+
+def prepare_flow_frame(df):
+    """get_investor_trend 출력 → COPY 가능한 형태 (close가 없으면 NULL)"""
+    df = df[[c for c in FLOW_COLUMNS if c in df.columns]].copy()
+    if 'close' not in df.columns:
+        df['close'] = None
+
+    df['ticker'] = df['ticker'].astype(str).str.zfill(6)
+    df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
+    for col in ('institutional_net_buy', 'foreigner_net_buy'):
+        df[col] = pd.to_numeric(df[col], errors='coerce').round().astype('Int64')
+    df = df.drop_duplicates(subset=['ticker', 'date'], keep='last')
+    return df[FLOW_COLUMNS]
+
+
+def prepare_indicator_frame(df):
+    """IndicatorState 출력 → COPY 가능한 형태 (소수 둘째 자리, NaN/inf는 NULL)"""
+    df = df[INDICATOR_COLUMNS].copy()
+    df['ticker'] = df['ticker'].astype(str).str.zfill(6)
+    df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
+    values = INDICATOR_COLUMNS[2:]
+    df[values] = df[values].astype(float).replace([np.inf, -np.inf], np.nan).round(2)
+    df = df.drop_duplicates(subset=['ticker', 'date'], keep='last')
+    return df
+
+
+def prepare_replay_pick_frame(df):
+    """filter_replay.select_daily 출력 → COPY 가능한 형태 (점수/수익률 소수 넷째 자리, 미래 수익률 없으면 NULL)"""
+    df = df[REPLAY_PICK_COLUMNS].copy()
+    df['ticker'] = df['ticker'].astype(str).str.zfill(6)
+    df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
+    df['trading_value'] = df['trading_value'].round().astype('Int64')
+    values = ['final_score', 'change_5d', 'vol_ratio', 'fwd_1d', 'fwd_3d', 'fwd_5d', 'fwd_7d']
+    df[values] = df[values].astype(float).replace([np.inf, -np.inf], np.nan).round(4)
+    df = df.drop_duplicates(subset=['ticker', 'date'], keep='last')
+    return df
+
+
+def copy_frame(cur, df, table, columns):
+    """DataFrame → COPY FROM STDIN (CSV, 빈 값은 NULL)"""
+    buf = StringIO()
+    df.to_csv(buf, index=False, header=False, columns=columns)
+    buf.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf)
+
+
+class StagedUpsertLoader:
+    """
+    스테이징 COPY + upsert 공통 로직 (테이블별 설정은 하위 클래스에서)
+
+    사용법:
+        with DailyPriceLoader(chunk_size=50000) as loader:
+            for df in frames:
+                loader.write(df)
+        print(loader.stats)
+    """
+
+    table = None
+    staging_table = None
+    columns = None
+    staging_ddl = None      # 스테이징 테이블 컬럼 정의
+    update_columns = None   # 충돌 시 갱신할 컬럼
+    touch_column = None     # 충돌 시 CURRENT_TIMESTAMP로 갱신할 컬럼
+
+    @staticmethod
+    def prepare(df):
+        raise NotImplementedError
+
+    def __init__(self, chunk_size=50000, verbose=True):
+        self.chunk_size = chunk_size
+        self.verbose = verbose
+        self._buffer = []
+        self._buffered_rows = 0
+        self._conn_ctx = None
+        self.conn = None
+
+        self.stats = {'rows': 0, 'inserted': 0, 'updated': 0, 'chunks': 0,
+                      'tickers': set(), 'min_date': None, 'max_date': None, 'elapsed': 0.0}
+        self._start = None
+
+    def __enter__(self):
+        self._conn_ctx = get_db_connection()
+        self.conn = self._conn_ctx.__enter__()
+        self._start = time.perf_counter()
+        with self.conn.cursor() as cur:
+            cur.execute(f"CREATE UNLOGGED TABLE IF NOT EXISTS {self.staging_table} ({self.staging_ddl})")
+        self.conn.commit()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            self.stats['elapsed'] = time.perf_counter() - self._start
+            self._conn_ctx.__exit__(exc_type, exc, tb)
+        return False
+
+    @property
+    def rows_per_sec(self):
+        elapsed = self.stats['elapsed'] or (time.perf_counter() - self._start)
+        return self.stats['rows'] / elapsed if elapsed > 0 else 0.0
+
+    def write(self, df):
+        """DataFrame 추가 (청크 크기가 차면 자동 flush)"""
+        if df is None or df.empty:
+            return
+        self._buffer.append(df)
+        self._buffered_rows += len(df)
+        if self._buffered_rows >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """버퍼를 한 트랜잭션으로 스테이징 COPY → 대상 테이블 merge"""
+        if not self._buffer:
+            return
+        chunk = self.prepare(pd.concat(self._buffer, ignore_index=True))
+        self._buffer = []
+        self._buffered_rows = 0
+
+        with self.conn.cursor() as cur:
+            # TRUNCATE가 스테이징에 배타 잠금을 잡으므로 동시 로더는 청크 단위로 직렬화됨
+            cur.execute(f"TRUNCATE {self.staging_table}")
+            copy_frame(cur, chunk, self.staging_table, self.columns)
+            if is_partitioned(self.table):
+                cur.execute(ensure_sql(self.table, self.staging_table))
+            cur.execute(self.upsert_sql(self.staging_table))
+            inserted, total = cur.fetchone()
+        self.conn.commit()
+        self._record(chunk, inserted, total)
+
+    @classmethod
+    def upsert_sql(cls, source):
+        """source 테이블 → 대상 테이블 upsert (결과: 신규 행 수, 전체 행 수)"""
+        cols = ', '.join(cls.columns)
+        updates = ',\n'.join([f"{c} = EXCLUDED.{c}" for c in cls.update_columns] +
+                             [f"{cls.touch_column} = CURRENT_TIMESTAMP"])
+        # 파티션 테이블은 RETURNING에서 xmax를 읽을 수 없으므로 기존 행 수를 같은 스냅샷에서 따로 셈
+        return f"""
+            WITH existing AS (
+                SELECT COUNT(*) AS n FROM {source} s
+                WHERE EXISTS (SELECT 1 FROM {cls.table} t WHERE t.ticker = s.ticker AND t.date = s.date)
+            ), upserted AS (
+                INSERT INTO {cls.table} ({cols})
+                SELECT {cols} FROM {source}
+                ON CONFLICT (ticker, date) DO UPDATE SET
+                    {updates}
+                RETURNING 1
+            )
+            SELECT COUNT(*) - (SELECT n FROM existing), COUNT(*) FROM upserted
+        """
+
+    def _record(self, chunk, inserted, total):
+        st = self.stats
+        st['rows'] += total
+        st['inserted'] += inserted
+        st['updated'] += total - inserted
+        st['chunks'] += 1
+        st['tickers'].update(chunk['ticker'].unique())
+        lo, hi = chunk['date'].min(), chunk['date'].max()
+        st['min_date'] = lo if st['min_date'] is None else min(st['min_date'], lo)
+        st['max_date'] = hi if st['max_date'] is None else max(st['max_date'], hi)
+
+        if self.verbose:
+            print(f"   청크 {st['chunks']}: {total:,}행 | 누적 {st['rows']:,}행 "
+                  f"({self.rows_per_sec:,.0f} rows/sec)", end='\r')
+
+
+class DailyPriceLoader(StagedUpsertLoader):
+    """daily_prices 스트리밍 upsert"""
+
+    table = 'daily_prices'
+    staging_table = STAGING_TABLE
+    columns = PRICE_COLUMNS
+    staging_ddl = """
+        ticker VARCHAR(6),
+        date DATE,
+        open INTEGER,
+        high INTEGER,
+        low INTEGER,
+        close INTEGER,
+        volume BIGINT
+    """
+    update_columns = ['open', 'high', 'low', 'close', 'volume']
+    touch_column = 'created_at'
+    prepare = staticmethod(prepare_price_frame)
+
+
+class InvestorFlowLoader(StagedUpsertLoader):
+    """investor_flows 스트리밍 upsert (외국인/기관 순매매)"""
+
+    table = 'investor_flows'
+    staging_table = FLOW_STAGING_TABLE
+    columns = FLOW_COLUMNS
+    staging_ddl = """
+        ticker VARCHAR(6),
+        date DATE,
+        close NUMERIC(12,2),
+        institutional_net_buy BIGINT,
+        foreigner_net_buy BIGINT
+    """
+    update_columns = ['close', 'institutional_net_buy', 'foreigner_net_buy']
+    touch_column = 'updated_at'
+    prepare = staticmethod(prepare_flow_frame)
+
+
+class IndicatorLoader(StagedUpsertLoader):
+    """daily_indicators 스트리밍 upsert (daily_indicators.py)"""
+
+    table = 'daily_indicators'
+    staging_table = INDICATOR_STAGING_TABLE
+    columns = INDICATOR_COLUMNS
+    staging_ddl = """
+        ticker VARCHAR(6),
+        date DATE,
+        ma5 NUMERIC(12,2),
+        ma20 NUMERIC(12,2),
+        ma50 NUMERIC(12,2),
+        ma200 NUMERIC(12,2),
+        ema12 NUMERIC(12,2),
+        ema26 NUMERIC(12,2),
+        rsi14 NUMERIC(5,2),
+        vol_ma20 NUMERIC(16,2),
+        high52 NUMERIC(12,2),
+        low52 NUMERIC(12,2),
+        price_change NUMERIC(8,2),
+        volume_change NUMERIC(12,2)
+    """
+    update_columns = INDICATOR_COLUMNS[2:]
+    touch_column = 'updated_at'
+    prepare = staticmethod(prepare_indicator_frame)
+
+
+class ReplayPickLoader(StagedUpsertLoader):
+    """filter_replay_picks 스트리밍 upsert (filter_replay.py)"""
+
+    table = 'filter_replay_picks'
+    staging_table = REPLAY_PICK_STAGING_TABLE
+    columns = REPLAY_PICK_COLUMNS
+    staging_ddl = """
+        ticker VARCHAR(6),
+        date DATE,
+        rank INTEGER,
+        final_score NUMERIC(10,4),
+        close NUMERIC(12,2),
+        trading_value BIGINT,
+        change_5d NUMERIC(12,4),
+        vol_ratio NUMERIC(12,4),
+        fwd_1d NUMERIC(12,4),
+        fwd_3d NUMERIC(12,4),
+        fwd_5d NUMERIC(12,4),
+        fwd_7d NUMERIC(12,4)
+    """
+    update_columns = REPLAY_PICK_COLUMNS[2:]
+    touch_column = 'updated_at'
+    prepare = staticmethod(prepare_replay_pick_frame)
+
+
+def stream_csv_to_db(csv_file, chunk_size=50000, verbose=True):
+    """CSV를 청크 단위로 읽어 DailyPriceLoader로 적재 → stats"""
+    reader = pd.read_csv(csv_file, dtype={'ticker': str}, chunksize=chunk_size)
+    with DailyPriceLoader(chunk_size=chunk_size, verbose=verbose) as loader:
+        for chunk in reader:
+            loader.write(chunk)
+    if verbose:
+        print()
+    return loader.stats
@@ -7,6 +7,7 @@
 
 import sys
 import os
+import re
 import pandas as pd
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any
@@ -14,6 +15,15 @@ import time
 from datetime import datetime
 from tqdm import tqdm
 
+from rate_limiter import RateLimiter
+
+RATE_LIMIT_ENDPOINT = 'kiwoom.price'
+
+# 키움 REST API 요청 제한 초과: 오류 코드 1700 ("허용된 요청 개수를 초과하였습니다"), HTTP 429
+# 'rate'처럼 짧은 부분 문자열은 separate / generate 같은 다른 오류에도 걸려 공유 예산을 깎으므로 쓰지 않음
+KIWOOM_THROTTLE_PATTERN = re.compile(
+    r'\b(?:429|1700)\b|허용된 요청 개수|rate.?limit|too many requests', re.IGNORECASE)
+
 # kiwoom_trading 모듈 경로 추가
 KIWOOM_PATH = '/home/greatbps/projects/kiwoom_trading'
 if KIWOOM_PATH not in sys.path:
@@ -31,15 +41,16 @@ except ImportError as e:
 class RealtimeDataCollector:
     """실시간 데이터 병렬 수집기"""
 
-    def __init__(self, max_workers: int = 10):
+    def __init__(self, max_workers: int = 10, limiter: RateLimiter = None):
         """
         초기화
 
         Args:
             max_workers: 동시 실행 스레드 수 (기본 10개)
-                        키움 API rate limit 고려하여 설정
+            limiter: 공유 요청 제한기 (기본: kiwoom.price 예산, 다른 프로세스와 공유)
         """
         self.max_workers = max_workers
+        self.limiter = limiter or RateLimiter()
         self.api = KiwoomAPI()
         self.results = []
         self.errors = []
@@ -56,8 +67,16 @@ class RealtimeDataCollector:
             종목 데이터 딕셔너리
         """
         try:
-            # 현재가 조회
-            price_data = self.api.get_stock_price(ticker)
+            # 현재가 조회 (공유 예산에서 토큰을 받은 뒤 요청)
+            self.limiter.acquire(RATE_LIMIT_ENDPOINT)
+            try:
+                price_data = self.api.get_stock_price(ticker)
+            except Exception as e:
+                # 키움 API는 제한 초과를 예외 메시지로 알려줌 → 백오프
+                if KIWOOM_THROTTLE_PATTERN.search(str(e)):
+                    self.limiter.feedback(RATE_LIMIT_ENDPOINT, status=429)
+                raise
+            self.limiter.feedback(RATE_LIMIT_ENDPOINT, status=200)
 
             if price_data is None:
                 return {
@@ -153,10 +172,6 @@ class RealtimeDataCollector:
 
                     pbar.update(1)
 
-                    # Rate limit 방지: 100개마다 1초 대기
-                    if pbar.n % 100 == 0:
-                        time.sleep(1)
-
         elapsed_time = time.time() - start_time
 
         # 결과 요약
@@ -166,6 +181,7 @@ class RealtimeDataCollector:
         print(f"  성공: {len(results)}개")
         print(f"  실패: {len(errors)}개")
         print(f"  초당 처리: {len(stocks_df)/elapsed_time:.1f}개/초")
+        print(f"  {self.limiter.summary()}")
         print(f"{'='*60}\n")
 
         # DataFrame 생성
@@ -1,47 +1,88 @@
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
 import time
 from datetime import datetime, timedelta
 import os
 from tqdm import tqdm
-import multiprocessing
-from io import StringIO
 
-def get_daily_price(ticker_pages):
-    ticker, pages = ticker_pages
-
-    url = f"https://finance.naver.com/item/sise_day.nhn?code={ticker}"
-    headers = {'User-Agent': 'Mozilla/5.0'}
+from naver_fetcher import (
+    NAVER_BASE_URL, SISE_DAY_PATH, DEFAULT_HEADERS,
+    finalize_daily_prices, last_page_in_html, reached_known_date, split_job, fetch_daily_prices,
+    get_page_sync
+)
+from naver_parser import parse_sise_day
+from http_cache import make_cache
+from rate_limiter import make_limiter
+
+
+def get_daily_price(ticker_pages, base_url=NAVER_BASE_URL, cache=None, limiter=None):
+    """
+    단일 종목 동기 수집 (디버깅/비교용)
+    ticker_pages: (ticker, pages) 또는 (ticker, pages, known_through)
+    known_through가 있으면 그 날짜 이하의 행이 나온 페이지까지만 요청
+    """
+    ticker, pages, known_through = split_job(ticker_pages)
+
+    url = f"{base_url}{SISE_DAY_PATH}?code={ticker}"
     session = requests.Session()
-    session.headers.update(headers)
+    session.headers.update(DEFAULT_HEADERS)
+
+    def fetch(page_url):
+        return get_page_sync(session, page_url, limiter)
 
     df_list = []
 
     for page in range(1, pages + 1):
-        response = session.get(f"{url}&page={page}")
-        tables = pd.read_html(StringIO(response.text))
+        page_url = f"{url}&page={page}"
+        html = cache.get_or_fetch(page_url, fetch) if cache is not None else fetch(page_url)
+        cols = parse_sise_day(html)
 
-        if not tables:
+        if not len(cols['date']):
             break
 
-        df = tables[0].dropna()
-        df_list.append(df)
-
-    if not df_list:
-        return None
-
-    df = pd.concat(df_list, ignore_index=True)
-    df['ticker'] = ticker
-    df = df.rename(columns={
-        '날짜': 'date', '종가': 'close', '전일비': 'diff',
-        '시가': 'open', '고가': 'high', '저가': 'low', '거래량': 'volume'
-    })
-    df['date'] = pd.to_datetime(df['date'])
-    return df.sort_values('date')
+        df_list.append(cols)
 
+        last_page = last_page_in_html(html)
+        if last_page is not None and page >= last_page:
+            break
+        if reached_known_date(html, known_through):
+            break
 
-def fetch_and_save_data(stock_list_path, output_path, pages_to_fetch=20, limit=None):
+    return finalize_daily_prices(ticker, df_list)
+
+
+def build_jobs(tickers, pages_to_fetch, known_through=None, new_listings_only=False):
+    """
+    종목별 수집 작업 목록
+    - known_through 없음: 전 종목 pages_to_fetch 페이지
+    - known_through 있음: DB 보유 종목은 보유 구간에 닿는 페이지에서 중단, 신규 종목은 전체 깊이
+    - new_listings_only: DB에 이력이 없는 종목만 전체 깊이로 수집
+    """
+    if known_through is None:
+        return [(ticker, pages_to_fetch) for ticker in tickers]
+    if new_listings_only:
+        return [(ticker, pages_to_fetch) for ticker in tickers if known_through.get(ticker) is None]
+    return [(ticker, pages_to_fetch, known_through.get(ticker)) for ticker in tickers]
+
+
+def drop_known_rows(df, known_through):
+    """이미 보유한 날짜(known_through 이하) 행 제거"""
+    if df is None or known_through is None:
+        return df
+    return df[df['date'].dt.date > known_through]
+
+
+def fetch_and_save_data(stock_list_path, output_path, pages_to_fetch=20, limit=None,
+                        base_url=NAVER_BASE_URL, concurrency=8, to_db=False, chunk_size=50000,
+                        cache=None, known_through=None, new_listings_only=False, limiter=None):
+    """
+    전 종목 일별 시세 수집
+    to_db=True면 CSV를 거치지 않고 bulk_loader로 daily_prices에 바로 적재
+    cache: http_cache.ResponseCache (재실행 시 이미 받은 페이지는 캐시에서)
+    known_through: {ticker: date} → 보유 구간 이후만 수집 (build_jobs 참고)
+    new_listings_only: known_through에 없는 종목만 전체 깊이로 수집
+    limiter: rate_limiter.RateLimiter (다른 스크레이퍼 프로세스와 요청 예산 공유)
+    """
     stocks = pd.read_csv(stock_list_path)
     stocks['ticker'] = stocks['ticker'].astype(str).str.zfill(6)
     tickers = stocks['ticker'].tolist()
@@ -49,22 +90,64 @@ def fetch_and_save_data(stock_list_path, output_path, pages_to_fetch=20, limit=N
     if limit:
         tickers = tickers[:limit]
 
-    print(f"Processing {len(tickers)} stocks with multiprocessing...")
-
-    workers = max(1, multiprocessing.cpu_count() - 1)
-    pool = multiprocessing.Pool(workers)
-
-    tasks = [(ticker, pages_to_fetch) for ticker in tickers]
-
-    results = list(tqdm(
-        pool.imap_unordered(get_daily_price, tasks),
-        total=len(tasks)
-    ))
-
-    pool.close()
-    pool.join()
-
-    final_data = [df for df in results if df is not None]
+    tasks = build_jobs(tickers, pages_to_fetch, known_through, new_listings_only)
+    known_through = known_through or {}
+    if new_listings_only:
+        print(f"New listings only: {len(tasks)} of {len(tickers)} stocks have no stored history")
+
+    print(f"Processing {len(tasks)} stocks with async fetch engine (concurrency={concurrency})...")
+    final_data = []
+
+    if to_db:
+        from bulk_loader import DailyPriceLoader
+        from db_config import get_db_connection
+        from update_daily_prices import update_watermarks
+
+        checked_at = datetime.now()
+        last_rows = {}
+
+        with DailyPriceLoader(chunk_size=chunk_size, verbose=False) as loader:
+            with tqdm(total=len(tasks)) as pbar:
+                def on_result(ticker, df):
+                    if df is not None:
+                        last_rows[ticker] = df.tail(1)
+                    loader.write(drop_known_rows(df, known_through.get(ticker)))
+                    pbar.update(1)
+
+                stats = fetch_daily_prices(tasks, on_result, base_url=base_url, max_per_host=concurrency,
+                                           cache=cache, limiter=limiter)
+
+        print(f"Requests: {stats['requests']:,} | Cache hits: {stats['cache_hits']:,} | "
+              f"Early stops: {stats['early_stops']:,} | "
+              f"Errors: {stats['errors']} | Failed tickers: {stats['failed_tickers']}")
+        print(f"Loaded {loader.stats['rows']:,} rows into daily_prices "
+              f"(new {loader.stats['inserted']:,}, updated {loader.stats['updated']:,}, "
+              f"{loader.rows_per_sec:,.0f} rows/sec)")
+
+        # 적재가 끝난 종목은 워터마크 전진 (다음 증분/신규 상장 판단에 사용)
+        with get_db_connection() as conn:
+            update_watermarks(conn.cursor(), last_rows, checked_at)
+
+        from price_store import refresh_after_update
+        refresh_after_update()
+        import daily_indicators
+        daily_indicators.refresh_after_update()
+        return
+
+    with tqdm(total=len(tasks)) as pbar:
+        def on_result(ticker, df):
+            df = drop_known_rows(df, known_through.get(ticker))
+            if df is not None:
+                final_data.append(df)
+            pbar.update(1)
+
+        stats = fetch_daily_prices(tasks, on_result, base_url=base_url, max_per_host=concurrency,
+                                   cache=cache, limiter=limiter)
+
+    print(f"Requests: {stats['requests']:,} | Cache hits: {stats['cache_hits']:,} | "
+          f"Early stops: {stats['early_stops']:,} | "
+          f"Errors: {stats['errors']} | Failed tickers: {stats['failed_tickers']} | "
+          f"{(stats['requests'] + stats['cache_hits']) / max(stats['elapsed'], 1e-9):.1f} pages/s")
 
     if final_data:
         final_df = pd.concat(final_data, ignore_index=True)
@@ -76,24 +159,46 @@ if __name__ == "__main__":
     # 설정
     STOCK_LIST_FILE = "korean_stocks_list.csv"
     OUTPUT_FILE = "daily_prices.csv"
-    PAGES = 40 
-    
+    PAGES = 40
+
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument("--limit", type=int, help="Limit number of stocks to process")
+    parser.add_argument("--concurrency", type=int, default=8, help="Max concurrent requests per host")
+    parser.add_argument("--base-url", default=NAVER_BASE_URL,
+                        help="Override host (e.g. local naver_stub_server.py)")
+    parser.add_argument("--to-db", action="store_true",
+                        help="Stream results straight into daily_prices (no daily_prices.csv)")
+    parser.add_argument("--cache-dir", default=None, help="HTTP response cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the HTTP response cache")
+    parser.add_argument("--replay", action="store_true",
+                        help="Serve the whole run from the cache (no network)")
+    parser.add_argument("--no-rate-limit", action="store_true",
+                        help="Disable the shared rate limiter (concurrency cap only)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Stop paging once a page reaches the history already in daily_prices")
+    parser.add_argument("--new-listings-only", action="store_true",
+                        help="Deep-fetch only tickers with no history in daily_prices")
     args = parser.parse_args()
 
+    cache = make_cache(args.cache_dir, replay=args.replay, no_cache=args.no_cache)
+    limiter = make_limiter(no_limit=args.no_rate_limit)
+
+    known_through = None
+    if args.incremental or args.new_listings_only:
+        from update_daily_prices import get_known_through
+        known_through = get_known_through()
+        print(f"Known-through dates loaded for {len(known_through)} stocks")
+
     if os.path.exists(STOCK_LIST_FILE):
         if args.limit:
             print(f"Running in limited mode: {args.limit} stocks")
-            # fetch_and_save_data 함수 내부를 수정하거나, 여기서 ticker 리스트를 잘라서 전달해야 함.
-            # 하지만 fetch_and_save_data는 파일 경로를 받음.
-            # 함수를 수정하는 것이 좋겠음.
-            # 아래와 같이 함수를 호출하기 전에 내부적으로 처리하도록 수정.
-            pass
-        
-        # 함수 재정의 대신, 함수 인자로 limit을 전달하도록 수정 필요.
-        # 따라서 fetch_and_save_data 시그니처 변경
-        fetch_and_save_data(STOCK_LIST_FILE, OUTPUT_FILE, PAGES, limit=args.limit)
+
+        fetch_and_save_data(STOCK_LIST_FILE, OUTPUT_FILE, PAGES, limit=args.limit,
+                            base_url=args.base_url, concurrency=args.concurrency, to_db=args.to_db,
+                            cache=cache, known_through=known_through,
+                            new_listings_only=args.new_listings_only, limiter=limiter)
+        if cache is not None:
+            print(f"📦 {cache.summary()}")
     else:
         print(f"File not found: {STOCK_LIST_FILE}")
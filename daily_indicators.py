@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+daily_indicators 테이블 갱신 (전 종목 일별 기술 지표)
+- update_daily_prices.py 실행 직후 호출: 직전 동기화 이후 daily_prices에 들어온 행(created_at)만 읽어
+  indicators.IndicatorState 상태에 하루씩 반영 → 종목당 O(1), 결과는 IndicatorLoader로 COPY upsert
+- 처음 보는 종목, 이미 반영한 날짜의 가격이 바뀐 종목(장중 수집 후 종가 재수집 등)은 그 종목만 전체 이력으로 다시 계산
+- 상태 파일이 없거나 --full이면 daily_prices 전체로 다시 계산
+- 보관 기간은 daily_prices를 따라감 (가장 오래된 가격 날짜 이전 지표 삭제, 월별 파티션이면 파티션째)
+
+사용법:
+    python daily_indicators.py              # 증분 갱신
+    python daily_indicators.py --full       # 전체 재계산
+    python daily_indicators.py --status
+"""
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+from bulk_loader import IndicatorLoader
+from db_config import get_db_connection
+from indicators import DEFAULT_STATE_PATH, IndicatorState
+from partitions import drop_before
+from price_store import load_from_db
+
+# 동시에 커밋 중이던 트랜잭션을 놓치지 않도록 직전 동기화 시각보다 조금 앞부터 확인
+SYNC_OVERLAP = timedelta(minutes=5)
+
+INPUT_COLUMNS = ['high', 'low', 'close', 'volume']
+
+
+def _changed_rows(cur, since):
+    """since 이후 저장/수정된 daily_prices 행 (date, ticker 정렬)"""
+    cur.execute("""
+        SELECT ticker, date, high::float8, low::float8, close::float8, volume
+        FROM daily_prices
+        WHERE created_at >= %s
+        ORDER BY date, ticker
+    """, (since,))
+    df = pd.DataFrame(cur.fetchall(), columns=['ticker', 'date'] + INPUT_COLUMNS)
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+
+def _load_state(state_path, full):
+    if full:
+        return None
+    try:
+        state = IndicatorState.load(state_path)
+    except FileNotFoundError:
+        return None
+    # indicators.py --warm 으로 만든 상태 (DB 동기화 시각 없음) 는 전체 재계산
+    return state if state.synced_at is not None else None
+
+
+def refresh_indicators(state_path=DEFAULT_STATE_PATH, full=False, verbose=True):
+    """
+    daily_indicators 갱신 → 저장한 행 수
+    full=True면 상태를 버리고 daily_prices 전체로 다시 계산
+    """
+    start_time = time.perf_counter()
+    state = _load_state(state_path, full)
+
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT LOCALTIMESTAMP, MIN(date) FROM daily_prices")
+        synced_at, oldest = cur.fetchone()
+        if state is not None:
+            rows = _changed_rows(cur, state.synced_at - SYNC_OVERLAP)
+
+    with IndicatorLoader(verbose=False) as loader:
+        if state is None:
+            mode = '전체'
+            state = IndicatorState()
+            panel = load_from_db(columns=INPUT_COLUMNS, backend='postgres')
+            panel['date'] = pd.to_datetime(panel['date'])
+            loader.write(state.warm(panel, keep_history=True))
+            rewarmed = len(state)
+        else:
+            mode = '증분'
+            # 처음 보는 종목 / 이미 반영한 날짜가 바뀐 종목 → 해당 종목만 전체 이력으로 재계산
+            idx = [state.index.get(t) for t in rows['ticker']]
+            known = pd.Series([i is not None for i in idx], index=rows.index)
+            last = pd.Series(pd.NaT, index=rows.index, dtype='datetime64[ns]')
+            last[known] = state.last_date[[i for i in idx if i is not None]].astype('datetime64[ns]')
+            stale = ~known | (rows['date'] <= last)
+            rewarm = sorted(rows.loc[stale, 'ticker'].unique())
+            if rewarm:
+                state.reset(rewarm)
+                history = load_from_db(columns=INPUT_COLUMNS, tickers=rewarm, backend='postgres')
+                history['date'] = pd.to_datetime(history['date'])
+                loader.write(state.warm(history, keep_history=True))
+            loader.write(state.warm(rows[~rows['ticker'].isin(rewarm)], keep_history=True))
+            rewarmed = len(rewarm)
+
+        # daily_prices 보관 기간 밖의 지표 삭제 (월별 파티션이면 오래된 달은 파티션째)
+        if oldest is not None:
+            removed = drop_before('daily_indicators', oldest)['deleted']
+        else:
+            with loader.conn.cursor() as cur:
+                cur.execute("DELETE FROM daily_indicators")
+                removed = cur.rowcount
+            loader.conn.commit()
+
+    state.synced_at = synced_at
+    state.save(state_path)
+
+    if verbose:
+        print(f"📐 기술 지표 갱신 ({mode}): {loader.stats['rows']:,}행 저장 "
+              f"({len(loader.stats['tickers']):,}종목, 재계산 {rewarmed:,}종목, 오래된 행 {removed:,}개 삭제, "
+              f"{time.perf_counter() - start_time:.1f}초)")
+    return loader.stats['rows']
+
+
+def refresh_after_update(state_path=DEFAULT_STATE_PATH):
+    """가격 업데이트 스크립트 마지막에 호출 (실패해도 가격 업데이트는 유지, 다음 실행 때 따라잡음)"""
+    try:
+        return refresh_indicators(state_path)
+    except Exception as e:
+        print(f"⚠️  기술 지표 갱신 실패 (다음 실행 때 재시도): {e}")
+        return None
+
+
+def show_status(state_path=DEFAULT_STATE_PATH):
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT COUNT(*), COUNT(DISTINCT ticker), MIN(date), MAX(date), MAX(updated_at)
+            FROM daily_indicators
+        """)
+        rows, tickers, lo, hi, updated = cur.fetchone()
+    print(f"📐 daily_indicators: {rows:,}행, {tickers:,}종목 ({lo} ~ {hi}), 마지막 갱신 {updated}")
+    try:
+        state = IndicatorState.load(state_path)
+        print(f"   상태 파일: {state_path} ({len(state):,}종목, 동기화 {state.synced_at})")
+    except FileNotFoundError:
+        print(f"   상태 파일 없음: {state_path} (다음 갱신은 전체 재계산)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Maintain the daily_indicators table')
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH)
+    parser.add_argument('--full', action='store_true', help='Recompute every ticker from daily_prices')
+    parser.add_argument('--status', action='store_true', help='Show table and state summary')
+    args = parser.parse_args()
+
+    if not args.status:
+        refresh_indicators(args.state, full=args.full)
+    show_status(args.state)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+daily_prices 바이너리 COPY 패널 로더
+- COPY (SELECT ...) TO STDOUT WITH (FORMAT binary) 결과를 행 단위 파이썬 객체 없이 numpy 구조화 dtype으로 한 번에 해석
+  (모든 필드를 고정 폭으로 맞춤: ticker char(6), 날짜 int32, 가격 int32, 거래량 int64, NULL은 센티널 값)
+- PricePanel: 종목 정수 코드 + 종목 조회 테이블, datetime64[D] 날짜, 연속된 int32/float32 가격 배열
+  (ticker, date 정렬 → 종목별 구간은 offsets로 바로 슬라이스)
+- to_frame(): price_store.load_from_db와 같은 형태의 DataFrame (기존 분석 코드 그대로 사용)
+- 백엔드 전환: backend='postgres' (서비스 DB) / 'duckdb' (analytics_db.py 로컬 미러, 서비스 DB 부하 없음)
+  인자를 생략하면 환경변수 ANALYTICS_BACKEND (기본 postgres)
+
+사용법:
+    from data_access import load_panel
+    panel = load_panel(start=date(2026, 4, 1), columns=['close', 'volume'])
+    closes = panel['close'][panel.rows('005930')]
+    df = panel.to_frame()
+    df = query("SELECT ticker, AVG(close) FROM daily_prices WHERE date >= %s GROUP BY 1", (start,), backend='duckdb')
+"""
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from db_config import get_db_connection
+
+PRICE_FIELDS = ['open', 'high', 'low', 'close']
+VALUE_FIELDS = PRICE_FIELDS + ['volume']
+
+# NULL 센티널 (가격 int32 / 거래량 int64 최솟값, float32로 바꾸면 NaN)
+NA_PRICE = np.iinfo(np.int32).min
+NA_VOLUME = np.iinfo(np.int64).min
+
+BACKENDS = ('postgres', 'duckdb')
+
+_SIGNATURE = b'PGCOPY\n\xff\r\n\x00'
+_PG_EPOCH_DAYS = 10957          # 2000-01-01 - 1970-01-01
+_TICKER_WIDTH = 6
+
+
+class PricePanel:
+    """
+    (ticker, date) 정렬 가격 패널
+
+    Attributes:
+        tickers: 종목 조회 테이블 (코드 → 종목코드 문자열, 오름차순)
+        codes: 행별 종목 코드 (int32, tickers 인덱스)
+        dates: 행별 거래일 (datetime64[D])
+        values: {컬럼: 배열} 가격 int32 (또는 float32), 거래량 int64 (NULL은 NA_PRICE / NA_VOLUME)
+        offsets: 종목 코드 i의 행 구간 = offsets[i]:offsets[i + 1]
+    """
+
+    def __init__(self, tickers, codes, dates, values, offsets):
+        self.tickers = tickers
+        self.codes = codes
+        self.dates = dates
+        self.values = values
+        self.offsets = offsets
+        self._index = {t: i for i, t in enumerate(tickers)}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, column):
+        return self.values[column]
+
+    @property
+    def columns(self):
+        return list(self.values)
+
+    def code(self, ticker):
+        """종목코드 → 정수 코드 (없으면 None)"""
+        return self._index.get(str(ticker).zfill(_TICKER_WIDTH))
+
+    def rows(self, ticker):
+        """종목의 행 구간 (slice, 없으면 빈 구간)"""
+        i = self.code(ticker)
+        if i is None:
+            return slice(0, 0)
+        return slice(int(self.offsets[i]), int(self.offsets[i + 1]))
+
+    def to_frame(self):
+        """
+        → DataFrame (ticker, date, 가격 float64, 거래량 int64, NULL 가격은 NaN)
+        NULL 거래량이 있으면 거래량은 float64 + NaN (pd.read_sql과 같은 결과)
+        """
+        data = {'ticker': self.tickers[self.codes], 'date': self.dates.astype('datetime64[ns]')}
+        for name, arr in self.values.items():
+            if name == 'volume':
+                missing = arr == NA_VOLUME
+                if missing.any():
+                    out = arr.astype('float64')
+                    out[missing] = np.nan
+                    data[name] = out
+                else:
+                    data[name] = arr.astype('int64')
+            else:
+                out = arr.astype('float64')
+                if arr.dtype.kind == 'i':
+                    out[arr == NA_PRICE] = np.nan
+                data[name] = out
+        return pd.DataFrame(data)
+
+
+def _row_dtype(columns):
+    """COPY 바이너리 한 행 = int16 필드 수 + (int32 길이, 값) × 필드 (빅엔디언, 패딩 없음)"""
+    fields = [('nfields', '>i2'), ('len_ticker', '>i4'), ('ticker', f'S{_TICKER_WIDTH}'),
+              ('len_date', '>i4'), ('date', '>i4')]
+    for name in columns:
+        fields += [(f'len_{name}', '>i4'), (name, '>i8' if name == 'volume' else '>i4')]
+    return np.dtype(fields)
+
+
+def resolve_backend(backend=None):
+    """None → ANALYTICS_BACKEND 환경변수 (기본 postgres)"""
+    backend = backend or os.getenv('ANALYTICS_BACKEND') or 'postgres'
+    if backend not in BACKENDS:
+        raise ValueError(f"알 수 없는 분석 백엔드: {backend} ({', '.join(BACKENDS)})")
+    return backend
+
+
+def _select_sql(columns, start, end, tickers, backend='postgres'):
+    mark = '%s' if backend == 'postgres' else '?'
+    ticker = f"ticker::char({_TICKER_WIDTH})" if backend == 'postgres' else "ticker"
+    exprs = [f"{ticker} AS ticker", "date"]
+    for name in columns:
+        if name == 'volume':
+            exprs.append(f"COALESCE(volume, {NA_VOLUME})::int8 AS volume")
+        else:
+            exprs.append(f"COALESCE({name}::int4, {NA_PRICE}) AS {name}")
+
+    where, params = [], []
+    if start is not None:
+        where.append(f"date >= {mark}")
+        params.append(start)
+    if end is not None:
+        where.append(f"date <= {mark}")
+        params.append(end)
+    if tickers is not None:
+        where.append(f"ticker = ANY({mark})" if backend == 'postgres' else "list_contains(?, ticker)")
+        params.append([str(t).zfill(_TICKER_WIDTH) for t in tickers])
+
+    sql = f"SELECT {', '.join(exprs)} FROM daily_prices"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return sql + " ORDER BY ticker, date", params
+
+
+def decode_copy_binary(buf, columns):
+    """COPY 바이너리 바이트 → 구조화 배열 (고정 폭 행 레이아웃이 아니면 ValueError)"""
+    view = memoryview(buf)
+    if bytes(view[:11]) != _SIGNATURE:
+        raise ValueError("COPY 바이너리 형식이 아닙니다")
+    ext = int.from_bytes(view[15:19], 'big')
+    offset = 19 + ext
+    dtype = _row_dtype(columns)
+    count, rest = divmod(len(view) - offset - 2, dtype.itemsize)      # 마지막 2바이트: 종료 표시 (-1)
+    if rest or int.from_bytes(view[-2:], 'big', signed=True) != -1:
+        raise ValueError("COPY 바이너리 행 길이가 고정 폭이 아닙니다")
+    rows = np.frombuffer(view, dtype=dtype, count=count, offset=offset)
+
+    expected = {'nfields': 2 + len(columns), 'len_ticker': _TICKER_WIDTH, 'len_date': 4}
+    expected.update({f'len_{c}': 8 if c == 'volume' else 4 for c in columns})
+    for name, value in expected.items():
+        if count and not (rows[name] == value).all():
+            raise ValueError(f"COPY 바이너리 필드 길이 불일치: {name}")
+    return rows
+
+
+def _build_panel(raw_tickers, days, raw_values, columns, price_dtype):
+    """(ticker, date) 정렬 배열 → PricePanel (days: 1970-01-01 기준 일수)"""
+    # ticker 정렬이므로 종목이 바뀌는 행 = 구간 시작
+    n = len(raw_tickers)
+    starts = np.flatnonzero(np.r_[True, raw_tickers[1:] != raw_tickers[:-1]]) if n else np.array([], dtype=np.int64)
+    lookup = np.asarray(raw_tickers[starts]).astype(str)
+    codes = np.zeros(n, dtype=np.int32)
+    if len(starts) > 1:
+        codes[starts[1:]] = 1
+        codes = np.cumsum(codes, dtype=np.int32)
+    offsets = np.r_[starts, n].astype(np.int64)
+
+    dates = np.asarray(days, dtype=np.int64).astype('datetime64[D]')
+    values = {}
+    for name in columns:
+        raw = raw_values[name]
+        if name == 'volume':
+            values[name] = raw.astype(np.int64)
+        elif price_dtype == 'float32':
+            arr = raw.astype(np.float32)
+            arr[raw == NA_PRICE] = np.nan
+            values[name] = arr
+        else:
+            values[name] = raw.astype(np.int32)
+    return PricePanel(lookup, codes, dates, values, offsets)
+
+
+def _load_postgres(sql, params, columns):
+    buf = io.BytesIO()
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.copy_expert(f"COPY ({cur.mogrify(sql, params).decode()}) TO STDOUT WITH (FORMAT binary)", buf)
+    rows = decode_copy_binary(buf.getbuffer(), columns)
+    days = rows['date'].astype(np.int64) + _PG_EPOCH_DAYS
+    return rows['ticker'], days, {name: rows[name] for name in columns}
+
+
+def _load_duckdb(sql, params, columns):
+    from analytics_db import connect
+    con = connect()
+    try:
+        table = con.execute(sql, params).fetch_arrow_table()
+    finally:
+        con.close()
+    raw_tickers = table['ticker'].to_numpy()
+    days = table['date'].cast('int32').to_numpy()
+    return raw_tickers, days, {name: table[name].to_numpy() for name in columns}
+
+
+def load_panel(start=None, end=None, columns=None, tickers=None, price_dtype='int32', backend=None):
+    """
+    daily_prices → PricePanel
+
+    Args:
+        start, end: 날짜 범위 (date, 포함)
+        columns: open/high/low/close/volume 중 필요한 컬럼 (기본: 전체)
+        tickers: 종목 제한
+        price_dtype: 'int32' (원 단위 그대로, NULL은 NA_PRICE) 또는 'float32' (NULL은 NaN)
+        backend: 'postgres' (바이너리 COPY) / 'duckdb' (로컬 미러), None이면 ANALYTICS_BACKEND
+    """
+    columns = [c for c in (columns or VALUE_FIELDS) if c in VALUE_FIELDS]
+    backend = resolve_backend(backend)
+    sql, params = _select_sql(columns, start, end, tickers, backend)
+    load = _load_duckdb if backend == 'duckdb' else _load_postgres
+    raw_tickers, days, raw_values = load(sql, params, columns)
+    return _build_panel(raw_tickers, days, raw_values, columns, price_dtype)
+
+
+def query(sql, params=None, backend=None, frames=None):
+    """
+    분석 SQL → DataFrame
+    SQL은 %s 파라미터로 작성 (duckdb 백엔드에서는 ?로 바꿔 실행)
+    frames: {이름: DataFrame} 쿼리에서 테이블로 참조 (duckdb 백엔드 전용)
+    """
+    if resolve_backend(backend) == 'postgres':
+        if frames:
+            raise ValueError("frames는 duckdb 백엔드에서만 사용할 수 있습니다")
+        with get_db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            return pd.DataFrame(cur.fetchall(), columns=[d[0] for d in cur.description])
+
+    from analytics_db import connect
+    con = connect()
+    try:
+        for name, df in (frames or {}).items():
+            con.register(name, df)
+        return con.execute(sql.replace('%s', '?'), list(params or [])).df()
+    finally:
+        con.close()
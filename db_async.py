@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+비동기 DB 접근 (asyncpg)
+- db_config와 같은 접속 설정 / 풀 크기 / 타임아웃으로 asyncpg 연결 풀 생성
+- AsyncUpsertWriter: 수집 코루틴이 종목 결과를 넣으면 배치로 모아 연결별 임시 테이블에 COPY → upsert
+  (bulk_loader 로더의 prepare / upsert SQL 그대로 사용), 배치 여러 개를 동시에 저장
+  → 다음 종목을 받는 동안 앞 종목이 저장되어 네트워크 I/O와 DB I/O가 겹침
+
+사용법:
+    async def main():
+        pool = await create_pool()
+        async with AsyncUpsertWriter(pool, DailyPriceLoader) as writer:
+            await writer.put(df)        # 코루틴에서 (저장 중인 배치가 많으면 대기, 메모리 상한)
+            writer.add(df)              # 이벤트 루프 안의 동기 콜백에서 (대기 없음)
+        print(writer.stats)
+        await pool.close()
+"""
+import asyncio
+import time
+from io import BytesIO
+
+import asyncpg
+import pandas as pd
+
+from db_config import db_config
+from partitions import ensure_sql, is_partitioned
+
+
+async def create_pool(min_size=None, max_size=None, config=db_config):
+    """db_config 설정 (DB_HOST ... DB_POOL_MAX, DB_CONNECT_TIMEOUT, DB_STATEMENT_TIMEOUT) 으로 asyncpg 풀 생성"""
+    return await asyncpg.create_pool(
+        host=config.host,
+        port=int(config.port),
+        database=config.database,
+        user=config.user,
+        password=config.password or None,
+        min_size=config.minconn if min_size is None else min_size,
+        max_size=config.maxconn if max_size is None else max_size,
+        timeout=config.connect_timeout,
+        server_settings={'statement_timeout': str(config.statement_timeout)},
+    )
+
+
+async def fetch_df(pool, query, *args):
+    """SELECT → DataFrame ($1, $2 ... 위치 파라미터)"""
+    async with pool.acquire() as conn:
+        records = await conn.fetch(query, *args)
+    if not records:
+        return pd.DataFrame()
+    return pd.DataFrame([tuple(r) for r in records], columns=list(records[0].keys()))
+
+
+class AsyncUpsertWriter:
+    """
+    비동기 배치 upsert
+
+    Args:
+        pool: asyncpg 풀
+        loader: bulk_loader.StagedUpsertLoader 하위 클래스 (대상 테이블, prepare, upsert SQL)
+        batch_rows: 이 행 수가 모이면 배치 저장 시작
+        max_inflight: 동시에 저장 중인 배치 수 (풀 연결 수 이하)
+    """
+
+    def __init__(self, pool, loader, batch_rows=20000, max_inflight=2):
+        self.pool = pool
+        self.loader = loader
+        self.batch_rows = batch_rows
+        self.max_inflight = max_inflight
+        self.temp_table = f"{loader.staging_table}_async"
+        self.partitioned = is_partitioned(loader.table)
+        self._slots = asyncio.Semaphore(max_inflight)
+        self._buffer = []
+        self._buffered_rows = 0
+        self._tasks = set()
+        self._errors = []
+        self._start = time.perf_counter()
+        self.stats = {'rows': 0, 'inserted': 0, 'updated': 0, 'batches': 0,
+                      'tickers': set(), 'db_seconds': 0.0, 'elapsed': 0.0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.close()
+        else:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        return False
+
+    def add(self, df):
+        """
+        DataFrame 추가 (동기 콜백용, 배치가 차면 저장 작업을 띄우고 바로 반환)
+        대기하지 않으므로 저장보다 빨리 넣으면 저장 대기 배치가 계속 늘어남 → 코루틴에서는 put() 사용
+        """
+        if self._errors:
+            raise self._errors[0]
+        if df is None or df.empty:
+            return
+        self._buffer.append(df)
+        self._buffered_rows += len(df)
+        if self._buffered_rows >= self.batch_rows:
+            self._submit()
+
+    async def put(self, df):
+        """DataFrame 추가 (코루틴용, 저장 중인 배치가 max_inflight보다 많으면 대기)"""
+        self.add(df)
+        while len(self._tasks) > self.max_inflight and not self._errors:
+            await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+
+    def _submit(self):
+        if not self._buffer:
+            return
+        chunk = pd.concat(self._buffer, ignore_index=True)
+        self._buffer = []
+        self._buffered_rows = 0
+        task = asyncio.get_running_loop().create_task(self._flush(chunk))
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+
+    def _done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self._errors.append(task.exception())
+
+    async def _flush(self, chunk):
+        """배치 하나: 연결별 임시 테이블에 CSV COPY → upsert (한 트랜잭션)"""
+        chunk = self.loader.prepare(chunk)
+        buf = BytesIO()
+        chunk.to_csv(buf, index=False, header=False, columns=self.loader.columns)
+        buf.seek(0)
+
+        async with self._slots:
+            start = time.perf_counter()
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute(f"""
+                        CREATE TEMP TABLE IF NOT EXISTS {self.temp_table}
+                        ({self.loader.staging_ddl}) ON COMMIT DELETE ROWS
+                    """)
+                    await conn.copy_to_table(self.temp_table, source=buf,
+                                             columns=self.loader.columns, format='csv')
+                    if self.partitioned:
+                        await conn.execute(ensure_sql(self.loader.table, self.temp_table))
+                    inserted, total = await conn.fetchrow(self.loader.upsert_sql(self.temp_table))
+
+        st = self.stats
+        st['rows'] += total
+        st['inserted'] += inserted
+        st['updated'] += total - inserted
+        st['batches'] += 1
+        st['tickers'].update(chunk['ticker'].unique())
+        st['db_seconds'] += time.perf_counter() - start
+
+    async def close(self):
+        """남은 버퍼 저장 후 모든 배치 완료 대기 (배치 오류는 여기서 다시 발생)"""
+        self._submit()
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        self.stats['elapsed'] = time.perf_counter() - self._start
+        if self._errors:
+            raise self._errors[0]
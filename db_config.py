@@ -2,11 +2,24 @@
 # -*- coding: utf-8 -*-
 """
 PostgreSQL 데이터베이스 연결 설정
+- 스레드 안전 연결 풀 (Streamlit 동시 세션, 수집 스레드가 함께 사용)
+  · 풀이 가득 차면 예외 대신 반납될 때까지 대기 (DB_POOL_TIMEOUT 초까지)
+  · 꺼낼 때 끊긴 연결은 버리고, 오래 쉬던 연결은 SELECT 1로 확인 후 사용
+  · 접속 타임아웃 / 문장 타임아웃 (DB_CONNECT_TIMEOUT, DB_STATEMENT_TIMEOUT)
+- 지표: 대기 시간, 사용 중 연결 수, 쿼리 수, 오류 수 (db_config.stats())
+- VACUUM용 autocommit 전용 연결 (maintenance_connection, vacuum_analyze)
+- 쿼리 지연 계측 (opt-in, DB_QUERY_STATS=1 또는 enable_query_stats()): 커서 실행별 지문/지연/행 수/호출 위치
+  → query_stats.py 링 버퍼 → query_stats 테이블, 실행 단위 구분은 query_run()
 """
 
+import contextvars
 import os
+import threading
+import time
+import uuid
+from collections import deque
 import psycopg2
-from psycopg2 import pool
+from psycopg2 import extensions, pool
 from dotenv import load_dotenv
 from contextlib import contextmanager
 import logging
@@ -15,6 +28,214 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 
+class PoolStats:
+    """연결 풀 지표 (스레드 안전 카운터)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.in_use = 0
+            self.peak_in_use = 0
+            self.opened = 0
+            self.discarded = 0
+            self.queries = 0
+            self.errors = 0
+
+    def add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def checkout(self, waited):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'wait_avg_ms': self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0,
+                'wait_max_ms': self.wait_max * 1000,
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                'opened': self.opened,
+                'discarded': self.discarded,
+                'queries': self.queries,
+                'errors': self.errors,
+            }
+
+
+# 쿼리 지연 기록기 (query_stats.QueryRecorder, enable_query_stats() 전에는 None → 계측 비용 없음)
+_query_recorder = None
+# 현재 실행 단위 (페이지 렌더, 파이프라인 실행 등), None이면 기록기의 기본값 (스크립트 실행 1회)
+_query_run = contextvars.ContextVar('query_run', default=None)
+
+
+class CountingCursor(extensions.cursor):
+    """execute / executemany / COPY 호출 수를 연결의 풀 지표에 더하는 커서 (계측 켜면 지연도 기록)"""
+
+    def _count(self):
+        stats = getattr(self.connection, 'stats', None)
+        if stats is not None:
+            stats.add(queries=1)
+
+    def _timed(self, call, query, *args):
+        self._count()
+        recorder = _query_recorder
+        if recorder is None:
+            return call(query, *args)
+        start = time.perf_counter()
+        try:
+            return call(query, *args)
+        finally:
+            recorder.record(query, time.perf_counter() - start, self.rowcount, _query_run.get())
+
+    def execute(self, query, vars=None):
+        return self._timed(super().execute, query, vars)
+
+    def executemany(self, query, vars_list):
+        return self._timed(super().executemany, query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        return self._timed(super().copy_expert, sql, file, size)
+
+
+class PooledConnection(extensions.connection):
+    """풀 지표와 마지막 사용 시각을 가진 연결"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = None
+        self.last_used = time.monotonic()
+        self.cursor_factory = CountingCursor
+
+
+class InstrumentedPool:
+    """
+    스레드 안전 연결 풀 (psycopg2 SimpleConnectionPool 대체)
+
+    Args:
+        minconn / maxconn: 미리 여는 연결 수 / 최대 연결 수
+        timeout: 빈 연결을 기다리는 최대 시간 (초), 넘으면 pool.PoolError
+        validate_after: 이 시간(초) 이상 쉬던 연결은 꺼낼 때 SELECT 1로 확인
+        connect_kwargs: psycopg2.connect 인자
+    """
+
+    def __init__(self, minconn, maxconn, timeout=30.0, validate_after=30.0, stats=None, **connect_kwargs):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.validate_after = validate_after
+        self.connect_kwargs = connect_kwargs
+        self.stats = stats or PoolStats()
+        self.closed = False
+        self._idle = deque()
+        self._open = 0
+        self._cond = threading.Condition()
+        for _ in range(minconn):
+            self._idle.append(self._connect())
+            self._open += 1
+
+    def _connect(self):
+        conn = psycopg2.connect(connection_factory=PooledConnection, **self.connect_kwargs)
+        conn.stats = self.stats
+        self.stats.add(opened=1)
+        return conn
+
+    def _usable(self, conn):
+        """끊긴 연결 / 오래 쉰 뒤 응답 없는 연결 → False"""
+        if conn.closed:
+            return False
+        if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                return False
+        if time.monotonic() - conn.last_used < self.validate_after:
+            return True
+        try:
+            with conn.cursor(cursor_factory=extensions.cursor) as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        self.stats.add(discarded=1)
+
+    def getconn(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        while True:
+            with self._cond:
+                if self.closed:
+                    raise pool.PoolError("connection pool is closed")
+                while not self._idle and self._open >= self.maxconn:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats.add(errors=1)
+                        raise pool.PoolError(f"no connection available within {self.timeout:.0f}s "
+                                             f"(maxconn={self.maxconn})")
+                    self._cond.wait(remaining)
+                conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    self._open += 1     # 자리를 먼저 잡고 접속은 락 밖에서
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    self.stats.add(errors=1)
+                    raise
+            elif not self._usable(conn):
+                self._discard(conn)
+                with self._cond:
+                    self._open -= 1
+                continue
+
+            self.stats.checkout(time.monotonic() - start)
+            return conn
+
+    def putconn(self, conn, close=False):
+        self.stats.add(in_use=-1)
+        conn.last_used = time.monotonic()
+        with self._cond:
+            if close or conn.closed or self.closed:
+                self._open -= 1
+                if not conn.closed:
+                    conn.close()
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            self.closed = True
+            while self._idle:
+                self._idle.pop().close()
+                self._open -= 1
+            self._cond.notify_all()
+
+
 class DatabaseConfig:
     """데이터베이스 연결 설정"""
 
@@ -26,47 +247,98 @@ class DatabaseConfig:
         self.user = os.getenv("DB_USER", "postgres")
         self.password = os.getenv("DB_PASSWORD", "")
 
+        # 풀 크기 / 타임아웃
+        self.minconn = int(os.getenv("DB_POOL_MIN", "1"))
+        self.maxconn = int(os.getenv("DB_POOL_MAX", "10"))
+        self.pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", "30"))           # 빈 연결 대기 (초)
+        self.connect_timeout = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))       # 접속 (초)
+        self.statement_timeout = int(os.getenv("DB_STATEMENT_TIMEOUT", "0"))    # 문장 (ms, 0: 제한 없음)
+
         # 연결 풀 생성
         self.connection_pool = None
+        self.stats = PoolStats()
+        self._init_lock = threading.Lock()
 
     def get_connection_string(self):
         """PostgreSQL 연결 문자열 반환"""
         return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
 
-    def init_pool(self, minconn=1, maxconn=10):
+    def connect_kwargs(self, statement_timeout=None):
+        """psycopg2.connect 인자 (statement_timeout ms, None이면 설정값)"""
+        statement_timeout = self.statement_timeout if statement_timeout is None else statement_timeout
+        return {
+            'host': self.host,
+            'port': self.port,
+            'database': self.database,
+            'user': self.user,
+            'password': self.password,
+            'connect_timeout': self.connect_timeout,
+            'options': f"-c statement_timeout={statement_timeout}",
+        }
+
+    def init_pool(self, minconn=None, maxconn=None):
         """연결 풀 초기화"""
+        minconn = self.minconn if minconn is None else minconn
+        maxconn = self.maxconn if maxconn is None else maxconn
         try:
-            self.connection_pool = psycopg2.pool.SimpleConnectionPool(
-                minconn,
-                maxconn,
-                host=self.host,
-                port=self.port,
-                database=self.database,
-                user=self.user,
-                password=self.password
-            )
+            with self._init_lock:
+                if self.connection_pool is not None:
+                    self.connection_pool.closeall()
+                self.connection_pool = InstrumentedPool(
+                    minconn, maxconn, timeout=self.pool_timeout, stats=self.stats, **self.connect_kwargs()
+                )
             logger.info(f"✅ DB 연결 풀 초기화 완료 (min={minconn}, max={maxconn})")
             return True
         except Exception as e:
             logger.error(f"❌ DB 연결 풀 초기화 실패: {e}")
             return False
 
+    def _pool(self):
+        if self.connection_pool is None or self.connection_pool.closed:
+            with self._init_lock:
+                if self.connection_pool is None or self.connection_pool.closed:
+                    self.connection_pool = InstrumentedPool(
+                        self.minconn, self.maxconn, timeout=self.pool_timeout, stats=self.stats,
+                        **self.connect_kwargs()
+                    )
+        return self.connection_pool
+
     @contextmanager
     def get_connection(self):
         """연결 풀에서 연결 가져오기 (컨텍스트 매니저)"""
-        if not self.connection_pool:
-            self.init_pool()
-
-        conn = self.connection_pool.getconn()
+        connection_pool = self._pool()
+        conn = connection_pool.getconn()
+        broken = False
         try:
             yield conn
             conn.commit()
         except Exception as e:
-            conn.rollback()
+            self.stats.add(errors=1)
+            broken = conn.closed or isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
             logger.error(f"DB 작업 중 오류: {e}")
             raise
         finally:
-            self.connection_pool.putconn(conn)
+            connection_pool.putconn(conn, close=broken)
+
+    @contextmanager
+    def maintenance_connection(self):
+        """VACUUM 등 트랜잭션 밖에서 실행해야 하는 작업용 autocommit 전용 연결 (풀과 별도, 문장 타임아웃 없음)"""
+        conn = psycopg2.connect(connection_factory=PooledConnection, **self.connect_kwargs(statement_timeout=0))
+        conn.stats = self.stats
+        conn.autocommit = True
+        self.stats.add(opened=1)
+        try:
+            yield conn
+        except Exception:
+            self.stats.add(errors=1)
+            raise
+        finally:
+            conn.close()
 
     def close_pool(self):
         """연결 풀 종료"""
@@ -86,6 +358,45 @@ def get_db_connection():
         yield conn
 
 
+@contextmanager
+def get_maintenance_connection():
+    """autocommit 전용 연결 (VACUUM 등)"""
+    with db_config.maintenance_connection() as conn:
+        yield conn
+
+
+def vacuum_analyze(*tables):
+    """VACUUM ANALYZE (autocommit 전용 연결에서 테이블별 실행)"""
+    with get_maintenance_connection() as conn:
+        with conn.cursor() as cur:
+            for table in tables:
+                cur.execute(f"VACUUM ANALYZE {table}")
+
+
+def stats():
+    """연결 풀 지표 (checkouts, 대기 시간, 사용 중 연결, 쿼리 수, 오류 수)"""
+    return db_config.stats.snapshot()
+
+
+def enable_query_stats(**kwargs):
+    """쿼리 지연 계측 시작 (이미 켜져 있으면 그대로), kwargs는 QueryRecorder 인자 → 기록기 반환"""
+    global _query_recorder
+    if _query_recorder is None:
+        from query_stats import QueryRecorder
+        _query_recorder = QueryRecorder(**kwargs).start()
+    return _query_recorder
+
+
+@contextmanager
+def query_run(label):
+    """이 블록의 쿼리를 하나의 실행 단위로 묶음 (N+1 탐지 단위, 예: 'page:stock_pool')"""
+    token = _query_run.set(f"{label}:{uuid.uuid4().hex[:8]}")
+    try:
+        yield
+    finally:
+        _query_run.reset(token)
+
+
 def execute_query(query, params=None, fetch=False):
     """
     쿼리 실행 헬퍼 함수
@@ -106,6 +417,10 @@ def execute_query(query, params=None, fetch=False):
             return None
 
 
+if os.getenv('DB_QUERY_STATS', '').lower() in ('1', 'true', 'yes'):
+    enable_query_stats()
+
+
 if __name__ == "__main__":
     """연결 테스트"""
     logging.basicConfig(level=logging.INFO)
@@ -122,6 +437,7 @@ if __name__ == "__main__":
                     print(f"✅ 연결 성공!")
                     print(f"PostgreSQL 버전: {version[0]}")
 
+            print(f"📊 풀 지표: {stats()}")
             db_config.close_pool()
         else:
             print("❌ 연결 실패")
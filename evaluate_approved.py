@@ -11,6 +11,16 @@ from datetime import datetime, timedelta
 from db_config import get_db_connection
 from update_ai_report_status import sync_ai_report_status
 
+# 탈락 기준 (param_sweep.py 파라미터 탐색과 공유)
+EXIT_PARAMS = {
+    'max_hold': 7,          # 최대 보유 기간 (일)
+    'min_hold': 3,          # 재평가 시작 보유 기간 (일)
+    'score_drop': 20,       # final_score 하락률 (%) 초과 시 탈락
+    'rsi_max': 75,          # RSI 초과 + 종가 < MA5 시 탈락
+    'vol_drop': 50,         # 3일 평균 거래량이 60일 평균의 이 비율(%) 미만이면 탈락
+    'keep_rank': 100,       # Stock Pool 순위 밖으로 밀리면 탈락
+}
+
 
 def get_approved_stocks():
     """승인된 종목 조회 (approved_date, final_score 포함)"""
@@ -33,10 +43,11 @@ def get_approved_stocks():
 def get_latest_rsi_ma5(ticker):
     """최신 RSI, close, MA5 조회"""
     query = """
-    SELECT rsi, close, ma5
-    FROM stock_monitoring_history
-    WHERE ticker = %s AND rsi IS NOT NULL
-    ORDER BY date DESC
+    SELECT i.rsi14 AS rsi, p.close, i.ma5
+    FROM daily_indicators i
+    JOIN daily_prices p ON p.ticker = i.ticker AND p.date = i.date
+    WHERE i.ticker = %s AND i.rsi14 IS NOT NULL
+    ORDER BY i.date DESC
     LIMIT 1
     """
     with get_db_connection() as conn:
@@ -54,8 +65,8 @@ def get_volume_averages(ticker):
     SELECT
         AVG(volume) FILTER (WHERE date >= CURRENT_DATE - INTERVAL '3 days') as avg_3d,
         AVG(volume) FILTER (WHERE date >= CURRENT_DATE - INTERVAL '60 days') as avg_60d
-    FROM stock_monitoring_history
-    WHERE ticker = %s
+    FROM daily_prices
+    WHERE ticker = %s AND date >= CURRENT_DATE - INTERVAL '60 days'
     """
     with get_db_connection() as conn:
         result = pd.read_sql(query, conn, params=(ticker,))
@@ -66,8 +77,8 @@ def get_volume_averages(ticker):
     return result.iloc[0]['avg_3d'], result.iloc[0]['avg_60d']
 
 
-def is_in_top_100(ticker):
-    """현재 Stock Pool Top 100 내에 있는지 확인"""
+def is_in_top_100(ticker, limit=100):
+    """현재 Stock Pool Top 100 (limit) 내에 있는지 확인"""
     query = """
     SELECT COUNT(*) as rank
     FROM (
@@ -76,11 +87,11 @@ def is_in_top_100(ticker):
         WHERE status = 'monitoring'
         AND added_date = CURRENT_DATE
     ) ranked
-    WHERE ticker = %s AND rn <= 100
+    WHERE ticker = %s AND rn <= %s
     """
     with get_db_connection() as conn:
         cur = conn.cursor()
-        cur.execute(query, (ticker,))
+        cur.execute(query, (ticker, limit))
         result = cur.fetchone()
 
     return result[0] > 0 if result else False
@@ -108,40 +119,40 @@ def get_initial_score(ticker, approved_date):
     return result.iloc[0]['final_score'] if len(result) > 0 else None
 
 
-def evaluate_stock(ticker, name, current_score, initial_score, days_held):
+def evaluate_stock(ticker, name, current_score, initial_score, days_held, params=EXIT_PARAMS):
     """종목 재평가 - 탈락 기준 체크"""
     drop_reasons = []
 
     # 1. 최대 보유 기간 (7일)
-    if days_held >= 7:
-        drop_reasons.append(f"최대 보유 기간 초과 ({days_held}일 >= 7일)")
+    if days_held >= params['max_hold']:
+        drop_reasons.append(f"최대 보유 기간 초과 ({days_held}일 >= {params['max_hold']}일)")
 
     # 재평가 대상 (3일 이상)만 상세 평가
-    if days_held < 3:
+    if days_held < params['min_hold']:
         return False, []  # 3일 미만은 재평가 제외
 
     # 2. final_score 20% 이상 하락
     if initial_score and current_score:
         score_change = ((current_score - initial_score) / initial_score) * 100
-        if score_change < -20:
-            drop_reasons.append(f"점수 20% 이상 하락 ({score_change:.1f}%)")
+        if score_change < -params['score_drop']:
+            drop_reasons.append(f"점수 {params['score_drop']}% 이상 하락 ({score_change:.1f}%)")
 
     # 3. RSI > 75 AND close < MA5
     rsi, close, ma5 = get_latest_rsi_ma5(ticker)
     if rsi and close and ma5:
-        if rsi > 75 and close < ma5:
-            drop_reasons.append(f"과매수 + 하락 신호 (RSI={rsi:.1f} > 75, 종가 < MA5)")
+        if rsi > params['rsi_max'] and close < ma5:
+            drop_reasons.append(f"과매수 + 하락 신호 (RSI={rsi:.1f} > {params['rsi_max']}, 종가 < MA5)")
 
     # 4. 거래량 급감 (3일 평균 < 60일 평균 * 50%)
     avg_3d, avg_60d = get_volume_averages(ticker)
     if avg_3d and avg_60d:
         volume_ratio = (avg_3d / avg_60d) * 100
-        if volume_ratio < 50:
+        if volume_ratio < params['vol_drop']:
             drop_reasons.append(f"거래량 급감 (3일 평균 = 60일 평균의 {volume_ratio:.1f}%)")
 
     # 5. Top 100 탈락
-    if not is_in_top_100(ticker):
-        drop_reasons.append("Stock Pool Top 100 탈락")
+    if not is_in_top_100(ticker, params['keep_rank']):
+        drop_reasons.append(f"Stock Pool Top {params['keep_rank']} 탈락")
 
     # 탈락 여부 결정
     should_drop = len(drop_reasons) > 0
@@ -205,11 +216,11 @@ def main():
         )
 
         # 3일 이상만 재평가 대상
-        if days_held >= 3:
+        if days_held >= EXIT_PARAMS['min_hold']:
             evaluated_count += 1
 
         # 상태 표시
-        status_icon = "⚠️" if days_held >= 3 else "⏳"
+        status_icon = "⚠️" if days_held >= EXIT_PARAMS['min_hold'] else "⏳"
         print(f"{status_icon} {ticker} {name}")
         print(f"   보유 {days_held}일 | 점수: {initial_score:.1f} → {current_score:.1f}")
 
@@ -221,7 +232,7 @@ def main():
             update_stock_status(ticker, 'rejected', drop_reason_str)
             dropped_count += 1
         else:
-            if days_held >= 3:
+            if days_held >= EXIT_PARAMS['min_hold']:
                 print(f"   ✅ 조건 유지 (계속 모니터링)")
             else:
                 print(f"   ⏳ 재평가 대기 중 (3일 후 평가)")
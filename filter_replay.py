@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+quick_filter 선정 결과 과거 재현 (거래일 전체)
+- 가격 패널 한 번으로 모든 (date, ticker)의 필터 지표 계산: 거래대금, 5일 등락률, 20일 거래량 대비
+  (quick_filter.score_universe를 날짜마다 다시 돌린 것과 같은 값, 종목 경계 인덱스 + 누적합)
+- 날짜별 필터 통과 종목 안에서 Min-Max 정규화 → 가중 점수 → 상위 N개 (quick_filter.rank_scores와 같은 규칙)
+- 선정 종목의 1/3/5/7거래일 후 수익률과 같은 날 전체 후보 평균 비교
+- 그날 거래가 없는 종목(거래 정지 등)은 그날 후보에서 제외 (실제 실행은 마지막 거래일 값으로 점수 계산)
+
+사용법:
+    python filter_replay.py                       # 최근 400일 패널, 결과 CSV
+    python filter_replay.py --top 100 --to-db     # filter_replay_picks 테이블에 저장
+    python filter_replay.py --w-value 0.5 --w-momentum 0.25 --w-volume 0.25
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from bulk_loader import REPLAY_PICK_COLUMNS, ReplayPickLoader
+from quick_filter import FILTER_PARAMS, window_mean
+
+LOOKBACK_DAYS = 60      # quick_filter 기본 조회 기간 (달력일)
+MIN_ROWS = 20           # calculate_stock_score 최소 거래일
+HORIZONS = (1, 3, 5, 7)
+
+
+
+def compute_features(df, lookback_days=LOOKBACK_DAYS, horizons=HORIZONS):
+    """
+    (ticker, date) 패널 → 후보가 될 수 있는 모든 (date, ticker) 행의 필터 지표 + 앞으로의 수익률(%)
+    후보 조건: 그날까지 lookback_days 달력일 안에 MIN_ROWS 거래일 이상
+    """
+    df = df.sort_values(['ticker', 'date'], kind='stable').reset_index(drop=True)
+    n = len(df)
+    codes, _ = pd.factorize(df['ticker'], sort=True)
+    close = df['close'].to_numpy(dtype=float)
+    volume = df['volume'].to_numpy()
+    days = df['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+
+    rows = np.arange(n)
+    ends = np.searchsorted(codes, codes, side='right') - 1
+
+    # 조회 기간 안의 거래일 수: 같은 종목에서 (날짜 - lookback_days) 이후 첫 행까지
+    key = codes.astype(np.int64) * (1 << 32) + days
+    first_in_window = np.searchsorted(key, key - lookback_days, side='left')
+    eligible = (rows - first_in_window + 1) >= MIN_ROWS
+
+    idx = rows[eligible]
+    last_close = close[idx]
+    last_volume = volume[idx]
+    base_close = close[idx - 4]
+
+    # 20일 거래량 평균 (score_universe와 같은 계산, NULL 거래량은 건너뜀)
+    vol_avg_20 = window_mean(volume, idx)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change_5d = np.where(base_close > 0, (last_close - base_close) / base_close * 100, 0)
+        vol_ratio = np.where(vol_avg_20 > 0, last_volume / vol_avg_20, 0)
+
+    features = pd.DataFrame({
+        'ticker': df['ticker'].to_numpy()[idx],
+        'date': df['date'].to_numpy()[idx],
+        'close': last_close,
+        'volume': last_volume,
+        'trading_value': last_close * last_volume,
+        'change_5d': change_5d,
+        'vol_ratio': vol_ratio,
+    })
+
+    # h거래일 후 종가 수익률 (같은 종목 안에서만, 아직 오지 않은 날은 NaN)
+    for h in horizons:
+        ahead = idx + h
+        valid = ahead <= ends[idx]
+        future = close[np.minimum(ahead, n - 1)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            features[f"fwd_{h}d"] = np.where(valid, (future / last_close - 1) * 100, np.nan)
+    return features
+
+
+def select_daily(features, params=FILTER_PARAMS, top_n=500):
+    """날짜별 필터 → 정규화 가중 점수 → 상위 top_n (rank 1부터)"""
+    f = features[
+        (features['trading_value'] > params['min_trading_value']) &
+        (features['change_5d'] > params['min_change_5d']) &
+        (features['vol_ratio'] > params['min_vol_ratio']) &
+        (features['close'] > params['min_close'])
+    ].copy()
+
+    by_date = f.groupby('date')
+    scores = {}
+    for col in ('trading_value', 'change_5d', 'vol_ratio'):
+        lo = by_date[col].transform('min')
+        hi = by_date[col].transform('max')
+        scores[col] = (f[col] - lo) / (hi - lo) * 100
+    f['final_score'] = (scores['trading_value'] * params['w_value'] +
+                        scores['change_5d'] * params['w_momentum'] +
+                        scores['vol_ratio'] * params['w_volume'])
+
+    f = f.sort_values(['date', 'final_score'], ascending=[True, False], kind='stable')
+    f['rank'] = f.groupby('date').cumcount() + 1
+    return f[f['rank'] <= top_n][REPLAY_PICK_COLUMNS].reset_index(drop=True)
+
+
+def summarize(picks, features, horizons=HORIZONS):
+    """보유 기간별 선정 종목 평균 수익률 vs 같은 날 전체 후보 평균 (날짜별 평균의 평균)"""
+    rows = []
+    for h in horizons:
+        col = f"fwd_{h}d"
+        p = picks.dropna(subset=[col]).groupby('date')[col]
+        u = features.dropna(subset=[col]).groupby('date')[col].mean()
+        pick_mean = p.mean()
+        if pick_mean.empty:
+            continue
+        excess = pick_mean - u.reindex(pick_mean.index)
+        rows.append({
+            'horizon': f"{h}d",
+            'days': len(pick_mean),
+            'picks_avg': pick_mean.mean(),
+            'universe_avg': u.reindex(pick_mean.index).mean(),
+            'excess': excess.mean(),
+            'beat_days': (excess > 0).mean() * 100,
+            'hit_rate': (picks[col].dropna() > 0).mean() * 100,
+        })
+    return pd.DataFrame(rows)
+
+
+def save_picks_to_db(picks):
+    """재현 구간의 기존 선정 결과를 지우고 새로 저장 (규칙이 바뀌면 날짜별 구성이 달라지므로)"""
+    with ReplayPickLoader(verbose=False) as loader:
+        with loader.conn.cursor() as cur:
+            cur.execute("DELETE FROM filter_replay_picks WHERE date BETWEEN %s AND %s",
+                        (picks['date'].min().date(), picks['date'].max().date()))
+        loader.conn.commit()
+        loader.write(picks)
+    return loader.stats['rows']
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from price_store import load_price_panel
+
+    parser = argparse.ArgumentParser(description='Replay the quick_filter selection over past trading days')
+    parser.add_argument('--days-back', type=int, default=400, help='Calendar days of price history to load')
+    parser.add_argument('--lookback', type=int, default=LOOKBACK_DAYS,
+                        help='quick_filter lookback window in calendar days')
+    parser.add_argument('--top', type=int, default=500, help='Top N picks per day')
+    parser.add_argument('--source', choices=['auto', 'store', 'db', 'duckdb'], default='auto')
+    parser.add_argument('--output', default='quick_filter_replay.csv', help='CSV for the daily picks')
+    parser.add_argument('--to-db', action='store_true', help='Also store picks in filter_replay_picks')
+    for key, value in FILTER_PARAMS.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=float, default=value)
+    args = parser.parse_args()
+
+    params = {key: getattr(args, key) for key in FILTER_PARAMS}
+
+    start = time.perf_counter()
+    panel = load_price_panel(days_back=args.days_back, columns=['close', 'volume'], source=args.source)
+    t_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    features = compute_features(panel, args.lookback)
+    picks = select_daily(features, params, args.top)
+    t_replay = time.perf_counter() - start
+
+    print(f"📊 패널 {len(panel):,}행 ({t_load:.2f}초) → 후보 {len(features):,}행, "
+          f"{picks['date'].nunique()}거래일 선정 {len(picks):,}건 ({t_replay:.2f}초)")
+
+    summary = summarize(picks, features)
+    print(f"\n=== 상위 {args.top} 보유 기간별 수익률 (%) ===")
+    print(summary.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+    picks.to_csv(args.output, index=False)
+    print(f"\n💾 일별 선정 결과: {args.output}")
+    if args.to_db:
+        print(f"💾 filter_replay_picks: {save_picks_to_db(picks):,}행 저장")
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스크레이퍼용 HTTP 응답 캐시 (디스크, 압축)
+- 키: (url, 거래일) → 장 마감 후의 페이지는 같은 거래일 안에서 내용이 바뀌지 않음
+- 본문은 zlib 압축 후 세그먼트 파일에 이어 쓰고, 위치는 SQLite 인덱스에 기록
+- 프로세스마다 자기 세그먼트 파일에만 쓰므로 multiprocessing 워커가 동시에 써도 안전
+- replay 모드: 네트워크 없이 캐시만으로 전체 실행 재현 (없는 페이지는 CacheMiss)
+
+사용법:
+    python http_cache.py --stats
+    python http_cache.py --prune 5      # 최근 5거래일 캐시만 유지
+"""
+import os
+import sqlite3
+import time
+import zlib
+from datetime import datetime, time as dtime, timedelta
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'http')
+
+MARKET_OPEN = dtime(9, 0)
+MARKET_CLOSE = dtime(15, 30)
+
+
+class CacheMiss(Exception):
+    """replay 모드에서 캐시에 없는 페이지 요청"""
+
+
+def cache_trading_date(now=None):
+    """
+    캐시 키로 쓸 거래일 (장중에는 페이지가 계속 바뀌므로 None → 캐시 사용 안 함)
+    - 평일 장 마감 후: 오늘
+    - 평일 개장 전 / 주말: 직전 평일
+    """
+    now = now or datetime.now()
+    d = now.date()
+    if d.weekday() < 5:
+        if MARKET_OPEN <= now.time() < MARKET_CLOSE:
+            return None
+        if now.time() >= MARKET_CLOSE:
+            return d.isoformat()
+    d -= timedelta(days=1)
+    while d.weekday() >= 5:
+        d -= timedelta(days=1)
+    return d.isoformat()
+
+
+class ResponseCache:
+    """
+    (url, 거래일) → HTML 캐시
+
+    Args:
+        cache_dir: 캐시 디렉터리 (index.sqlite + seg-*.bin)
+        replay: True면 네트워크를 쓰지 않고 캐시에서만 응답 (없으면 CacheMiss)
+        trading_date: 키로 쓸 거래일 (기본: 현재 시각 기준, replay면 캐시의 최신 거래일)
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, replay=False, trading_date=None):
+        self.cache_dir = cache_dir
+        self.replay = replay
+        self._trading_date = trading_date
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+
+        self._conn = None
+        self._segment = None
+        self._pid = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # multiprocessing 워커로 넘길 때는 연결/파일 핸들 없이 복사 (워커에서 다시 열기)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        state['_segment'] = None
+        state['_pid'] = None
+        return state
+
+    def _db(self):
+        if self._conn is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._segment = None
+            self._conn = sqlite3.connect(os.path.join(self.cache_dir, 'index.sqlite'), timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT NOT NULL,
+                    trading_date TEXT NOT NULL,
+                    segment TEXT NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    raw_size INTEGER NOT NULL,
+                    stored_at REAL NOT NULL,
+                    PRIMARY KEY (url, trading_date)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_date ON responses(trading_date)")
+            self._conn.commit()
+        return self._conn
+
+    @property
+    def trading_date(self):
+        """현재 실행에서 키로 쓰는 거래일 (None이면 캐시 비활성: 장중)"""
+        if self._trading_date is None:
+            if self.replay:
+                row = self._db().execute("SELECT MAX(trading_date) FROM responses").fetchone()
+                self._trading_date = row[0]
+                if self._trading_date is None:
+                    raise CacheMiss(f"replay 모드인데 캐시가 비어 있습니다: {self.cache_dir}")
+            else:
+                return cache_trading_date()
+        return self._trading_date
+
+    def get(self, url):
+        """캐시된 HTML (없으면 None, replay 모드면 CacheMiss)"""
+        trading_date = self.trading_date
+        if trading_date is None:
+            return None
+
+        row = self._db().execute(
+            "SELECT segment, offset, length FROM responses WHERE url = ? AND trading_date = ?",
+            (url, trading_date)
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            if self.replay:
+                raise CacheMiss(url)
+            return None
+
+        segment, offset, length = row
+        with open(os.path.join(self.cache_dir, segment), 'rb') as f:
+            f.seek(offset)
+            blob = f.read(length)
+        self.hits += 1
+        return zlib.decompress(blob).decode('utf-8')
+
+    def put(self, url, html):
+        """HTML 저장 (장중이거나 replay 모드면 저장하지 않음)"""
+        trading_date = self.trading_date
+        if trading_date is None or self.replay:
+            return
+
+        db = self._db()
+        if self._segment is None:
+            self._segment = f"seg-{trading_date}-{os.getpid()}.bin"
+
+        blob = zlib.compress(html.encode('utf-8'), 6)
+        path = os.path.join(self.cache_dir, self._segment)
+        with open(path, 'ab') as f:
+            offset = f.tell()
+            f.write(blob)
+
+        db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, trading_date, self._segment, offset, len(blob), len(html), time.time())
+        )
+        db.commit()
+        self.stored += 1
+
+    def get_or_fetch(self, url, fetch):
+        """동기 코드용: 캐시에 없으면 fetch(url) 호출 후 저장"""
+        html = self.get(url)
+        if html is None:
+            html = fetch(url)
+            self.put(url, html)
+        return html
+
+    def stats(self):
+        db = self._db()
+        rows = db.execute("""
+            SELECT trading_date, COUNT(*), SUM(length), SUM(raw_size)
+            FROM responses GROUP BY trading_date ORDER BY trading_date
+        """).fetchall()
+        return [{'trading_date': r[0], 'pages': r[1], 'bytes': r[2], 'raw_bytes': r[3]} for r in rows]
+
+    def prune(self, keep_dates=5):
+        """최근 keep_dates개 거래일만 남기고 인덱스/세그먼트 삭제"""
+        db = self._db()
+        dates = [r[0] for r in db.execute(
+            "SELECT DISTINCT trading_date FROM responses ORDER BY trading_date DESC")]
+        old = dates[keep_dates:]
+        if not old:
+            return 0
+
+        placeholders = ','.join('?' * len(old))
+        segments = [r[0] for r in db.execute(
+            f"SELECT DISTINCT segment FROM responses WHERE trading_date IN ({placeholders})", old)]
+        deleted = db.execute(f"DELETE FROM responses WHERE trading_date IN ({placeholders})", old).rowcount
+        db.commit()
+        for seg in segments:
+            try:
+                os.remove(os.path.join(self.cache_dir, seg))
+            except FileNotFoundError:
+                pass
+        return deleted
+
+    def summary(self):
+        return f"캐시 hit {self.hits:,} / miss {self.misses:,} / 저장 {self.stored:,}"
+
+
+def make_cache(cache_dir=None, replay=False, no_cache=False):
+    """CLI 옵션 → ResponseCache (또는 None)"""
+    if no_cache and not replay:
+        return None
+    return ResponseCache(cache_dir or DEFAULT_CACHE_DIR, replay=replay)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='HTTP response cache maintenance')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--stats', action='store_true', help='Show cached pages per trading date')
+    parser.add_argument('--prune', type=int, metavar='N', help='Keep only the latest N trading dates')
+    args = parser.parse_args()
+
+    cache = ResponseCache(args.cache_dir)
+
+    if args.prune is not None:
+        print(f"🗑️  {cache.prune(args.prune):,}개 페이지 삭제 (최근 {args.prune}거래일 유지)")
+
+    print(f"📦 캐시: {args.cache_dir}")
+    for s in cache.stats():
+        ratio = s['bytes'] / s['raw_bytes'] * 100 if s['raw_bytes'] else 0
+        print(f"   {s['trading_date']}: {s['pages']:,}페이지, "
+              f"{s['bytes']/1024/1024:.1f}MB (원본 대비 {ratio:.0f}%)")
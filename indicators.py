@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+종목별 상태를 유지하는 증분 기술 지표 라이브러리
+- 지표: SMA, EMA, Wilder RSI, SMA RSI (analysis2 방식), 롤링 최고/최저 (거래량 이동평균은 SMA(volume))
+- 상태는 종목 축 numpy 배열 (링 버퍼 + 누적합, 직전 평균 등) → 새 거래일 하루 추가는 종목당 O(1)
+- warm(): 과거 패널을 거래일 순서대로 재생해 상태 구성 (증분 update()와 같은 코드 경로)
+- save()/load(): .cache/indicator_state.npz 에 상태 저장 → 다음 실행은 새 거래일만 update()
+- 종목별로 이미 반영한 날짜(last_date) 이하의 행은 건너뜀 → 같은 날을 두 번 넣어도 안전
+
+사용법:
+    python indicators.py --warm                  # 최근 400일 패널로 상태 생성
+    python indicators.py --warm --days-back 800
+    python indicators.py --status
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'indicator_state.npz')
+
+# 이름 → (종류, 입력 컬럼, 기간[, min_periods])
+DEFAULT_INDICATORS = {
+    'ma5': ('sma', 'close', 5),
+    'ma20': ('sma', 'close', 20),
+    'ma50': ('sma', 'close', 50),
+    'ma200': ('sma', 'close', 200),
+    'ema12': ('ema', 'close', 12),
+    'ema26': ('ema', 'close', 26),
+    'rsi14': ('rsi', 'close', 14),
+    'vol_ma20': ('sma', 'volume', 20),
+    'high52': ('max', 'high', 252, 50),
+    'low52': ('min', 'low', 252, 50),
+}
+
+# 52주 최고/최저(252거래일)를 채우려면 약 1년 + 여유
+WARM_DAYS = 400
+
+
+class RollingWindow:
+    """
+    최근 window개 값 링 버퍼 (how: 'mean' / 'max' / 'min')
+    - mean: 누적합에 새 값 더하고 빠지는 값 빼기, 버퍼가 한 바퀴 돌 때마다 버퍼 합으로 다시 맞춤
+      (빠지는 값이 NaN이면 누적합이 NaN으로 남으므로 그때도 버퍼 합으로 다시 계산 → NaN이 창을 벗어나면 바로 값 복귀)
+    - max/min: 빠지는 값이 현재 최고/최저였을 때만 버퍼에서 다시 계산
+    """
+
+    def __init__(self, window, how='mean', min_periods=None):
+        self.window = window
+        self.how = how
+        self.min_periods = window if min_periods is None else min_periods
+        self.buf = np.full((0, window), np.nan)
+        self.pos = np.zeros(0, dtype=np.int64)
+        self.count = np.zeros(0, dtype=np.int64)
+        self.acc = np.zeros(0)
+
+    def resize(self, n):
+        grow = n - len(self.pos)
+        self.buf = np.vstack([self.buf, np.full((grow, self.window), np.nan)])
+        self.pos = np.concatenate([self.pos, np.zeros(grow, dtype=np.int64)])
+        self.count = np.concatenate([self.count, np.zeros(grow, dtype=np.int64)])
+        self.acc = np.concatenate([self.acc, np.full(grow, 0.0 if self.how == 'mean' else np.nan)])
+
+    def update(self, idx, x):
+        pos = self.pos[idx]
+        old = self.buf[idx, pos]
+        full = self.count[idx] >= self.window
+        self.buf[idx, pos] = x
+        self.pos[idx] = (pos + 1) % self.window
+        self.count[idx] += 1
+
+        if self.how == 'mean':
+            acc = self.acc[idx] + x - np.where(full, old, 0.0)
+            # 부동소수점 누적 오차 방지: 한 바퀴마다 버퍼 합으로 교체 (NaN이 빠진 행도)
+            resync = (self.pos[idx] == 0) | (full & np.isnan(old))
+            if resync.any():
+                acc[resync] = self.buf[idx[resync]].sum(axis=1)
+            self.acc[idx] = acc
+            return
+
+        cur = self.acc[idx]
+        if self.how == 'max':
+            acc = np.fmax(cur, x)
+            stale = full & (old == cur) & (x < old)
+        else:
+            acc = np.fmin(cur, x)
+            stale = full & (old == cur) & (x > old)
+        if stale.any():
+            rows = self.buf[idx[stale]]
+            acc[stale] = rows.max(axis=1) if self.how == 'max' else rows.min(axis=1)
+        self.acc[idx] = acc
+
+    def clear(self, idx):
+        self.buf[idx] = np.nan
+        self.pos[idx] = 0
+        self.count[idx] = 0
+        self.acc[idx] = 0.0 if self.how == 'mean' else np.nan
+
+    def value(self):
+        valid = self.count >= max(self.min_periods, 1)
+        if self.how == 'mean':
+            n = np.minimum(self.count, self.window)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.where(valid, self.acc / np.maximum(n, 1), np.nan)
+        return np.where(valid, self.acc, np.nan)
+
+    def state(self):
+        return {'buf': self.buf, 'pos': self.pos, 'count': self.count, 'acc': self.acc}
+
+    def set_state(self, s):
+        self.buf, self.pos, self.count, self.acc = s['buf'], s['pos'], s['count'], s['acc']
+
+
+class EMA:
+    """지수이동평균 (첫 값으로 시작, alpha = 2 / (span + 1), span개 이상부터 유효)"""
+
+    def __init__(self, span):
+        self.span = span
+        self.alpha = 2.0 / (span + 1)
+        self.ema = np.zeros(0)
+        self.count = np.zeros(0, dtype=np.int64)
+
+    def resize(self, n):
+        grow = n - len(self.count)
+        self.ema = np.concatenate([self.ema, np.full(grow, np.nan)])
+        self.count = np.concatenate([self.count, np.zeros(grow, dtype=np.int64)])
+
+    def update(self, idx, x):
+        prev = self.ema[idx]
+        self.ema[idx] = np.where(self.count[idx] == 0, x, prev + self.alpha * (x - prev))
+        self.count[idx] += 1
+
+    def clear(self, idx):
+        self.ema[idx] = np.nan
+        self.count[idx] = 0
+
+    def value(self):
+        return np.where(self.count >= self.span, self.ema, np.nan)
+
+    def state(self):
+        return {'ema': self.ema, 'count': self.count}
+
+    def set_state(self, s):
+        self.ema, self.count = s['ema'], s['count']
+
+
+class WilderRSI:
+    """
+    Wilder RSI: 처음 period개 변화량의 단순 평균으로 시작, 이후 (평균 × (period - 1) + 새 값) / period
+    하락이 없으면 100, 변화가 없으면 50
+    """
+
+    def __init__(self, period=14):
+        self.period = period
+        self.prev = np.zeros(0)
+        self.avg_gain = np.zeros(0)
+        self.avg_loss = np.zeros(0)
+        self.count = np.zeros(0, dtype=np.int64)  # 반영한 변화량 개수
+
+    def resize(self, n):
+        grow = n - len(self.count)
+        self.prev = np.concatenate([self.prev, np.full(grow, np.nan)])
+        self.avg_gain = np.concatenate([self.avg_gain, np.zeros(grow)])
+        self.avg_loss = np.concatenate([self.avg_loss, np.zeros(grow)])
+        self.count = np.concatenate([self.count, np.zeros(grow, dtype=np.int64)])
+
+    def update(self, idx, x):
+        prev = self.prev[idx]
+        has_prev = ~np.isnan(prev)
+        delta = np.where(has_prev, x - prev, 0.0)
+        gain = np.maximum(delta, 0.0)
+        loss = np.maximum(-delta, 0.0)
+        n = self.count[idx] + has_prev
+        p = self.period
+
+        def smooth(avg, v):
+            # 시작 구간은 합계를 모았다가 period개째에 평균으로 바꿈
+            return np.where(n < p, avg + v, np.where(n == p, (avg + v) / p, (avg * (p - 1) + v) / p))
+
+        self.avg_gain[idx] = smooth(self.avg_gain[idx], gain)
+        self.avg_loss[idx] = smooth(self.avg_loss[idx], loss)
+        self.count[idx] = n
+        self.prev[idx] = x
+
+    def clear(self, idx):
+        self.prev[idx] = np.nan
+        self.avg_gain[idx] = 0.0
+        self.avg_loss[idx] = 0.0
+        self.count[idx] = 0
+
+    def value(self):
+        gain, loss = self.avg_gain, self.avg_loss
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rsi = 100.0 - 100.0 / (1.0 + gain / loss)
+        rsi = np.where(loss == 0, np.where(gain == 0, 50.0, 100.0), rsi)
+        return np.where(self.count >= self.period, rsi, np.nan)
+
+    def state(self):
+        return {'prev': self.prev, 'avg_gain': self.avg_gain, 'avg_loss': self.avg_loss, 'count': self.count}
+
+    def set_state(self, s):
+        self.prev, self.avg_gain, self.avg_loss, self.count = s['prev'], s['avg_gain'], s['avg_loss'], s['count']
+
+
+class SmaRSI:
+    """analysis2._calculate_rsi와 같은 RSI (상승/하락폭의 period일 단순 평균, 첫 행 변화량은 0)"""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.prev = np.zeros(0)
+        self.gain = RollingWindow(period)
+        self.loss = RollingWindow(period)
+
+    def resize(self, n):
+        self.prev = np.concatenate([self.prev, np.full(n - len(self.prev), np.nan)])
+        self.gain.resize(n)
+        self.loss.resize(n)
+
+    def update(self, idx, x):
+        prev = self.prev[idx]
+        delta = np.where(np.isnan(prev), 0.0, x - prev)
+        self.gain.update(idx, np.maximum(delta, 0.0))
+        self.loss.update(idx, np.maximum(-delta, 0.0))
+        self.prev[idx] = x
+
+    def clear(self, idx):
+        self.prev[idx] = np.nan
+        self.gain.clear(idx)
+        self.loss.clear(idx)
+
+    def value(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return 100.0 - 100.0 / (1.0 + self.gain.value() / self.loss.value())
+
+    def state(self):
+        s = {'prev': self.prev}
+        s.update({f"gain.{k}": v for k, v in self.gain.state().items()})
+        s.update({f"loss.{k}": v for k, v in self.loss.state().items()})
+        return s
+
+    def set_state(self, s):
+        self.prev = s['prev']
+        self.gain.set_state({k[5:]: v for k, v in s.items() if k.startswith('gain.')})
+        self.loss.set_state({k[5:]: v for k, v in s.items() if k.startswith('loss.')})
+
+
+def make_indicator(kind, window, min_periods=None):
+    if kind == 'sma':
+        return RollingWindow(window, 'mean', min_periods)
+    if kind in ('max', 'min'):
+        return RollingWindow(window, kind, min_periods)
+    if kind == 'ema':
+        return EMA(window)
+    if kind == 'rsi':
+        return WilderRSI(window)
+    if kind == 'rsi_sma':
+        return SmaRSI(window)
+    raise ValueError(f"알 수 없는 지표 종류: {kind}")
+
+
+class IndicatorState:
+    """
+    전 종목 지표 상태
+
+    Args:
+        spec: {이름: (종류, 입력 컬럼, 기간[, min_periods])} (기본: DEFAULT_INDICATORS)
+    """
+
+    def __init__(self, spec=None):
+        self.spec = dict(spec or DEFAULT_INDICATORS)
+        self.indicators = {name: make_indicator(s[0], *s[2:]) for name, s in self.spec.items()}
+        self.tickers = []
+        self.index = {}
+        self.last_date = np.zeros(0, dtype='datetime64[D]')
+        self.close = np.zeros(0)
+        self.volume = np.zeros(0)
+        self.prev_close = np.zeros(0)
+        self.prev_volume = np.zeros(0)
+        self.synced_at = None  # DB 동기화 시각 (daily_indicators 갱신에서 사용)
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def _rows(self, tickers):
+        """종목 → 행 번호 (처음 보는 종목은 상태 배열 확장)"""
+        codes, uniques = pd.factorize(np.asarray(tickers, dtype=object))
+        new = [t for t in uniques if t not in self.index]
+        if new:
+            for t in new:
+                self.index[t] = len(self.tickers)
+                self.tickers.append(t)
+            n, grow = len(self.tickers), len(new)
+            self.last_date = np.concatenate([self.last_date, np.full(grow, np.datetime64('NaT'), 'datetime64[D]')])
+            for attr in ('close', 'volume', 'prev_close', 'prev_volume'):
+                setattr(self, attr, np.concatenate([getattr(self, attr), np.full(grow, np.nan)]))
+            for ind in self.indicators.values():
+                ind.resize(n)
+        rows = np.array([self.index[t] for t in uniques], dtype=np.int64)
+        return rows[codes]
+
+    def _inputs(self, frame):
+        sources = {s[1] for s in self.spec.values()} | {'close', 'volume'}
+        return {src: frame[src].to_numpy(dtype=float) for src in sources}
+
+    def _apply(self, idx, dates, columns):
+        """하루치 배열 반영 (이미 반영한 날짜 이하는 건너뜀) → 반영된 행 번호"""
+        last = self.last_date[idx]
+        fresh = np.isnat(last) | (dates > last)
+        if not fresh.all():
+            idx, dates = idx[fresh], dates[fresh]
+            columns = {k: v[fresh] for k, v in columns.items()}
+        if len(idx) == 0:
+            return idx
+
+        self.prev_close[idx] = self.close[idx]
+        self.prev_volume[idx] = self.volume[idx]
+        self.close[idx] = columns['close']
+        self.volume[idx] = columns['volume']
+        self.last_date[idx] = dates
+        for name, ind in self.indicators.items():
+            ind.update(idx, columns[self.spec[name][1]])
+        return idx
+
+    def update(self, day):
+        """
+        하루치 행 반영 (종목당 1행: ticker, date, 지표 입력 컬럼)
+        → 반영된 종목의 지표 DataFrame (이미 반영한 날짜 이하의 행은 건너뜀)
+        """
+        idx = self._rows(day['ticker'])
+        dates = day['date'].to_numpy().astype('datetime64[D]')
+        return self._frame(self._apply(idx, dates, self._inputs(day)))
+
+    def reset(self, tickers):
+        """종목 상태 초기화 (이미 반영한 날짜의 가격이 바뀌었을 때 → 이후 warm()으로 다시 채움)"""
+        idx = np.array([self.index[t] for t in tickers if t in self.index], dtype=np.int64)
+        if len(idx) == 0:
+            return
+        self.last_date[idx] = np.datetime64('NaT')
+        for attr in ('close', 'volume', 'prev_close', 'prev_volume'):
+            getattr(self, attr)[idx] = np.nan
+        for ind in self.indicators.values():
+            ind.clear(idx)
+
+    def warm(self, panel, keep_history=False):
+        """
+        과거 패널 (ticker, date, 입력 컬럼) 을 거래일 순서대로 재생
+        keep_history=True면 거래일별 지표 DataFrame을 모두 이어 붙여 반환
+        """
+        panel = panel.sort_values('date', kind='stable')
+        idx = self._rows(panel['ticker'])
+        dates = panel['date'].to_numpy().astype('datetime64[D]')
+        columns = self._inputs(panel)
+
+        bounds = np.flatnonzero(dates[1:] != dates[:-1]) + 1
+        history = []
+        for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(dates)]):
+            applied = self._apply(idx[start:end], dates[start:end],
+                                  {k: v[start:end] for k, v in columns.items()})
+            if keep_history and len(applied):
+                history.append(self._arrays(applied))
+        if not keep_history:
+            return None
+        if not history:
+            return self._frame(np.zeros(0, dtype=np.int64))
+        return pd.DataFrame({k: np.concatenate([h[k] for h in history]) for k in history[0]})
+
+    def _arrays(self, idx):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            price_change = (self.close[idx] / self.prev_close[idx] - 1) * 100
+            volume_change = (self.volume[idx] / self.prev_volume[idx] - 1) * 100
+        out = {
+            'ticker': np.array(self.tickers, dtype=object)[idx] if len(idx) else np.zeros(0, dtype=object),
+            'date': self.last_date[idx].astype('datetime64[ns]'),
+            'close': self.close[idx],
+            'volume': self.volume[idx],
+            'price_change': price_change,
+            'volume_change': np.where(np.isfinite(volume_change), volume_change, np.nan),
+        }
+        for name, ind in self.indicators.items():
+            out[name] = ind.value()[idx]
+        return out
+
+    def _frame(self, idx):
+        return pd.DataFrame(self._arrays(idx))
+
+    def values(self, tickers=None):
+        """현재 상태의 종목별 최신 지표 (ticker 오름차순)"""
+        if tickers is None:
+            idx = np.array(sorted(range(len(self.tickers)), key=self.tickers.__getitem__), dtype=np.int64)
+        else:
+            idx = np.array([self.index[t] for t in tickers if t in self.index], dtype=np.int64)
+        return self._frame(idx)
+
+    def save(self, path=DEFAULT_STATE_PATH):
+        """상태 저장 (임시 파일에 쓴 뒤 교체)"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        arrays = {
+            'tickers': np.array(self.tickers, dtype=str),
+            'last_date': self.last_date,
+            'close': self.close, 'volume': self.volume,
+            'prev_close': self.prev_close, 'prev_volume': self.prev_volume,
+            'meta': np.array(json.dumps({'spec': self.spec,
+                                         'synced_at': self.synced_at.isoformat() if self.synced_at else None})),
+        }
+        for name, ind in self.indicators.items():
+            arrays.update({f"{name}/{k}": v for k, v in ind.state().items()})
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_STATE_PATH):
+        """저장된 상태 복원 (없으면 FileNotFoundError)"""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            state = cls({name: tuple(s) for name, s in meta['spec'].items()})
+            state.tickers = data['tickers'].tolist()
+            state.index = {t: i for i, t in enumerate(state.tickers)}
+            state.last_date = data['last_date']
+            for attr in ('close', 'volume', 'prev_close', 'prev_volume'):
+                setattr(state, attr, data[attr])
+            if meta.get('synced_at'):
+                state.synced_at = pd.Timestamp(meta['synced_at']).to_pydatetime()
+            for name, ind in state.indicators.items():
+                prefix = name + '/'
+                ind.set_state({k[len(prefix):]: data[k] for k in data.files if k.startswith(prefix)})
+        return state
+
+
+def warm_from_history(days_back=WARM_DAYS, tickers=None, spec=None, source='auto'):
+    """가격 패널 (price_store 스냅샷 또는 DB) 로 상태 생성"""
+    from price_store import load_price_panel
+
+    state = IndicatorState(spec)
+    columns = sorted({s[1] for s in state.spec.values()} | {'close', 'volume'})
+    panel = load_price_panel(days_back=days_back, columns=columns, tickers=tickers, source=source)
+    state.warm(panel)
+    return state
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Stateful incremental technical indicators')
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH)
+    parser.add_argument('--warm', action='store_true', help='Rebuild the state from price history')
+    parser.add_argument('--days-back', type=int, default=WARM_DAYS, help='Calendar days of history for --warm')
+    parser.add_argument('--source', choices=['auto', 'store', 'db', 'duckdb'], default='auto')
+    parser.add_argument('--status', action='store_true', help='Show the saved state')
+    args = parser.parse_args()
+
+    if args.warm:
+        start = time.perf_counter()
+        state = warm_from_history(args.days_back, source=args.source)
+        state.save(args.state)
+        print(f"✅ 지표 상태 생성: {len(state):,}종목, {time.perf_counter() - start:.1f}초 → {args.state}")
+
+    if args.status or not args.warm:
+        if not os.path.exists(args.state):
+            print(f"📭 지표 상태 없음: {args.state} (python indicators.py --warm)")
+        else:
+            state = IndicatorState.load(args.state)
+            dates = state.last_date[~np.isnat(state.last_date)]
+            print(f"📦 {args.state} ({os.path.getsize(args.state)/1024/1024:.1f}MB)")
+            print(f"   종목 {len(state):,}개 | 지표: {', '.join(state.spec)}")
+            if len(dates):
+                print(f"   마지막 거래일: {dates.max()} (가장 오래된 종목 {dates.min()})")
@@ -0,0 +1,80 @@
+-- daily_prices 압축 레이아웃 (partition_price_tables.sql 다음에 실행)
+-- - 가격: NUMERIC(12,2) → INTEGER (원 단위, psycopg2가 Decimal 대신 int 반환 → pandas int64 컬럼)
+-- - id (SERIAL) 삭제: 기본키는 (ticker, date)
+-- - diff (전일비 원본 텍스트) 삭제: 필요하면 close - LAG(close) OVER (PARTITION BY ticker ORDER BY date)
+-- - 날짜 인덱스: btree → BRIN (거래일 순으로 쌓이는 테이블, 파티션당 몇 페이지)
+-- 월 파티션마다 (date, ticker) 순으로 다시 써서 BRIN 범위가 겹치지 않게 합니다.
+-- 소수 가격이 있으면 중단합니다. 이미 압축 레이아웃이면 (diff 컬럼 없음) 건너뜁니다.
+-- daily_prices가 파티션 테이블이 아니거나 ensure_month_partitions가 없으면 (partition_price_tables.sql 미실행) 중단합니다.
+
+BEGIN;
+
+DO $$
+DECLARE
+    lo DATE;
+    hi DATE;
+    frac BIGINT;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                   WHERE table_name = 'daily_prices' AND column_name = 'diff') THEN
+        RAISE NOTICE 'daily_prices : 이미 압축 레이아웃 → 건너뜀';
+        RETURN;
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM pg_partitioned_table
+                   WHERE partrelid = to_regclass('daily_prices')) THEN
+        RAISE EXCEPTION 'daily_prices : 파티션 테이블이 아님 → partition_price_tables.sql을 먼저 실행하세요';
+    END IF;
+    IF to_regprocedure('ensure_month_partitions(text, date, date)') IS NULL THEN
+        RAISE EXCEPTION 'ensure_month_partitions() 없음 → partition_price_tables.sql을 먼저 실행하세요';
+    END IF;
+
+    SELECT COUNT(*) INTO frac FROM daily_prices
+    WHERE open <> round(open) OR high <> round(high) OR low <> round(low) OR close <> round(close);
+    IF frac > 0 THEN
+        RAISE EXCEPTION 'daily_prices : 소수 가격 %행 → INTEGER 변환 불가', frac;
+    END IF;
+
+    ALTER TABLE daily_prices RENAME TO daily_prices_wide;
+
+    CREATE TABLE daily_prices (
+        ticker VARCHAR(6) NOT NULL,
+        date DATE NOT NULL,
+        open INTEGER,
+        high INTEGER,
+        low INTEGER,
+        close INTEGER,
+        volume BIGINT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    ) PARTITION BY RANGE (date);
+
+    -- 기존 월 파티션 이름(daily_prices_pYYYYMM)을 새 테이블이 쓰도록 비움
+    SELECT MIN(date), MAX(date) INTO lo, hi FROM daily_prices_wide;
+    EXECUTE COALESCE((
+        SELECT string_agg(format('ALTER TABLE %I RENAME TO %I', c.relname, c.relname || '_wide'), '; ')
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'daily_prices_wide'::regclass
+    ), '');
+    PERFORM ensure_month_partitions('daily_prices', lo, hi);
+
+    INSERT INTO daily_prices (ticker, date, open, high, low, close, volume, created_at)
+    SELECT ticker, date, open::integer, high::integer, low::integer, close::integer, volume, created_at
+    FROM daily_prices_wide
+    ORDER BY date, ticker;
+
+    DROP TABLE daily_prices_wide;     -- 파티션, id 시퀀스도 함께 삭제
+
+    ALTER TABLE daily_prices ADD PRIMARY KEY (ticker, date);
+    CREATE INDEX idx_daily_prices_date ON daily_prices USING brin (date);
+    ANALYZE daily_prices;
+END;
+$$;
+
+COMMENT ON TABLE daily_prices IS '일별 주가 데이터 (원 단위 정수, 월별 파티션)';
+COMMENT ON COLUMN daily_prices.ticker IS '종목코드 (6자리)';
+COMMENT ON COLUMN daily_prices.date IS '거래일';
+
+-- 로더 스테이징 테이블도 새 컬럼 구성으로 (다음 실행 때 bulk_loader가 다시 만듦)
+DROP TABLE IF EXISTS daily_prices_staging;
+
+COMMIT;
@@ -0,0 +1,34 @@
+-- 전 종목 일별 기술 지표 테이블
+-- daily_indicators.py가 update_daily_prices.py 실행 직후 새로 들어온 거래일만 증분 계산해 upsert하고
+-- (indicators.py 상태 파일 사용), Stock Detail / Trading / Monitoring / Stock Pool 페이지와
+-- evaluate_approved.py는 지표를 다시 계산하지 않고 이 테이블을 읽습니다.
+-- 보관 기간은 daily_prices를 따라갑니다 (daily_prices의 가장 오래된 날짜 이전 행은 갱신 때 삭제).
+
+CREATE TABLE IF NOT EXISTS daily_indicators (
+    ticker VARCHAR(6) NOT NULL,
+    date DATE NOT NULL,
+    ma5 NUMERIC(12,2),
+    ma20 NUMERIC(12,2),
+    ma50 NUMERIC(12,2),
+    ma200 NUMERIC(12,2),
+    ema12 NUMERIC(12,2),
+    ema26 NUMERIC(12,2),
+    rsi14 NUMERIC(5,2),                 -- Wilder RSI (14)
+    vol_ma20 NUMERIC(16,2),
+    high52 NUMERIC(12,2),               -- 252거래일 최고가 (50거래일 이상부터)
+    low52 NUMERIC(12,2),                -- 252거래일 최저가 (50거래일 이상부터)
+    price_change NUMERIC(8,2),          -- 전일 대비 종가 변화율 (%)
+    volume_change NUMERIC(12,2),        -- 전일 대비 거래량 변화율 (%)
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- 한 종목 구간 조회 (ticker = ? AND date BETWEEN ...)와
+    -- 종목별 최신 행 (ORDER BY date DESC LIMIT 1, LATERAL) 모두 기본키 인덱스로 처리
+    PRIMARY KEY (ticker, date)
+);
+
+-- 특정 거래일 전 종목 조회 (최신 거래일 스크리닝) 및 보관 기간 정리용
+CREATE INDEX IF NOT EXISTS idx_daily_indicators_date ON daily_indicators(date);
+
+COMMENT ON TABLE daily_indicators IS '전 종목 일별 기술 지표 (daily_prices 갱신 직후 증분 계산)';
+COMMENT ON COLUMN daily_indicators.rsi14 IS 'Wilder RSI(14), 하락이 없으면 100';
+COMMENT ON COLUMN daily_indicators.high52 IS '252거래일 최고가 (고가 기준)';
+COMMENT ON COLUMN daily_indicators.low52 IS '252거래일 최저가 (저가 기준)';
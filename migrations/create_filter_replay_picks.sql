@@ -0,0 +1,26 @@
+-- quick_filter 과거 재현 결과 테이블
+-- filter_replay.py --to-db가 거래일마다 quick_filter 규칙(quick_filter.FILTER_PARAMS)으로 뽑은
+-- 상위 N 종목과 선정 후 1/3/5/7거래일 수익률을 저장합니다.
+-- 재현할 때마다 해당 날짜 구간을 지우고 다시 쓰므로 항상 마지막으로 실행한 규칙의 결과입니다.
+
+CREATE TABLE IF NOT EXISTS filter_replay_picks (
+    ticker VARCHAR(6) NOT NULL,
+    date DATE NOT NULL,
+    rank INTEGER NOT NULL,              -- 그날 final_score 순위 (1부터)
+    final_score NUMERIC(10,4),
+    close NUMERIC(12,2),
+    trading_value BIGINT,               -- 종가 × 거래량 (원)
+    change_5d NUMERIC(12,4),            -- 5거래일 등락률 (%)
+    vol_ratio NUMERIC(12,4),            -- 20거래일 평균 대비 거래량 (배)
+    fwd_1d NUMERIC(12,4),               -- 1거래일 후 수익률 (%), 아직 없으면 NULL
+    fwd_3d NUMERIC(12,4),
+    fwd_5d NUMERIC(12,4),
+    fwd_7d NUMERIC(12,4),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (ticker, date)
+);
+
+-- 특정 거래일 선정 목록 조회 및 재현 구간 삭제용
+CREATE INDEX IF NOT EXISTS idx_filter_replay_picks_date ON filter_replay_picks(date, rank);
+
+COMMENT ON TABLE filter_replay_picks IS 'quick_filter 규칙 과거 재현: 거래일별 상위 N 종목과 이후 수익률';
@@ -0,0 +1,21 @@
+-- 외국인/기관 순매매 테이블
+-- all_institutional_trend_data_fast.py --to-db가 bulk_loader.InvestorFlowLoader로 증분 upsert하고,
+-- analysis2.py는 종목별 필요한 기간만 (ticker, date) 범위 조회로 읽습니다.
+
+CREATE TABLE IF NOT EXISTS investor_flows (
+    ticker VARCHAR(6) NOT NULL,
+    date DATE NOT NULL,
+    close NUMERIC(12,2),                -- frgn 페이지의 종가
+    institutional_net_buy BIGINT,       -- 기관 순매매량
+    foreigner_net_buy BIGINT,           -- 외국인 순매매량
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (ticker, date)
+);
+
+-- 날짜 기준 조회 (최근 N일 전 종목) 및 오래된 데이터 정리용
+CREATE INDEX IF NOT EXISTS idx_investor_flows_date ON investor_flows(date);
+
+COMMENT ON TABLE investor_flows IS '종목별 일별 외국인/기관 순매매 (네이버 frgn 페이지)';
+COMMENT ON COLUMN investor_flows.institutional_net_buy IS '기관 순매매량 (주)';
+COMMENT ON COLUMN investor_flows.foreigner_net_buy IS '외국인 순매매량 (주)';
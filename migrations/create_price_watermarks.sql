@@ -0,0 +1,23 @@
+-- 종목별 시세 워터마크 테이블
+-- update_daily_prices.py가 종목마다 "마지막 저장 거래일"과 "마지막 확인 시각"을 기록하여
+-- 빠진 날짜만큼만 페이지를 요청하고, 이미 확인한 종목은 건너뜁니다.
+
+CREATE TABLE IF NOT EXISTS price_watermarks (
+    ticker VARCHAR(6) PRIMARY KEY,
+    last_date DATE,                 -- daily_prices에 저장된 마지막 거래일
+    last_checked_at TIMESTAMP,      -- 마지막으로 네이버에서 확인한 시각
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_price_watermarks_checked ON price_watermarks(last_checked_at);
+
+-- 기존 daily_prices에서 초기 워터마크 채우기
+INSERT INTO price_watermarks (ticker, last_date)
+SELECT ticker, MAX(date)
+FROM daily_prices
+GROUP BY ticker
+ON CONFLICT (ticker) DO NOTHING;
+
+COMMENT ON TABLE price_watermarks IS '종목별 일별 시세 수집 워터마크';
+COMMENT ON COLUMN price_watermarks.last_date IS 'daily_prices에 저장된 마지막 거래일';
+COMMENT ON COLUMN price_watermarks.last_checked_at IS '마지막 네이버 확인 시각 (장 마감 이후 확인했으면 재확인 생략)';
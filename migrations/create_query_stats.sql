@@ -0,0 +1,29 @@
+-- 쿼리 지연 계측 테이블
+-- DB_QUERY_STATS=1로 실행한 스크립트 / Streamlit 페이지가 db_config 커서 실행마다 1행씩 기록합니다
+-- (query_stats.py 링 버퍼 → 30초마다 일괄 저장). 리포트: python query_stats.py
+
+CREATE TABLE IF NOT EXISTS query_stats (
+    id BIGSERIAL PRIMARY KEY,
+    recorded_at TIMESTAMP NOT NULL,
+    run_id VARCHAR(120) NOT NULL,       -- 실행 단위: 스크립트명:pid:시작 시각 또는 page:<이름>:<uuid>
+    module VARCHAR(200) NOT NULL,       -- 호출한 저장소 파일 (상대 경로)
+    call_site VARCHAR(300) NOT NULL,    -- 파일:줄 함수
+    fingerprint CHAR(16) NOT NULL,      -- 리터럴을 ?로 바꾼 문장의 md5 앞 16자리
+    duration_ms DOUBLE PRECISION NOT NULL,
+    row_count BIGINT                    -- cursor.rowcount (모르면 NULL)
+);
+
+-- 기간 리포트 / 오래된 기록 삭제용
+CREATE INDEX IF NOT EXISTS idx_query_stats_recorded_at ON query_stats(recorded_at);
+-- N+1 탐지 (실행 단위별 같은 문장 반복)
+CREATE INDEX IF NOT EXISTS idx_query_stats_run ON query_stats(run_id, fingerprint);
+
+-- 지문 → 정규화 문장 (처음 본 문장만 저장)
+CREATE TABLE IF NOT EXISTS query_fingerprints (
+    fingerprint CHAR(16) PRIMARY KEY,
+    statement TEXT NOT NULL,
+    first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE query_stats IS 'db_config 커서 실행별 지연 기록 (opt-in, DB_QUERY_STATS=1)';
+COMMENT ON TABLE query_fingerprints IS 'query_stats 지문별 정규화 SQL 문장';
@@ -0,0 +1,91 @@
+-- daily_prices / daily_indicators / investor_flows 월별 범위 파티션 전환
+-- 기존 단일 테이블(create_daily_prices_table.sql, create_daily_indicators.sql, create_investor_flows.sql)을
+-- 같은 이름의 PARTITION BY RANGE (date) 테이블로 바꾸고, 데이터가 있는 달마다 <테이블>_pYYYYMM 파티션을 만들어 옮깁니다.
+-- - 보관 기간 정리는 DELETE + VACUUM 대신 오래된 파티션 DETACH/DROP (partitions.py, 메타데이터 작업)
+-- - 새 달 파티션은 bulk_loader 로더가 upsert 직전에 ensure_month_partitions()로 자동 생성
+-- - 기본키는 (ticker, date) (파티션 키 date 포함 → 기존 ON CONFLICT (ticker, date) 그대로 동작)
+--   daily_prices.id는 기본값(시퀀스)만 유지하고 더 이상 기본키가 아님 (파티션 테이블 기본키는 date를 포함해야 함)
+--   daily_prices의 (ticker), (ticker, date DESC) 인덱스는 기본키 (ticker, date)와 겹쳐 만들지 않음
+-- 이미 파티션 테이블이면 건너뜁니다 (여러 번 실행해도 안전).
+
+BEGIN;
+
+-- parent의 [lo, hi] 구간을 덮는 월 파티션 생성 → 새로 만든 파티션 수
+CREATE OR REPLACE FUNCTION ensure_month_partitions(parent TEXT, lo DATE, hi DATE)
+RETURNS INTEGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    month DATE;
+    part TEXT;
+    created INTEGER := 0;
+BEGIN
+    IF lo IS NULL OR hi IS NULL THEN
+        RETURN 0;
+    END IF;
+    month := date_trunc('month', lo)::date;
+    WHILE month <= hi LOOP
+        part := format('%s_p%s', parent, to_char(month, 'YYYYMM'));
+        IF to_regclass(part) IS NULL THEN
+            -- 동시 로더끼리 같은 파티션을 만들지 않도록 부모 테이블 단위로 직렬화
+            PERFORM pg_advisory_xact_lock(hashtext(parent));
+            IF to_regclass(part) IS NULL THEN
+                EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                               part, parent, month, (month + INTERVAL '1 month')::date);
+                created := created + 1;
+            END IF;
+        END IF;
+        month := (month + INTERVAL '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+
+COMMENT ON FUNCTION ensure_month_partitions(TEXT, DATE, DATE) IS '월별 범위 파티션 자동 생성 (<parent>_pYYYYMM)';
+
+DO $$
+DECLARE
+    t TEXT;
+    old TEXT;
+    col TEXT;
+    seq TEXT;
+    lo DATE;
+    hi DATE;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['daily_prices', 'daily_indicators', 'investor_flows'] LOOP
+        IF (SELECT relkind FROM pg_class WHERE oid = to_regclass(t)) IS DISTINCT FROM 'r' THEN
+            RAISE NOTICE '% : 이미 파티션 테이블이거나 없음 → 건너뜀', t;
+            CONTINUE;
+        END IF;
+
+        old := t || '_unpartitioned';
+        EXECUTE format('ALTER TABLE %I RENAME TO %I', t, old);
+        EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING COMMENTS) PARTITION BY RANGE (date)',
+                       t, old);
+        EXECUTE format('COMMENT ON TABLE %I IS %L', t, obj_description(old::regclass, 'pg_class'));
+
+        -- SERIAL 시퀀스는 새 테이블 소유로 (이전 테이블과 함께 지워지지 않도록)
+        FOR col IN
+            SELECT attname FROM pg_attribute
+            WHERE attrelid = old::regclass AND attnum > 0 AND NOT attisdropped
+        LOOP
+            seq := pg_get_serial_sequence(old, col);
+            IF seq IS NOT NULL THEN
+                EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.%I', seq, t, col);
+            END IF;
+        END LOOP;
+
+        EXECUTE format('SELECT MIN(date), MAX(date) FROM %I', old) INTO lo, hi;
+        PERFORM ensure_month_partitions(t, lo, hi);
+        EXECUTE format('INSERT INTO %I SELECT * FROM %I', t, old);
+        EXECUTE format('DROP TABLE %I', old);
+
+        -- 인덱스는 적재 후 생성 (부모에 만들면 모든 파티션에 전파, 새 파티션에도 자동 생성)
+        EXECUTE format('ALTER TABLE %I ADD PRIMARY KEY (ticker, date)', t);
+        EXECUTE format('CREATE INDEX %I ON %I (date)', 'idx_' || t || '_date', t);
+        EXECUTE format('ANALYZE %I', t);
+        RAISE NOTICE '% : % ~ % 월별 파티션으로 전환', t, lo, hi;
+    END LOOP;
+END;
+$$;
+
+COMMIT;
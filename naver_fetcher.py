@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+네이버 금융 비동기 수집 엔진
+- aiohttp 세션 1개 (keep-alive 커넥션 풀) + 호스트당 동시 요청 수 제한
+- 수집된 HTML은 bounded queue를 거쳐 소수의 파싱 워커(프로세스 풀, naver_parser)로 전달
+- 종목별 페이지를 모두 파싱하면 하나의 DataFrame으로 합쳐 콜백에 전달
+- http_cache.ResponseCache를 주면 (url, 거래일) 캐시를 먼저 확인 (replay 모드면 네트워크 미사용)
+- rate_limiter.RateLimiter를 주면 엔드포인트별 공유 예산 안에서 요청하고, 429/5xx/차단 페이지에 백오프
+- 종목별 known-through 날짜를 주면 페이지의 가장 오래된 행이 그 날짜 이하가 되는 순간 페이징 중단
+"""
+import asyncio
+import inspect
+import os
+import re
+import time
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor
+
+import aiohttp
+import pandas as pd
+
+from naver_parser import parse_sise_day, concat_columns
+from rate_limiter import endpoint_for_url
+
+NAVER_BASE_URL = "https://finance.naver.com"
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+SISE_DAY_PATH = "/item/sise_day.nhn"
+
+PRICE_COLUMNS = ['date', 'close', 'diff', 'open', 'high', 'low', 'volume']
+
+# 페이지 하단 네비게이션(Nnavi)의 page=N 링크 → 마지막 페이지 추정
+_NAVI_PAGE_RE = re.compile(r'[?&]page=(\d+)')
+
+# 표의 날짜 셀 (YYYY.MM.DD) → 전체 파싱 없이 페이지의 가장 오래된 행 확인
+_ROW_DATE_RE = re.compile(r'>\s*(\d{4}\.\d{2}\.\d{2})\s*<')
+
+
+def last_page_in_html(html):
+    """네비게이션 링크에서 마지막 페이지 번호 추출 (없으면 None)"""
+    idx = html.find('Nnavi')
+    if idx < 0:
+        return None
+    pages = [int(p) for p in _NAVI_PAGE_RE.findall(html, idx)]
+    return max(pages) if pages else None
+
+
+def oldest_date_in_html(html):
+    """페이지 표에서 가장 오래된 날짜 (없으면 None)"""
+    idx = html.find('Nnavi')
+    dates = _ROW_DATE_RE.findall(html, 0, idx if idx >= 0 else len(html))
+    if not dates:
+        return None
+    y, m, d = min(dates).split('.')
+    return date(int(y), int(m), int(d))
+
+
+def reached_known_date(html, known_through):
+    """이 페이지가 이미 보유한 구간(known_through 이하)까지 내려왔는지"""
+    if known_through is None:
+        return False
+    oldest = oldest_date_in_html(html)
+    return oldest is not None and oldest <= known_through
+
+
+def split_job(job):
+    """(ticker, pages) 또는 (ticker, pages, known_through) → 3-튜플"""
+    ticker, pages, *rest = job
+    return ticker, pages, (rest[0] if rest else None)
+
+
+def get_page_sync(session, url, limiter=None, retries=2):
+    """
+    동기 스크레이퍼용 GET (requests.Session)
+    limiter가 있으면 공유 예산에서 토큰을 받고, 제한 응답이면 백오프 후 재시도
+    """
+    endpoint = endpoint_for_url(url)
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire(endpoint)
+        resp = session.get(url)
+        if limiter is None or not limiter.feedback(endpoint, resp.status_code, resp.text,
+                                                   retry_after=resp.headers.get('Retry-After')):
+            resp.raise_for_status()
+            return resp.text
+    resp.raise_for_status()
+    raise RuntimeError(f"요청 제한으로 실패: {url}")
+
+
+def finalize_daily_prices(ticker, pages):
+    """페이지별 컬럼 dict를 종목 단위 DataFrame으로 합치기 (날짜 오름차순)"""
+    cols = concat_columns(pages)
+    if cols is None:
+        return None
+
+    df = pd.DataFrame({c: cols[c] for c in PRICE_COLUMNS})
+    df['ticker'] = ticker
+    df['date'] = pd.to_datetime(df['date'])
+    df = df.drop_duplicates(subset=['date'], keep='first')
+    return df.sort_values('date')
+
+
+class NaverFetchEngine:
+    """
+    비동기 페이지 수집기
+
+    Args:
+        base_url: 수집 대상 호스트 (로컬 대역 서버로 바꿔 오프라인 측정 가능)
+        max_per_host: 호스트당 동시 연결 수 (= 동시 요청 상한)
+        max_active_tickers: 동시에 진행 중인 종목 수 (메모리 상한)
+        queue_size: 파싱 대기 HTML 큐 크기 (가득 차면 수집이 대기)
+        parse_workers: 파싱 프로세스 수 (0이면 이벤트 루프에서 직접 파싱)
+        timeout: 요청 타임아웃 (초)
+        retries: 요청 실패 시 재시도 횟수
+        cache: http_cache.ResponseCache (None이면 캐시 사용 안 함)
+        limiter: rate_limiter.RateLimiter (None이면 max_per_host만으로 제한)
+    """
+
+    def __init__(self, base_url=NAVER_BASE_URL, max_per_host=8, max_active_tickers=None,
+                 queue_size=64, parse_workers=None, timeout=10, retries=2, cache=None,
+                 limiter=None):
+        self.base_url = base_url.rstrip('/')
+        self.max_per_host = max_per_host
+        self.max_active_tickers = max_active_tickers or max_per_host * 4
+        self.queue_size = queue_size
+        if parse_workers is None:
+            parse_workers = max(1, min(2, (os.cpu_count() or 1) - 1))
+        self.parse_workers = parse_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.cache = cache
+        self.limiter = limiter
+
+        self.stats = {'requests': 0, 'bytes': 0, 'errors': 0, 'tickers': 0, 'failed_tickers': 0,
+                      'cache_hits': 0, 'early_stops': 0, 'throttled': 0}
+
+    def page_url(self, path, ticker, page):
+        return f"{self.base_url}{path}?code={ticker}&page={page}"
+
+    async def _get(self, session, url):
+        """GET (캐시 우선, 재시도 포함) → HTML 텍스트"""
+        if self.cache is not None:
+            html = self.cache.get(url)
+            if html is not None:
+                self.stats['cache_hits'] += 1
+                return html
+
+        endpoint = endpoint_for_url(url)
+        last_error = None
+        for attempt in range(self.retries + 1):
+            try:
+                if self.limiter is not None:
+                    await self.limiter.acquire_async(endpoint)
+                async with session.get(url) as resp:
+                    if self.limiter is not None:
+                        # 제한 응답이면 limiter가 전체 프로세스의 요청을 멈춘 뒤 재시도
+                        text = await resp.text(errors='replace') if resp.status == 200 else None
+                        if self.limiter.feedback(endpoint, resp.status, text,
+                                                 retry_after=resp.headers.get('Retry-After')):
+                            self.stats['throttled'] += 1
+                            raise aiohttp.ClientResponseError(resp.request_info, resp.history,
+                                                              status=resp.status, message='throttled')
+                    resp.raise_for_status()
+                    html = await resp.text(errors='replace')
+                    self.stats['requests'] += 1
+                    self.stats['bytes'] += len(html)
+                    if self.cache is not None:
+                        self.cache.put(url, html)
+                    return html
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = e
+                self.stats['errors'] += 1
+                await asyncio.sleep(0.5 * (attempt + 1))
+        raise last_error
+
+    async def run(self, jobs, on_result, path=SISE_DAY_PATH,
+                  parse_page=parse_sise_day, finalize=finalize_daily_prices):
+        """
+        jobs: [(ticker, pages), ...] 또는 [(ticker, pages, known_through), ...]
+              known_through(date)가 있으면 그 날짜 이하의 행이 보이는 페이지에서 중단
+        on_result(ticker, df): 종목 하나가 끝날 때마다 호출 (실패 시 df=None)
+                               코루틴 함수면 끝날 때까지 기다림 → 저장이 밀리면 파싱, 수집도 따라서 멈춤 (메모리 상한)
+        """
+        jobs = list(jobs)
+        fetch_queue = asyncio.PriorityQueue()
+        parse_queue = asyncio.Queue(maxsize=self.queue_size)
+        active = asyncio.Semaphore(self.max_active_tickers)
+
+        # 종목별 진행 상태: 남은 페이지 수, 파싱된 페이지, 실패 여부
+        state = {}
+        done = asyncio.Event()
+        remaining = [len(jobs)]
+        callback_errors = []
+
+        async def finish(ticker):
+            st = state.pop(ticker)
+            frames = [st['frames'][p] for p in sorted(st['frames'])]
+            df = None if st['failed'] else finalize(ticker, frames)
+            if df is None:
+                self.stats['failed_tickers'] += 1
+            else:
+                self.stats['tickers'] += 1
+            result = on_result(ticker, df)
+            if inspect.isawaitable(result):
+                await result
+            active.release()
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                done.set()
+
+        async def feeder():
+            for order, job in enumerate(jobs):
+                ticker, pages, known_through = split_job(job)
+                await active.acquire()
+                state[ticker] = {'order': order, 'pages': pages, 'known_through': known_through,
+                                 'outstanding': 1, 'frames': {}, 'failed': False}
+                await fetch_queue.put((order, 1, ticker))
+
+        async def fetcher(session):
+            while True:
+                order, page, ticker = await fetch_queue.get()
+                st = state[ticker]
+                try:
+                    html = await self._get(session, self.page_url(path, ticker, page))
+                except Exception:
+                    st['failed'] = True
+                    html = None
+
+                if html is not None:
+                    # 다음 페이지는 같은 종목 우선순위로 바로 큐에 넣음 (종목 단위로 빨리 끝내기)
+                    last_page = last_page_in_html(html)
+                    if page < st['pages'] and (last_page is None or page < last_page):
+                        if reached_known_date(html, st['known_through']):
+                            self.stats['early_stops'] += 1
+                        else:
+                            st['outstanding'] += 1
+                            await fetch_queue.put((order, page + 1, ticker))
+
+                await parse_queue.put((ticker, page, html))
+                fetch_queue.task_done()
+
+        async def parser(pool):
+            loop = asyncio.get_running_loop()
+            while True:
+                ticker, page, html = await parse_queue.get()
+                st = state[ticker]
+                if html is not None and not st['failed']:
+                    try:
+                        if pool is None:
+                            frame = parse_page(html)
+                        else:
+                            frame = await loop.run_in_executor(pool, parse_page, html)
+                        st['frames'][page] = frame
+                    except Exception:
+                        st['failed'] = True
+
+                st['outstanding'] -= 1
+                if st['outstanding'] == 0:
+                    try:
+                        await finish(ticker)
+                    except Exception as e:
+                        # 콜백 오류는 수집 전체를 중단시키고 호출자에게 전달
+                        callback_errors.append(e)
+                        done.set()
+                parse_queue.task_done()
+
+        if not jobs:
+            return self.stats
+
+        connector = aiohttp.TCPConnector(limit=self.max_per_host * 2,
+                                         limit_per_host=self.max_per_host,
+                                         keepalive_timeout=30)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        pool = ProcessPoolExecutor(self.parse_workers) if self.parse_workers > 0 else None
+
+        try:
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                             headers=DEFAULT_HEADERS) as session:
+                tasks = [asyncio.create_task(feeder())]
+                tasks += [asyncio.create_task(fetcher(session)) for _ in range(self.max_per_host)]
+                n_parsers = max(1, self.parse_workers) * 2
+                tasks += [asyncio.create_task(parser(pool)) for _ in range(n_parsers)]
+
+                await done.wait()
+                for t in tasks:
+                    t.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        if callback_errors:
+            raise callback_errors[0]
+
+        return self.stats
+
+
+def fetch_daily_prices(jobs, on_result, **engine_kwargs):
+    """동기 코드용 진입점: 일별 시세 수집 후 소요 시간/통계 반환"""
+    engine = NaverFetchEngine(**engine_kwargs)
+    start = time.perf_counter()
+    stats = asyncio.run(engine.run(jobs, on_result))
+    stats = dict(stats, elapsed=time.perf_counter() - start)
+    return stats
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+네이버 금융 페이지 전용 파서 (lxml)
+- sise_day(일별 시세), frgn(외국인/기관 순매매) 두 레이아웃만 대상으로 XPath를 미리 컴파일
+- pd.read_html / BeautifulSoup 없이 numpy 컬럼(dict)을 바로 반환
+
+반환 형식:
+    parse_sise_day(html) → {'date': datetime64[D], 'close'/'open'/'high'/'low'/'volume': int64, 'diff': object}
+    parse_frgn(html)     → {'date': datetime64[D], 'close': int64,
+                            'institutional_net_buy': int64, 'foreigner_net_buy': int64}
+"""
+import re
+
+import numpy as np
+from lxml import etree
+
+_HTML_PARSER = etree.HTMLParser(remove_comments=True, remove_blank_text=True)
+
+# 두 레이아웃 모두 데이터 행은 class="type2" 테이블 안에서 숫자 셀(td.num)을 가진 tr
+_DATA_ROWS = etree.XPath("//table[contains(concat(' ', normalize-space(@class), ' '), ' type2 ')]"
+                         "//tr[td[@class='num']]")
+_CELLS = etree.XPath("td")
+
+_DATE_RE = re.compile(r'^\d{4}\.\d{2}\.\d{2}$')
+_WS_RE = re.compile(r'\s+')
+
+SISE_DAY_FIELDS = ('close', 'open', 'high', 'low', 'volume')
+FRGN_FIELDS = ('close', 'institutional_net_buy', 'foreigner_net_buy')
+
+# 셀 위치 (0=날짜)
+_SISE_DAY_IDX = {'close': 1, 'diff': 2, 'open': 3, 'high': 4, 'low': 5, 'volume': 6}
+_FRGN_IDX = {'close': 1, 'institutional_net_buy': 5, 'foreigner_net_buy': 6}
+
+
+def _text(td):
+    return _WS_RE.sub(' ', ''.join(td.itertext())).strip()
+
+
+def _to_int(s):
+    s = s.replace(',', '').replace('+', '')
+    if not s or s == '-':
+        return 0
+    return int(float(s)) if '.' in s else int(s)
+
+
+def _rows(html, min_cells):
+    """데이터 행 → 셀 텍스트 리스트 (날짜가 비어 있는 패딩 행 제외)"""
+    if not html:
+        return []
+    root = etree.fromstring(html, _HTML_PARSER)
+    if root is None:
+        return []
+
+    rows = []
+    for tr in _DATA_ROWS(root):
+        tds = _CELLS(tr)
+        if len(tds) < min_cells:
+            continue
+        first = _text(tds[0])
+        if not _DATE_RE.match(first):
+            continue
+        rows.append([first] + [_text(td) for td in tds[1:]])
+    return rows
+
+
+def _dates(rows):
+    return np.array([r[0].replace('.', '-') for r in rows], dtype='datetime64[D]')
+
+
+def empty_columns(fields, with_diff=False):
+    cols = {'date': np.array([], dtype='datetime64[D]')}
+    for f in fields:
+        cols[f] = np.array([], dtype=np.int64)
+    if with_diff:
+        cols['diff'] = np.array([], dtype=object)
+    return cols
+
+
+def parse_sise_day(html):
+    """일별 시세 페이지 → 컬럼 dict (행이 없으면 길이 0 배열)"""
+    rows = _rows(html, 7)
+    if not rows:
+        return empty_columns(SISE_DAY_FIELDS, with_diff=True)
+
+    cols = {'date': _dates(rows)}
+    for f in SISE_DAY_FIELDS:
+        i = _SISE_DAY_IDX[f]
+        cols[f] = np.array([_to_int(r[i]) for r in rows], dtype=np.int64)
+    cols['diff'] = np.array([r[_SISE_DAY_IDX['diff']] for r in rows], dtype=object)
+    return cols
+
+
+def parse_frgn(html):
+    """외국인/기관 순매매 페이지 → 컬럼 dict (행이 없으면 길이 0 배열)"""
+    rows = _rows(html, 7)
+    if not rows:
+        return empty_columns(FRGN_FIELDS)
+
+    cols = {'date': _dates(rows)}
+    for f in FRGN_FIELDS:
+        i = _FRGN_IDX[f]
+        cols[f] = np.array([_to_int(r[i]) for r in rows], dtype=np.int64)
+    return cols
+
+
+def concat_columns(pages):
+    """페이지별 컬럼 dict 리스트 → 하나의 컬럼 dict"""
+    pages = [p for p in pages if p is not None and len(p['date'])]
+    if not pages:
+        return None
+    return {k: np.concatenate([p[k] for p in pages]) for k in pages[0]}
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+네이버 금융 대역(stand-in) HTTP 서버
+- sise_day(일별 시세), frgn(외국인/기관 순매매) 페이지를 실제와 같은 레이아웃
+  (EUC-KR, type2 테이블, Nnavi 네비게이션)으로 생성
+- 종목코드로 시드를 고정한 가짜 시세라 매번 같은 응답
+- --latency로 네트워크 왕복 지연을 흉내 내어 수집 엔진 처리량을 오프라인에서 측정
+- --throttle-rate로 초당 요청 상한을 넘으면 429를 돌려줌 (rate_limiter 백오프 확인)
+
+사용법:
+    python naver_stub_server.py --port 8765 --latency 0.05
+    python create_complete_daily_prices.py --base-url http://127.0.0.1:8765 --limit 100
+"""
+import argparse
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from datetime import date, timedelta
+from functools import lru_cache
+
+from aiohttp import web
+
+ROWS_PER_PAGE = 10
+FRGN_ROWS_PER_PAGE = 20
+
+
+def trading_days(as_of, days):
+    """as_of부터 과거로 평일 days개 (최신순)"""
+    result = []
+    d = as_of
+    while len(result) < days:
+        if d.weekday() < 5:
+            result.append(d)
+        d -= timedelta(days=1)
+    return result
+
+
+@lru_cache(maxsize=4096)
+def synthetic_prices(ticker, days, as_of):
+    """종목별 결정적 가짜 시세 [(date, close, diff, open, high, low, volume)] (최신순)"""
+    rng = random.Random(int(ticker) if ticker.isdigit() else hash(ticker))
+    dates = trading_days(as_of, days)[::-1]
+
+    close = rng.randint(20, 2000) * 50
+    rows = []
+    prev = close
+    for d in dates:
+        change = rng.gauss(0, 0.02)
+        close = max(100, int(prev * (1 + change) / 10) * 10)
+        open_ = max(100, int(prev * (1 + rng.gauss(0, 0.01)) / 10) * 10)
+        high = max(open_, close) + rng.randint(0, 20) * 10
+        low = max(50, min(open_, close) - rng.randint(0, 20) * 10)
+        volume = rng.randint(1_000, 5_000_000)
+        rows.append((d, close, close - prev, open_, high, low, volume))
+        prev = close
+    return rows[::-1]
+
+
+def _diff_cell(diff):
+    if diff > 0:
+        em = '<em class="bu_p bu_pup"><span class="blind">상승</span></em><span class="tah p11 red02">'
+    elif diff < 0:
+        em = '<em class="bu_p bu_pdn"><span class="blind">하락</span></em><span class="tah p11 nv01">'
+    else:
+        em = '<span class="tah p11">'
+    return f'<td class="num">\n\t\t\t\t{em}\n\t\t\t\t{abs(diff):,}\n\t\t\t\t</span>\n\t\t\t</td>'
+
+
+def _navi(ticker, page, last_page, path):
+    """Nnavi 페이지 네비게이션 (10페이지 단위 + 맨앞/이전/다음/맨뒤)"""
+    group_start = (page - 1) // 10 * 10 + 1
+    group_end = min(group_start + 9, last_page)
+    cells = []
+    if group_start > 1:
+        cells.append(f'<td class="pgLL"><a href="{path}?code={ticker}&amp;page=1">맨앞</a></td>')
+    for p in range(group_start, group_end + 1):
+        cls = ' class="on"' if p == page else ''
+        cells.append(f'<td{cls}><a href="{path}?code={ticker}&amp;page={p}">{p}</a></td>')
+    if group_end < last_page:
+        cells.append(f'<td class="pgR"><a href="{path}?code={ticker}&amp;page={group_end + 1}">다음</a></td>')
+        cells.append(f'<td class="pgRR"><a href="{path}?code={ticker}&amp;page={last_page}">맨뒤</a></td>')
+    return ('<table summary="페이지 네비게이션 리스트" class="Nnavi" align="center">\n<tr>\n'
+            + '\n'.join(cells) + '\n</tr>\n</table>')
+
+
+def render_sise_day(ticker, page, days, as_of, path='/item/sise_day.nhn'):
+    rows = synthetic_prices(ticker, days, as_of)
+    last_page = max(1, (len(rows) + ROWS_PER_PAGE - 1) // ROWS_PER_PAGE)
+    # 네이버는 마지막 페이지를 넘는 요청에 마지막 페이지를 그대로 돌려줌
+    page = min(max(page, 1), last_page)
+    chunk = rows[(page - 1) * ROWS_PER_PAGE: page * ROWS_PER_PAGE]
+
+    body = ['<table cellspacing="0" class="type2">',
+            '<tr>\n<th>날짜</th>\n<th>종가</th>\n<th>전일비</th>\n<th>시가</th>\n'
+            '<th>고가</th>\n<th>저가</th>\n<th>거래량</th>\n</tr>',
+            '<tr>\n<td colspan="7" height="8"></td>\n</tr>']
+    for i, (d, close, diff, open_, high, low, volume) in enumerate(chunk):
+        body.append(
+            '<tr onmouseover="mouseOver(this)" onmouseout="mouseOut(this)">\n'
+            f'<td align="center"><span class="tah p10 gray03">{d:%Y.%m.%d}</span></td>\n'
+            f'<td class="num"><span class="tah p11">{close:,}</span></td>\n'
+            f'{_diff_cell(diff)}\n'
+            f'<td class="num"><span class="tah p11">{open_:,}</span></td>\n'
+            f'<td class="num"><span class="tah p11">{high:,}</span></td>\n'
+            f'<td class="num"><span class="tah p11">{low:,}</span></td>\n'
+            f'<td class="num"><span class="tah p11">{volume:,}</span></td>\n'
+            '</tr>')
+        if i == 4:
+            body.append('<tr>\n<td colspan="7" height="8"></td>\n</tr>\n'
+                        '<tr>\n<td colspan="7" height="1" bgcolor="#e1e1e1"></td>\n</tr>\n'
+                        '<tr>\n<td colspan="7" height="8"></td>\n</tr>')
+    body.append('<tr>\n<td colspan="7" height="8"></td>\n</tr>')
+    body.append('</table>')
+    body.append(_navi(ticker, page, last_page, path))
+
+    return ('<html lang="ko">\n<head>\n<meta http-equiv="Content-Type" content="text/html; charset=euc-kr">\n'
+            '<title>네이버 금융</title>\n</head>\n<body>\n' + '\n'.join(body) + '\n</body>\n</html>\n')
+
+
+@lru_cache(maxsize=4096)
+def synthetic_flows(ticker, days, as_of):
+    """종목별 결정적 가짜 수급 [(date, close, diff, volume, inst, frgn, holdings, ratio)] (최신순)"""
+    rng = random.Random((int(ticker) if ticker.isdigit() else hash(ticker)) + 7919)
+    holdings = rng.randint(1_000_000, 500_000_000)
+    rows = []
+    for d, close, diff, _, _, _, volume in synthetic_prices(ticker, days, as_of):
+        inst = int(rng.gauss(0, volume * 0.05))
+        frgn = int(rng.gauss(0, volume * 0.08))
+        ratio = rng.uniform(0.5, 55.0)
+        rows.append((d, close, diff, volume, inst, frgn, holdings, ratio))
+        holdings = max(0, holdings - frgn)
+    return rows
+
+
+def _signed(v):
+    cls = 'red01' if v > 0 else 'nv01' if v < 0 else ''
+    return f'<td class="num"><span class="tah p11 {cls}">{v:+,}</span></td>' if v else \
+        '<td class="num"><span class="tah p11">0</span></td>'
+
+
+def render_frgn(ticker, page, days, as_of, path='/item/frgn.naver'):
+    rows = synthetic_flows(ticker, days, as_of)
+    last_page = max(1, (len(rows) + FRGN_ROWS_PER_PAGE - 1) // FRGN_ROWS_PER_PAGE)
+    page = min(max(page, 1), last_page)
+    chunk = rows[(page - 1) * FRGN_ROWS_PER_PAGE: page * FRGN_ROWS_PER_PAGE]
+
+    body = ['<table summary="외국인 기관 순매매 거래량에 관한표이며 날짜별로 정보를 제공합니다." '
+            'width="100%" class="type2">',
+            '<caption>외국인 기관 순매매 거래량</caption>',
+            '<thead>\n<tr>\n<th rowspan="2" scope="col">날짜</th>\n<th rowspan="2" scope="col">종가</th>\n'
+            '<th rowspan="2" scope="col">전일비</th>\n<th rowspan="2" scope="col">등락률</th>\n'
+            '<th rowspan="2" scope="col">거래량</th>\n<th scope="col">기관</th>\n'
+            '<th colspan="3" scope="col">외국인</th>\n</tr>\n<tr>\n'
+            '<th scope="col">순매매량</th>\n<th scope="col">순매매량</th>\n'
+            '<th scope="col">보유주수</th>\n<th scope="col">보유율</th>\n</tr>\n</thead>',
+            '<tbody>',
+            '<tr>\n<td colspan="9" class="blank_07"></td>\n</tr>']
+    for d, close, diff, volume, inst, frgn, holdings, ratio in chunk:
+        rate = diff / (close - diff) * 100 if close != diff else 0.0
+        body.append(
+            '<tr onMouseOver="mouseOver(this)" onMouseOut="mouseOut(this)">\n'
+            f'<td class="tc"><span class="tah p10 gray03">{d:%Y.%m.%d}</span></td>\n'
+            f'<td class="num"><span class="tah p11">{close:,}</span></td>\n'
+            f'{_diff_cell(diff)}\n'
+            f'<td class="num"><span class="tah p11">{rate:+.2f}%</span></td>\n'
+            f'<td class="num"><span class="tah p11">{volume:,}</span></td>\n'
+            f'{_signed(inst)}\n{_signed(frgn)}\n'
+            f'<td class="num"><span class="tah p11">{holdings:,}</span></td>\n'
+            f'<td class="num"><span class="tah p11">{ratio:.2f}%</span></td>\n'
+            '</tr>')
+    body.append('</tbody>\n</table>')
+    body.append(_navi(ticker, page, last_page, path))
+
+    return ('<html lang="ko">\n<head>\n<meta http-equiv="Content-Type" content="text/html; charset=euc-kr">\n'
+            '<title>네이버 금융</title>\n</head>\n<body>\n' + '\n'.join(body) + '\n</body>\n</html>\n')
+
+
+class StubNaverServer:
+    """aiohttp 기반 대역 서버 (단독 실행 또는 백그라운드 스레드로 기동)"""
+
+    def __init__(self, host='127.0.0.1', port=8765, latency=0.05, days=400, as_of=None,
+                 throttle_rate=None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.days = days
+        self.as_of = as_of or date.today()
+        self.request_count = 0
+        self.throttle_rate = throttle_rate      # 초당 이 값을 넘으면 429 (요청 제한기 확인용)
+        self.throttled_count = 0
+        self._recent = deque()
+
+        self._loop = None
+        self._runner = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_get('/item/sise_day.nhn', self.handle_sise_day)
+        app.router.add_get('/item/sise_day.naver', self.handle_sise_day)
+        app.router.add_get('/item/frgn.naver', self.handle_frgn)
+        return app
+
+    async def _delay(self):
+        self.request_count += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+
+    def _over_limit(self):
+        """최근 1초 요청 수가 throttle_rate를 넘으면 True"""
+        if not self.throttle_rate:
+            return False
+        now = time.monotonic()
+        self._recent.append(now)
+        while self._recent and self._recent[0] < now - 1.0:
+            self._recent.popleft()
+        if len(self._recent) > self.throttle_rate:
+            self.throttled_count += 1
+            return True
+        return False
+
+    def _too_many(self):
+        return web.Response(status=429, text='Too Many Requests', headers={'Retry-After': '1'})
+
+    async def handle_sise_day(self, request):
+        if self._over_limit():
+            return self._too_many()
+        await self._delay()
+        ticker = request.query.get('code', '000000')
+        page = int(request.query.get('page', 1))
+        html = render_sise_day(ticker, page, self.days, self.as_of, request.path)
+        return web.Response(body=html.encode('euc-kr'),
+                            content_type='text/html', charset='euc-kr')
+
+    async def handle_frgn(self, request):
+        if self._over_limit():
+            return self._too_many()
+        await self._delay()
+        ticker = request.query.get('code', '000000')
+        page = int(request.query.get('page', 1))
+        html = render_frgn(ticker, page, self.days, self.as_of, request.path)
+        return web.Response(body=html.encode('euc-kr'),
+                            content_type='text/html', charset='euc-kr')
+
+    def start_background(self):
+        """별도 스레드의 이벤트 루프에서 서버 기동 (벤치마크용)"""
+        started = threading.Event()
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._runner = web.AppRunner(self.make_app(), access_log=None)
+            self._loop.run_until_complete(self._runner.setup())
+            site = web.TCPSite(self._runner, self.host, self.port)
+            self._loop.run_until_complete(site.start())
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._runner.cleanup())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=serve, daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Naver Finance stand-in server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated response delay (seconds)')
+    parser.add_argument('--days', type=int, default=400, help='Trading days of history per ticker')
+    parser.add_argument('--throttle-rate', type=float, default=None,
+                        help='Answer 429 when more than N requests arrive within one second')
+    args = parser.parse_args()
+
+    server = StubNaverServer(args.host, args.port, args.latency, args.days,
+                             throttle_rate=args.throttle_rate)
+    print(f"🧪 네이버 대역 서버: {server.base_url} (지연 {args.latency*1000:.0f}ms, {args.days}거래일)")
+    web.run_app(server.make_app(), host=args.host, port=args.port, access_log=None, print=None)
@@ -28,11 +28,12 @@ def get_monitoring_history(ticker):
     """모니터링 히스토리 조회"""
     query = """
     SELECT
-        date, open, high, low, close, volume,
-        price_change, volume_change, ma5, ma20, rsi
-    FROM stock_monitoring_history
-    WHERE ticker = %s
-    ORDER BY date DESC
+        p.date, p.open, p.high, p.low, p.close, p.volume,
+        i.price_change, i.volume_change, i.ma5, i.ma20, i.rsi14 AS rsi
+    FROM daily_prices p
+    JOIN daily_indicators i ON i.ticker = p.ticker AND i.date = p.date
+    WHERE p.ticker = %s
+    ORDER BY p.date DESC
     LIMIT 100
     """
     with get_db_connection() as conn:
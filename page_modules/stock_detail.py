@@ -34,10 +34,11 @@ def load_stock_info(ticker):
 def load_monitoring_history(ticker):
     """모니터링 히스토리"""
     query = """
-    SELECT date, open, high, low, close, volume, ma5, ma20, rsi
-    FROM stock_monitoring_history
-    WHERE ticker = %s
-    ORDER BY date
+    SELECT p.date, p.open, p.high, p.low, p.close, p.volume, i.ma5, i.ma20, i.rsi14 AS rsi
+    FROM daily_prices p
+    JOIN daily_indicators i ON i.ticker = p.ticker AND i.date = p.date
+    WHERE p.ticker = %s
+    ORDER BY p.date
     """
     with get_db_connection() as conn:
         return pd.read_sql(query, conn, params=(ticker,))
@@ -61,9 +62,9 @@ def load_ai_report(ticker):
 def get_latest_rsi(ticker):
     """최근 RSI 값 조회"""
     query = """
-    SELECT rsi
-    FROM stock_monitoring_history
-    WHERE ticker = %s AND rsi IS NOT NULL
+    SELECT rsi14 AS rsi
+    FROM daily_indicators
+    WHERE ticker = %s AND rsi14 IS NOT NULL
     ORDER BY date DESC
     LIMIT 1
     """
@@ -65,10 +65,15 @@ def load_rsi_batch(tickers):
         return {}
 
     query = """
-    SELECT DISTINCT ON (ticker) ticker, rsi
-    FROM stock_monitoring_history
-    WHERE ticker = ANY(%s) AND rsi IS NOT NULL
-    ORDER BY ticker, date DESC
+    SELECT t.ticker, i.rsi14 AS rsi
+    FROM unnest(%s::varchar[]) AS t(ticker)
+    CROSS JOIN LATERAL (
+        SELECT rsi14
+        FROM daily_indicators
+        WHERE ticker = t.ticker AND rsi14 IS NOT NULL
+        ORDER BY date DESC
+        LIMIT 1
+    ) i
     """
 
     with get_db_connection() as conn:
@@ -24,6 +24,7 @@ st.markdown("""
 
 from page_modules import ai_reports_compact as ai_reports
 from sidebar_utils import render_sidebar_badges
+from db_config import query_run
 
 st.sidebar.title("📊 StockGravity")
 st.sidebar.caption("Korean Stock Filtering & Monitoring System")
@@ -44,6 +45,8 @@ if st.sidebar.button("✅ Trading", use_container_width=True):
     st.switch_page("pages/3_✅_Trading.py")
 
 st.sidebar.markdown("---")
-render_sidebar_badges()
+# 페이지 렌더 1회 = 쿼리 계측 실행 단위 (DB_QUERY_STATS=1일 때 N+1 탐지)
+with query_run('page:ai_reports'):
+    render_sidebar_badges()
 
-ai_reports.render()
+    ai_reports.render()
@@ -18,11 +18,14 @@ st.set_page_config(
 
 from page_modules import stock_detail
 from sidebar_utils import render_sidebar_badges
+from db_config import query_run
 
 st.sidebar.title("📊 StockGravity")
 st.sidebar.caption("Korean Stock Filtering & Monitoring System")
 
-# 사이드바 배지 렌더링
-render_sidebar_badges()
+# 페이지 렌더 1회 = 쿼리 계측 실행 단위 (DB_QUERY_STATS=1일 때 N+1 탐지)
+with query_run('page:stock_detail'):
+    # 사이드바 배지 렌더링
+    render_sidebar_badges()
 
-stock_detail.render()
+    stock_detail.render()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+가격 패널 공유 메모리 병렬 실행기
+- (ticker, date) 정렬 패널을 컬럼별 연속 numpy 배열로 multiprocessing.shared_memory에 한 번만 복사
+- 종목 offset 인덱스(offsets[i] ~ offsets[i+1])로 종목 경계를 지켜 행 수가 비슷한 shard로 분할
+- 워커는 시작할 때 한 번 attach → shard DataFrame은 공유 메모리 배열의 view (패널 pickle 복사 없음)
+- 종목 단위로 독립인 계산(quick_filter.score_universe, analysis2.indicator_panel,
+  populate_monitoring_history.monitoring_rows)을 run_sharded() 하나로 병렬 실행
+
+사용법:
+    from panel_executor import run_sharded
+    scores = run_sharded(panel, score_universe, workers=8, columns=['close', 'volume'])
+"""
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+SHARDS_PER_WORKER = 4   # 종목별 행 수 편차를 흡수하도록 워커 수보다 잘게 나눔
+
+
+class SharedPanel:
+    """
+    공유 메모리에 올린 가격 패널
+
+    spec (picklable): 컬럼별 (공유 메모리 이름, dtype), 행 수, 종목 목록, 종목 offset
+    """
+
+    def __init__(self, spec, blocks, owner):
+        self.spec = spec
+        self._blocks = blocks
+        self._owner = owner
+        self.tickers = np.asarray(spec['tickers'], dtype=object)
+        self.offsets = np.asarray(spec['offsets'], dtype=np.int64)
+        self.arrays = {
+            name: np.ndarray(spec['rows'], dtype=np.dtype(dtype), buffer=blocks[name].buf)
+            for name, (_, dtype) in spec['columns'].items()
+        }
+
+    @classmethod
+    def create(cls, df, columns=None):
+        """DataFrame → 공유 메모리 (ticker, date 정렬이 아니면 정렬 후 복사)"""
+        columns = [c for c in (columns or df.columns) if c not in ('ticker', 'date')]
+        tickers = df['ticker'].to_numpy()
+        dates = df['date'].to_numpy()
+        if len(df) > 1 and not ((tickers[1:] >= tickers[:-1]).all() and
+                                ((tickers[1:] != tickers[:-1]) | (dates[1:] > dates[:-1])).all()):
+            df = df.sort_values(['ticker', 'date'], kind='stable')
+            tickers = df['ticker'].to_numpy()
+
+        bounds = np.flatnonzero(tickers[1:] != tickers[:-1]) + 1 if len(df) else np.zeros(0, np.int64)
+        offsets = np.concatenate([[0], bounds, [len(df)]]) if len(df) else np.zeros(1, np.int64)
+
+        source = {'date': df['date'].to_numpy()}
+        source.update({c: df[c].to_numpy() for c in columns})
+
+        blocks, spec_columns = {}, {}
+        try:
+            for name, values in source.items():
+                values = np.ascontiguousarray(values)
+                shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                blocks[name] = shm
+                np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+                spec_columns[name] = (shm.name, values.dtype.str)
+        except Exception:
+            for shm in blocks.values():
+                shm.close()
+                shm.unlink()
+            raise
+
+        spec = {
+            'rows': len(df),
+            'columns': spec_columns,
+            'tickers': tickers[offsets[:-1]].tolist(),
+            'ticker_dtype': str(df['ticker'].dtype),
+            'offsets': offsets.tolist(),
+        }
+        return cls(spec, blocks, owner=True)
+
+    @classmethod
+    def attach(cls, spec):
+        """워커에서 기존 공유 메모리에 연결"""
+        blocks = {name: shared_memory.SharedMemory(name=shm_name)
+                  for name, (shm_name, _) in spec['columns'].items()}
+        return cls(spec, blocks, owner=False)
+
+    def __len__(self):
+        return self.spec['rows']
+
+    def shards(self, n):
+        """종목 경계를 지키며 행 수가 비슷하도록 n개 (시작 종목, 끝 종목) 구간"""
+        n_tickers = len(self.tickers)
+        if n_tickers == 0:
+            return []
+        targets = np.linspace(0, len(self), n + 1)[1:-1]
+        cuts = np.searchsorted(self.offsets, targets)
+        cuts = np.unique(np.clip(np.concatenate([[0], cuts, [n_tickers]]), 0, n_tickers))
+        return list(zip(cuts[:-1].tolist(), cuts[1:].tolist()))
+
+    def frame(self, t0=0, t1=None):
+        """종목 구간 [t0, t1) 의 DataFrame (가격 컬럼은 공유 메모리 view, 복사 없음)"""
+        t1 = len(self.tickers) if t1 is None else t1
+        r0, r1 = self.offsets[t0], self.offsets[t1]
+        data = {'ticker': pd.array(np.repeat(self.tickers[t0:t1], np.diff(self.offsets[t0:t1 + 1])),
+                                   dtype=self.spec['ticker_dtype'])}
+        data.update({c: a[r0:r1] for c, a in self.arrays.items()})
+        return pd.DataFrame(data, copy=False)
+
+    def close(self):
+        self.arrays = {}
+        for shm in self._blocks.values():
+            shm.close()
+            if self._owner:
+                shm.unlink()
+        self._blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+# 워커 프로세스 전역 (initializer에서 한 번 attach)
+_PANEL = None
+
+
+def _attach(spec):
+    global _PANEL
+    _PANEL = SharedPanel.attach(spec)
+
+
+def _run_shard(task):
+    func, t0, t1, kwargs = task
+    return func(_PANEL.frame(t0, t1), **kwargs)
+
+
+def _combine(results):
+    results = [r for r in results if r is not None]
+    if not results:
+        return None
+    if not all(isinstance(r, pd.DataFrame) for r in results):
+        return results
+    ignore_index = all(isinstance(r.index, pd.RangeIndex) for r in results)
+    return pd.concat(results, ignore_index=ignore_index)
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def run_sharded(df, func, workers=None, columns=None, shards_per_worker=SHARDS_PER_WORKER, **kwargs):
+    """
+    종목 단위로 독립인 func(shard_df, **kwargs) 를 종목 shard별로 병렬 실행 → 종목 순서대로 합친 결과
+
+    Args:
+        df: (ticker, date, ...) 가격 패널
+        func: 모듈 최상위 함수 (워커로 이름만 전달), shard DataFrame을 받아 DataFrame 반환
+        workers: 프로세스 수 (None: CPU 수, 1 이하면 공유 메모리 없이 현재 프로세스에서 바로 실행)
+        columns: 공유 메모리에 올릴 컬럼 (기본: ticker, date 외 전체)
+    """
+    workers = default_workers() if workers is None else workers
+    if workers <= 1 or len(df) == 0:
+        if columns is not None:
+            df = df[['ticker', 'date'] + [c for c in columns if c not in ('ticker', 'date')]]
+        return func(df, **kwargs)
+
+    with SharedPanel.create(df, columns) as panel:
+        tasks = [(func, t0, t1, kwargs) for t0, t1 in panel.shards(workers * shards_per_worker)]
+        method = 'fork' if 'fork' in mp.get_all_start_methods() else 'spawn'
+        with mp.get_context(method).Pool(min(workers, len(tasks)), initializer=_attach,
+                                         initargs=(panel.spec,)) as pool:
+            results = pool.map(_run_shard, tasks, chunksize=1)
+    return _combine(results)
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+필터 가중치/기준 + 보유 탈락 규칙 파라미터 탐색 (그리드 / 랜덤)
+- 가격 패널을 한 번만 읽어 (거래일 × 종목) 행렬로 미리 계산: quick_filter 지표(filter_replay.compute_features),
+  종가, MA5, RSI(14), 3일/60일 평균 거래량 비율 → 설정마다 DB 조회 없음
+- 설정 하나 = quick_filter.FILTER_PARAMS + evaluate_approved.EXIT_PARAMS + top_n (하루 진입 종목 수)
+  · 거래일마다 필터 → 정규화 가중 점수 → 상위 top_n 종가 진입
+  · 다음 거래일부터 evaluate_stock 규칙으로 매일 재평가 → 첫 탈락일 종가 청산
+    (보유 기간은 거래일 기준, Stock Pool 순위는 그날 재현 점수 순위로 대신함)
+- 점수 계산 파라미터가 같은 설정끼리 묶어 순위 행렬을 한 번만 만들고, 묶음을 프로세스 풀에 분배
+- 결과는 설정 해시별로 캐시 (.cache/param_sweep.csv) → 같은 데이터로 다시 돌리면 새 설정만 계산
+
+사용법:
+    python param_sweep.py                             # 기본 그리드 (1,458개 설정)
+    python param_sweep.py --grid grid.json --workers 0
+    python param_sweep.py --random 2000 --seed 1 --objective avg_return
+"""
+import hashlib
+import itertools
+import json
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from evaluate_approved import EXIT_PARAMS
+from filter_replay import LOOKBACK_DAYS, compute_features
+from indicators import IndicatorState
+from panel_executor import default_workers
+from quick_filter import FILTER_PARAMS
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'param_sweep.csv')
+
+# 기본값: 현재 운영 중인 규칙
+BASE_PARAMS = {**FILTER_PARAMS, **EXIT_PARAMS, 'top_n': 20}
+RANK_KEYS = list(FILTER_PARAMS)        # 순위 행렬을 결정하는 파라미터
+
+DEFAULT_GRID = {
+    'w_value': [0.2, 0.4, 0.6],
+    'w_momentum': [0.1, 0.3, 0.5],
+    'w_volume': [0.1, 0.3, 0.5],
+    'min_change_5d': [-10, -5, 0],
+    'min_vol_ratio': [0.5, 1.0],
+    'max_hold': [5, 7, 10],
+    'rsi_max': [70, 75, 80],
+}
+
+METRICS = ['trades', 'avg_return', 'median_return', 'win_rate', 'avg_hold', 'daily_return', 'daily_std', 'ir']
+OBJECTIVES = ['ir', 'daily_return', 'avg_return', 'win_rate']
+
+INDICATOR_SPEC = {
+    'ma5': ('sma', 'close', 5),
+    'rsi14': ('rsi', 'close', 14),
+}
+
+
+def _matrix(frame, column, di, ti, shape):
+    out = np.full(shape, np.nan)
+    out[di, ti] = frame[column].to_numpy(dtype=float)
+    return out
+
+
+def build_context(panel, lookback_days=LOOKBACK_DAYS, max_hold=None):
+    """
+    가격 패널 (ticker, date, close, volume) → 탐색에 쓰는 (거래일 × 종목) 행렬 묶음
+    max_hold: 탐색할 최대 보유 기간 (이 기간만큼 남은 거래일까지만 진입 → 설정 간 같은 진입 구간)
+    """
+    panel = panel[['ticker', 'date', 'close', 'volume']].copy()
+    panel['date'] = pd.to_datetime(panel['date'])
+    dates = np.sort(panel['date'].unique())
+    tickers = np.sort(panel['ticker'].unique())
+    shape = (len(dates), len(tickers))
+    date_index, ticker_index = pd.Index(dates), pd.Index(tickers)
+
+    features = compute_features(panel, lookback_days, horizons=())
+    fdi, fti = date_index.get_indexer(features['date']), ticker_index.get_indexer(features['ticker'])
+
+    history = IndicatorState(INDICATOR_SPEC).warm(panel, keep_history=True)
+    hdi, hti = date_index.get_indexer(history['date']), ticker_index.get_indexer(history['ticker'])
+
+    close = _matrix(history, 'close', hdi, hti, shape)
+    volume = _matrix(history, 'volume', hdi, hti, shape)
+
+    # 청산 가격: 거래가 없던 날은 직전 종가
+    close_ff = pd.DataFrame(close).ffill().to_numpy()
+
+    # 3일 / 60일 (달력일) 평균 거래량 비율 (%) - get_volume_averages와 같은 구간 정의
+    # 거래량이 있는 행만 합산 (SQL AVG처럼 NULL 거래량은 건너뜀, 거래가 있던 날의 NaN도 누적합을 오염시키지 않음)
+    day_numbers = dates.astype('datetime64[D]').astype(np.int64)
+    has_volume = ~np.isnan(volume)
+    vol_sum = np.vstack([np.zeros((1, shape[1])), np.cumsum(np.where(has_volume, volume, 0), axis=0)])
+    vol_cnt = np.vstack([np.zeros((1, shape[1])), np.cumsum(has_volume, axis=0)])
+
+    def window_avg(days):
+        start = np.searchsorted(day_numbers, day_numbers - days, side='left')
+        rows = np.arange(shape[0]) + 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (vol_sum[rows] - vol_sum[start]) / (vol_cnt[rows] - vol_cnt[start])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vol_ratio_3_60 = window_avg(3) / window_avg(60) * 100
+
+    max_hold = max_hold or EXIT_PARAMS['max_hold']
+    fingerprint = hashlib.sha1(json.dumps([
+        len(panel), str(dates[0]), str(dates[-1]), len(tickers),
+        float(np.nansum(close)), float(np.nansum(volume)), lookback_days, max_hold,
+    ]).encode()).hexdigest()[:12]
+
+    return {
+        'dates': dates,
+        'tickers': tickers,
+        'trading_value': _matrix(features, 'trading_value', fdi, fti, shape),
+        'change_5d': _matrix(features, 'change_5d', fdi, fti, shape),
+        'vol_ratio': _matrix(features, 'vol_ratio', fdi, fti, shape),
+        'close': close,
+        'close_ff': close_ff,
+        'ma5': _matrix(history, 'ma5', hdi, hti, shape),
+        'rsi': _matrix(history, 'rsi14', hdi, hti, shape),
+        'vol_ratio_3_60': vol_ratio_3_60,
+        'last_entry': len(dates) - 1 - max_hold,
+        'fingerprint': fingerprint,
+    }
+
+
+def rank_matrix(ctx, params, depth=None):
+    """
+    거래일별 필터 → 정규화 가중 점수 → 순위 (filter_replay.select_daily와 같은 규칙, 동점은 종목 코드 순)
+    → (점수, 순위) 행렬, 필터 밖은 점수 NaN
+    depth: 정확한 순위가 필요한 깊이 (기본: max(top_n, keep_rank)), 그 밖은 모두 depth + 1
+    """
+    depth = depth or max(params.get('top_n', 0), params.get('keep_rank', 0))
+    tv, ch, vr = ctx['trading_value'], ctx['change_5d'], ctx['vol_ratio']
+    ok = ((tv > params['min_trading_value']) & (ch > params['min_change_5d']) &
+          (vr > params['min_vol_ratio']) & (ctx['close'] > params['min_close']))
+
+    score = np.zeros(tv.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for values, weight in ((tv, params['w_value']), (ch, params['w_momentum']), (vr, params['w_volume'])):
+            lo = np.where(ok, values, np.inf).min(axis=1, keepdims=True)
+            hi = np.where(ok, values, -np.inf).max(axis=1, keepdims=True)
+            score += (values - lo) / (hi - lo) * 100 * weight
+    score[~ok] = np.nan
+
+    # 거래일마다 depth번째 값까지의 후보만 정렬 (전체 정렬 대신 partition)
+    key = np.where(ok & ~np.isnan(score), -score, np.inf)
+    rank = np.full(tv.shape, depth + 1, dtype=np.int64)
+    depth_in_row = min(depth, tv.shape[1])
+    if depth_in_row == 0:
+        return score, rank
+    kth = np.partition(key, depth_in_row - 1, axis=1)[:, depth_in_row - 1:depth_in_row]
+    rows, cols = np.nonzero((key <= kth) & ok)
+    order = np.lexsort((cols, key[rows, cols], rows))
+    rows, cols = rows[order], cols[order]
+    position = np.arange(len(rows)) - np.searchsorted(rows, rows, side='left') + 1
+    keep = position <= depth
+    rank[rows[keep], cols[keep]] = position[keep]
+    return score, rank
+
+
+def simulate(ctx, score, rank, params):
+    """진입 → 매일 탈락 규칙 확인 → 청산 수익률(%) 성과 지표"""
+    entry = rank <= params['top_n']
+    entry[ctx['last_entry'] + 1:] = False
+    ei, ej = np.nonzero(entry)
+    if len(ei) == 0:
+        return dict.fromkeys(METRICS, np.nan) | {'trades': 0}
+
+    entry_price = ctx['close'][ei, ej]
+    initial = score[ei, ej]
+    exit_k = np.full(len(ei), params['max_hold'])
+    alive = np.ones(len(ei), dtype=bool)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for k in range(1, params['max_hold'] + 1):
+            r = ei + k
+            drop = np.full(len(ei), k >= params['max_hold'])
+            if k >= params['min_hold']:
+                change = (score[r, ej] - initial) / initial * 100
+                drop |= change < -params['score_drop']
+                drop |= (ctx['rsi'][r, ej] > params['rsi_max']) & (ctx['close'][r, ej] < ctx['ma5'][r, ej])
+                drop |= ctx['vol_ratio_3_60'][r, ej] < params['vol_drop']
+                drop |= rank[r, ej] > params['keep_rank']
+            exit_k[alive & drop] = k
+            alive &= ~drop
+            if not alive.any():
+                break
+
+    returns = (ctx['close_ff'][ei + exit_k, ej] / entry_price - 1) * 100
+    daily = pd.Series(returns).groupby(ei).mean()
+    daily_std = daily.std()
+    return {
+        'trades': len(returns),
+        'avg_return': returns.mean(),
+        'median_return': np.median(returns),
+        'win_rate': (returns > 0).mean() * 100,
+        'avg_hold': exit_k.mean(),
+        'daily_return': daily.mean(),
+        'daily_std': daily_std,
+        'ir': daily.mean() / daily_std if daily_std > 0 else np.nan,
+    }
+
+
+def config_hash(params, fingerprint):
+    """데이터 지문 + 파라미터 → 캐시 키"""
+    payload = json.dumps({'data': fingerprint, **{k: float(params[k]) for k in sorted(params)}}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def grid_configs(grid):
+    """그리드 → 설정 목록 (그리드에 없는 파라미터는 BASE_PARAMS)"""
+    keys = list(grid)
+    return [{**BASE_PARAMS, **dict(zip(keys, values))} for values in itertools.product(*grid.values())]
+
+
+def random_configs(grid, n, seed=0):
+    """그리드 값 중 파라미터별로 무작위 선택 → 중복 없는 설정 최대 n개"""
+    rng = np.random.default_rng(seed)
+    total = int(np.prod([len(v) for v in grid.values()]))
+    configs, seen = [], set()
+    while len(configs) < min(n, total):
+        params = {**BASE_PARAMS, **{k: v[rng.integers(len(v))] for k, v in grid.items()}}
+        key = tuple(params[k] for k in sorted(params))
+        if key not in seen:
+            seen.add(key)
+            configs.append(params)
+    return configs
+
+
+# 워커 프로세스 전역 (initializer에서 한 번 설정, fork면 복사 없이 공유)
+_CTX = None
+
+
+def _init(ctx):
+    global _CTX
+    _CTX = ctx
+
+
+def _run_group(task):
+    """점수 계산 파라미터가 같은 설정 묶음: 순위 행렬 1회 + 설정별 시뮬레이션"""
+    rank_params, configs = task
+    depth = max(max(p['top_n'], p['keep_rank']) for p in configs)
+    score, rank = rank_matrix(_CTX, rank_params, depth)
+    return [{**params, **simulate(_CTX, score, rank, params)} for params in configs]
+
+
+def _tasks(configs, chunk):
+    groups = {}
+    for params in configs:
+        groups.setdefault(tuple(params[k] for k in RANK_KEYS), []).append(params)
+    tasks = []
+    for key, members in groups.items():
+        for i in range(0, len(members), chunk):
+            tasks.append((dict(zip(RANK_KEYS, key)), members[i:i + chunk]))
+    return tasks
+
+
+def run_sweep(ctx, configs, workers=1, cache_path=DEFAULT_CACHE_PATH, chunk=64, verbose=True):
+    """
+    설정 목록 평가 → 설정별 파라미터 + 성과 지표 DataFrame (캐시에 있는 설정은 다시 계산하지 않음)
+    workers: 프로세스 수 (0: CPU 수)
+    """
+    workers = workers or default_workers()
+    unique = {}
+    for params in configs:
+        if params['max_hold'] > len(ctx['dates']) - 1 - ctx['last_entry']:
+            raise ValueError(f"max_hold {params['max_hold']} exceeds the context (build_context max_hold)")
+        params = {k: params[k] for k in BASE_PARAMS}
+        unique.setdefault(config_hash(params, ctx['fingerprint']), params)
+    configs = [{**params, 'config_hash': key} for key, params in unique.items()]
+
+    cached = pd.DataFrame()
+    if cache_path and os.path.exists(cache_path):
+        cached = pd.read_csv(cache_path, dtype={'config_hash': str}).drop_duplicates('config_hash', keep='last')
+    done = set(cached['config_hash']) if len(cached) else set()
+    pending = [p for p in configs if p['config_hash'] not in done]
+
+    start = time.perf_counter()
+    tasks = _tasks(pending, chunk)
+    if workers <= 1 or len(tasks) <= 1:
+        _init(ctx)
+        results = [_run_group(task) for task in tasks]
+    else:
+        method = 'fork' if 'fork' in mp.get_all_start_methods() else 'spawn'
+        with mp.get_context(method).Pool(min(workers, len(tasks)), initializer=_init, initargs=(ctx,)) as pool:
+            results = pool.map(_run_group, tasks, chunksize=1)
+    fresh = pd.DataFrame([row for group in results for row in group])
+
+    if verbose:
+        print(f"🔎 설정 {len(configs):,}개: 캐시 {len(configs) - len(pending):,}개, "
+              f"새로 계산 {len(pending):,}개 ({len(tasks):,}개 순위 묶음, {time.perf_counter() - start:.1f}초)")
+
+    if cache_path and len(fresh):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        cached = pd.concat([cached, fresh], ignore_index=True) if len(cached) else fresh
+        cached.to_csv(cache_path, index=False)
+
+    wanted = [p['config_hash'] for p in configs]
+    return cached.set_index('config_hash').loc[wanted].reset_index() if len(cached) else fresh
+
+
+def rank_results(results, objective='ir', min_trades=30):
+    """목표 지표 내림차순 순위표 (거래 수가 너무 적은 설정은 뒤로)"""
+    df = results.copy()
+    df['eligible'] = df['trades'] >= min_trades
+    df = df.sort_values(['eligible', objective], ascending=[False, False], kind='stable').reset_index(drop=True)
+    df.insert(0, 'rank', np.arange(1, len(df) + 1))
+    return df.drop(columns='eligible')
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from price_store import load_price_panel
+
+    parser = argparse.ArgumentParser(description='Parameter sweep for quick_filter weights/thresholds and exit rules')
+    parser.add_argument('--grid', help='JSON file mapping parameter name to a list of values')
+    parser.add_argument('--random', type=int, default=0, help='Sample N configurations from the grid instead')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--objective', choices=OBJECTIVES, default='ir')
+    parser.add_argument('--min-trades', type=int, default=30)
+    parser.add_argument('--days-back', type=int, default=400, help='Calendar days of price history to load')
+    parser.add_argument('--source', choices=['auto', 'store', 'db', 'duckdb'], default='auto')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes (0 = all cores)')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help="Result cache CSV ('' to disable)")
+    parser.add_argument('--output', default='param_sweep_results.csv')
+    parser.add_argument('--show', type=int, default=20, help='Rows of the ranked table to print')
+    args = parser.parse_args()
+
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid, encoding='utf-8') as f:
+            grid = json.load(f)
+    unknown = set(grid) - set(BASE_PARAMS)
+    if unknown:
+        parser.error(f"unknown parameters: {', '.join(sorted(unknown))}")
+
+    configs = random_configs(grid, args.random, args.seed) if args.random else grid_configs(grid)
+    configs.append(dict(BASE_PARAMS))   # 현재 규칙 (비교 기준)
+
+    start = time.perf_counter()
+    panel = load_price_panel(days_back=args.days_back, columns=['close', 'volume'], source=args.source)
+    ctx = build_context(panel, max_hold=max(p['max_hold'] for p in configs))
+    print(f"📊 패널 {len(panel):,}행 → {len(ctx['dates'])}거래일 × {len(ctx['tickers']):,}종목 행렬 "
+          f"({time.perf_counter() - start:.1f}초)")
+
+    results = rank_results(run_sweep(ctx, configs, args.workers, args.cache or None),
+                           args.objective, args.min_trades)
+    results.to_csv(args.output, index=False)
+
+    shown = ['rank'] + [k for k in BASE_PARAMS if k in grid] + METRICS
+    print(f"\n=== 상위 {args.show}개 설정 ({args.objective} 기준) ===")
+    print(results[shown].head(args.show).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+    base = results[results['config_hash'] == config_hash(BASE_PARAMS, ctx['fingerprint'])].iloc[0]
+    print(f"\n📌 현재 규칙: {int(base['rank'])}위 / {len(results):,}개 "
+          f"({args.objective}={base[args.objective]:.3f}, 평균 수익률 {base['avg_return']:.3f}%, "
+          f"승률 {base['win_rate']:.1f}%)")
+    print(f"💾 순위표: {args.output}")
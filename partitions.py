@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+월별 범위 파티션 관리 (daily_prices / daily_indicators / investor_flows)
+- 전환: migrations/partition_price_tables.sql (<테이블>_pYYYYMM, ensure_month_partitions 함수)
+- 새 달 파티션: bulk_loader 로더가 upsert 직전에 스테이징 날짜 범위로 자동 생성 (ensure_sql)
+- 보관 기간 정리: 기준일 이전 달 파티션 DETACH → DROP (메타데이터 작업, 스캔/VACUUM 없음)
+  기준일이 걸친 달만 해당 파티션 안에서 DELETE (파티션 하나만 스캔)
+- 아직 전환 전인 테이블은 기존 방식(DELETE + VACUUM ANALYZE)으로 처리
+
+사용법:
+    python partitions.py                        # 파티션 목록
+    python partitions.py --ahead 2              # 다음 2개월 파티션 미리 생성
+    python partitions.py --keep-days 200        # 보관 기간 밖 데이터 정리
+"""
+from datetime import date, timedelta
+from functools import lru_cache
+
+from db_config import get_db_connection, get_maintenance_connection, vacuum_analyze
+
+PARTITIONED_TABLES = ('daily_prices', 'daily_indicators', 'investor_flows')
+
+
+@lru_cache(maxsize=None)
+def is_partitioned(table):
+    """테이블이 파티션 테이블인지 (프로세스당 테이블마다 한 번 조회)"""
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+        row = cur.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def ensure_sql(table, source):
+    """source(스테이징) 날짜 범위를 덮는 월 파티션 생성 SQL (psycopg2 / asyncpg 공통)"""
+    return f"SELECT ensure_month_partitions('{table}', MIN(date), MAX(date)) FROM {source}"
+
+
+def list_partitions(cur, table):
+    """→ [(파티션 이름, 시작일, 끝일(미포함), 추정 행 수)] 시작일 순"""
+    cur.execute("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+    """, (table,))
+    parts = []
+    for name, bound, rows in cur.fetchall():
+        # FOR VALUES FROM ('2026-04-01') TO ('2026-05-01')
+        lo, hi = [date.fromisoformat(v) for v in bound.split("'")[1::2]]
+        parts.append((name, lo, hi, max(rows, 0)))
+    return sorted(parts, key=lambda p: p[1])
+
+
+def drop_before(table, cutoff):
+    """
+    cutoff 이전 데이터 삭제 → {'dropped': 지운 파티션 수, 'deleted': 경계 파티션에서 지운 행 수}
+    파티션 테이블이 아니면 DELETE + VACUUM ANALYZE
+    """
+    if not is_partitioned(table):
+        with get_db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(f"DELETE FROM {table} WHERE date < %s", (cutoff,))
+            deleted = cur.rowcount
+        if deleted > 0:
+            vacuum_analyze(table)
+        return {'dropped': 0, 'deleted': deleted}
+
+    # DETACH ... CONCURRENTLY는 트랜잭션 밖에서만 가능 → autocommit 연결
+    dropped, deleted = 0, 0
+    with get_maintenance_connection() as conn:
+        with conn.cursor() as cur:
+            for name, lo, hi, _ in list_partitions(cur, table):
+                if hi <= cutoff:
+                    cur.execute(f"ALTER TABLE {table} DETACH PARTITION {name} CONCURRENTLY")
+                    cur.execute(f"DROP TABLE {name}")
+                    dropped += 1
+                elif lo < cutoff:
+                    cur.execute(f"DELETE FROM {name} WHERE date < %s", (cutoff,))
+                    deleted += cur.rowcount
+                    if cur.rowcount > 0:
+                        cur.execute(f"VACUUM ANALYZE {name}")
+    return {'dropped': dropped, 'deleted': deleted}
+
+
+def apply_retention(keep_days, tables=PARTITIONED_TABLES, today=None):
+    """최근 keep_days일만 유지 (기존 CURRENT_DATE - INTERVAL 'N days'와 같은 기준) → 테이블별 결과"""
+    cutoff = (today or date.today()) - timedelta(days=keep_days)
+    return {table: drop_before(table, cutoff) for table in tables}
+
+
+def create_ahead(months=1, tables=PARTITIONED_TABLES, today=None):
+    """이번 달부터 months개월 뒤까지 파티션 미리 생성 → 테이블별 새로 만든 수"""
+    start = (today or date.today()).replace(day=1)
+    end = start
+    for _ in range(months):
+        end = (end + timedelta(days=32)).replace(day=1)
+    created = {}
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        for table in tables:
+            if is_partitioned(table):
+                cur.execute("SELECT ensure_month_partitions(%s, %s, %s)", (table, start, end))
+                created[table] = cur.fetchone()[0]
+    return created
+
+
+def print_partitions(tables=PARTITIONED_TABLES):
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        for table in tables:
+            if not is_partitioned(table):
+                print(f"📄 {table}: 단일 테이블 (migrations/partition_price_tables.sql 적용 전)")
+                continue
+            parts = list_partitions(cur, table)
+            total = sum(p[3] for p in parts)
+            print(f"🗂️  {table}: 파티션 {len(parts)}개, 약 {total:,}행")
+            for name, lo, hi, rows in parts:
+                print(f"   {name:<28} {lo} ~ {hi - timedelta(days=1)}  {rows:>10,}행")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Monthly partition maintenance for price tables')
+    parser.add_argument('--keep-days', type=int, help='Drop data older than N days')
+    parser.add_argument('--ahead', type=int, help='Create partitions for the next N months')
+    parser.add_argument('--tables', nargs='+', default=list(PARTITIONED_TABLES), help='Tables to maintain')
+    args = parser.parse_args()
+
+    if args.ahead:
+        for table, n in create_ahead(args.ahead, args.tables).items():
+            print(f"✅ {table}: 새 파티션 {n}개")
+    if args.keep_days is not None:
+        for table, result in apply_retention(args.keep_days, args.tables).items():
+            print(f"🗑️  {table}: 파티션 {result['dropped']}개 삭제, 경계 파티션 {result['deleted']:,}행 삭제")
+    if not args.ahead and args.keep_days is None:
+        print_partitions(args.tables)
@@ -7,6 +7,8 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 from db_config import get_db_connection
+from panel_executor import run_sharded
+from price_store import load_price_panel
 
 
 def calculate_rsi(prices, period=14):
@@ -36,8 +38,42 @@ def calculate_rsi(prices, period=14):
     return rsi
 
 
-def populate_history():
-    """모니터링 히스토리 채우기"""
+def monitoring_rows(df):
+    """
+    종목별 최근 60거래일 RSI / MA5 / MA20 / 변화율 → 저장할 행 (20거래일 미만 종목, RSI/MA20이 없는 날 제외)
+    종목 단위로 독립이라 panel_executor shard로 나눠 계산 가능
+    """
+    frames = []
+    for ticker, stock_data in df.groupby('ticker', sort=True):
+        if len(stock_data) < 20:
+            continue
+
+        # 최근 60일만
+        stock_data = stock_data.sort_values('date').tail(60).copy()
+
+        # RSI 계산
+        stock_data['rsi'] = calculate_rsi(stock_data['close'].values)
+
+        # MA 계산
+        stock_data['ma5'] = stock_data['close'].rolling(window=5).mean()
+        stock_data['ma20'] = stock_data['close'].rolling(window=20).mean()
+
+        # 변화율 계산
+        stock_data['price_change'] = stock_data['close'].pct_change() * 100
+        stock_data['volume_change'] = stock_data['volume'].pct_change() * 100
+
+        frames.append(stock_data[stock_data['rsi'].notna() & stock_data['ma20'].notna()])
+
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True)
+
+
+def populate_history(workers=1):
+    """
+    모니터링 히스토리 채우기
+    workers: 지표 계산 프로세스 수 (2 이상이면 panel_executor 공유 메모리 shard 병렬)
+    """
     print("\n" + "="*60)
     print("📊 모니터링 히스토리 생성 중...")
     print("="*60)
@@ -51,22 +87,23 @@ def populate_history():
 
     print(f"처리할 종목 수: {len(pool_df)}개")
 
-    # 2. 가격 데이터 로드 (DB에서)
-    print("가격 데이터 로드 중 (DB, 최근 90일)...")
+    # 2. 가격 데이터 로드 (price_store 스냅샷 우선, 최근 90일, 모니터링 종목만)
+    print("가격 데이터 로드 중 (최근 90일)...")
     with get_db_connection() as conn:
-        prices_df = pd.read_sql("""
-            SELECT ticker, date, open, high, low, close, volume
-            FROM daily_prices
-            WHERE date >= CURRENT_DATE - INTERVAL '90 days'
-            AND ticker IN (SELECT ticker FROM stock_pool WHERE status='monitoring')
-            ORDER BY ticker, date
-        """, conn)
+        cur = conn.cursor()
+        cur.execute("SELECT ticker FROM stock_pool WHERE status='monitoring'")
+        monitoring = [r[0] for r in cur.fetchall()]
+    prices_df = load_price_panel(days_back=90, tickers=monitoring)
 
     prices_df['date'] = pd.to_datetime(prices_df['date'])
     prices_df['ticker'] = prices_df['ticker'].astype(str).str.zfill(6)
     print(f"   ✅ {len(prices_df):,}행 로드")
 
-    # 3. 각 종목별로 처리
+    # 3. 종목별 지표 계산 (종목 단위 shard 병렬 가능)
+    history = run_sharded(prices_df, monitoring_rows, workers=workers,
+                          columns=['open', 'high', 'low', 'close', 'volume'])
+    counts = prices_df.groupby('ticker').size()
+    by_ticker = dict(tuple(history.groupby('ticker'))) if history is not None else {}
     total_saved = 0
 
     with get_db_connection() as conn:
@@ -75,35 +112,14 @@ def populate_history():
         for idx, row in pool_df.iterrows():
             ticker = row['ticker']
 
-            # 해당 종목의 가격 데이터 필터링
-            stock_data = prices_df[prices_df['ticker'] == ticker].copy()
-
-            if len(stock_data) < 20:
+            if counts.get(ticker, 0) < 20:
                 print(f"⚠️ {ticker}: 데이터 부족 (스킵)")
                 continue
-
-            # 최근 60일만
-            stock_data = stock_data.sort_values('date').tail(60)
-
-            # RSI 계산
-            close_prices = stock_data['close'].values
-            rsi_values = calculate_rsi(close_prices)
-
-            # MA 계산
-            stock_data['ma5'] = stock_data['close'].rolling(window=5).mean()
-            stock_data['ma20'] = stock_data['close'].rolling(window=20).mean()
-            stock_data['rsi'] = rsi_values
-
-            # 변화율 계산
-            stock_data['price_change'] = stock_data['close'].pct_change() * 100
-            stock_data['volume_change'] = stock_data['volume'].pct_change() * 100
+            stock_data = by_ticker.get(ticker, pd.DataFrame())
 
             # DB에 저장
             saved_days = 0
             for _, day_data in stock_data.iterrows():
-                if pd.isna(day_data['rsi']) or pd.isna(day_data['ma20']):
-                    continue
-
                 try:
                     cur.execute("""
                         INSERT INTO stock_monitoring_history
@@ -149,4 +165,11 @@ def populate_history():
 
 
 if __name__ == "__main__":
-    populate_history()
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Populate stock_monitoring_history from daily prices')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes for the indicator pass (shared-memory panel, 0 = all cores)')
+    args = parser.parse_args()
+
+    populate_history(workers=args.workers or None)
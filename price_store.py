@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+daily_prices 월별 파티션 Arrow 스냅샷 (분석용 읽기 전용 미러)
+- 파티션: .cache/price_store/month=YYYY-MM.arrow (Arrow IPC, 비압축 → memory-map 제로카피 읽기)
+- 가격은 float64, 거래량은 int64로 저장 → NUMERIC → Decimal 행 단위 변환 없음
+- 증분 갱신: created_at이 직전 동기화 이후인 월 + 행 수가 DB와 다른 월만 COPY로 다시 씀,
+  DB에서 사라진 월(오래된 데이터 정리)은 파티션 삭제
+- load_price_panel(): 날짜 범위에 걸치는 파티션만 열어 컬럼/종목 선택 후 DataFrame 반환
+  (source='auto'는 DB에 스냅샷 마지막 거래일 이후 데이터가 있으면 DB에서 직접 읽음 → 갱신 실패 시 오래된 가격 방지)
+
+사용법:
+    python price_store.py --refresh          # 변경된 월만 갱신
+    python price_store.py --refresh --full   # 전체 재생성
+    python price_store.py --status
+"""
+import io
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+from data_access import load_panel
+from db_config import get_db_connection
+
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'price_store')
+MANIFEST = 'manifest.json'
+
+PANEL_COLUMNS = ['ticker', 'date', 'open', 'high', 'low', 'close', 'volume']
+SCHEMA = pa.schema([
+    ('ticker', pa.string()),
+    ('date', pa.date32()),
+    ('open', pa.float64()),
+    ('high', pa.float64()),
+    ('low', pa.float64()),
+    ('close', pa.float64()),
+    ('volume', pa.int64()),
+])
+
+# 동시에 커밋 중이던 트랜잭션을 놓치지 않도록 직전 동기화 시각보다 조금 앞부터 확인
+SYNC_OVERLAP = timedelta(minutes=5)
+
+
+def _partition_name(month):
+    return f"month={month}.arrow"
+
+
+def _month_bounds(month):
+    start = datetime.strptime(month, '%Y-%m').date()
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+def read_manifest(store_dir=DEFAULT_STORE_DIR):
+    path = os.path.join(store_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_manifest(store_dir, manifest):
+    tmp = os.path.join(store_dir, MANIFEST + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(store_dir, MANIFEST))
+
+
+def _fetch_month(cur, month):
+    """한 달치 daily_prices → Arrow Table (COPY CSV, 정렬: ticker, date)"""
+    start, end = _month_bounds(month)
+    buf = io.BytesIO()
+    cur.copy_expert(cur.mogrify("""
+        COPY (
+            SELECT ticker, date, open::float8, high::float8, low::float8, close::float8, volume
+            FROM daily_prices
+            WHERE date >= %s AND date < %s
+            ORDER BY ticker, date
+        ) TO STDOUT WITH (FORMAT csv)
+    """, (start, end)).decode(), buf)
+    buf.seek(0)
+    return pa_csv.read_csv(
+        buf,
+        read_options=pa_csv.ReadOptions(column_names=SCHEMA.names, use_threads=False),
+        convert_options=pa_csv.ConvertOptions(column_types=SCHEMA),
+    )
+
+
+def _write_partition(store_dir, month, table):
+    """임시 파일에 쓴 뒤 교체 (읽는 쪽이 mmap 중인 이전 파일은 그대로 유효)"""
+    path = os.path.join(store_dir, _partition_name(month))
+    tmp = path + '.tmp'
+    with pa.OSFile(tmp, 'wb') as sink:
+        with pa.ipc.new_file(sink, SCHEMA) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def refresh_store(store_dir=DEFAULT_STORE_DIR, full=False, verbose=True):
+    """
+    스냅샷 갱신 → 다시 쓴 월 목록
+    full=True면 모든 월을 다시 씀
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = read_manifest(store_dir) or {'partitions': {}}
+    start_time = time.perf_counter()
+
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT LOCALTIMESTAMP")
+        synced_at = cur.fetchone()[0]
+
+        cur.execute("""
+            SELECT to_char(date, 'YYYY-MM') AS month, COUNT(*)
+            FROM daily_prices GROUP BY 1 ORDER BY 1
+        """)
+        db_counts = dict(cur.fetchall())
+        cur.execute("SELECT MAX(date) FROM daily_prices")
+        max_date = cur.fetchone()[0]
+
+        if full or not manifest.get('synced_at'):
+            stale = set(db_counts)
+        else:
+            since = datetime.fromisoformat(manifest['synced_at']) - SYNC_OVERLAP
+            cur.execute("""
+                SELECT DISTINCT to_char(date, 'YYYY-MM') FROM daily_prices WHERE created_at >= %s
+            """, (since,))
+            stale = {r[0] for r in cur.fetchall()}
+            stale |= {m for m, n in db_counts.items()
+                      if manifest['partitions'].get(m, {}).get('rows') != n}
+
+        for month in sorted(stale):
+            table = _fetch_month(cur, month)
+            _write_partition(store_dir, month, table)
+            manifest['partitions'][month] = {'rows': table.num_rows}
+
+    # DB에서 사라진 월 (cleanup_old_prices 등) 파티션 삭제
+    removed = [m for m in manifest['partitions'] if m not in db_counts]
+    for month in removed:
+        try:
+            os.remove(os.path.join(store_dir, _partition_name(month)))
+        except FileNotFoundError:
+            pass
+        del manifest['partitions'][month]
+
+    manifest['synced_at'] = synced_at.isoformat()
+    manifest['max_date'] = max_date.isoformat() if max_date else None
+    manifest['rows'] = sum(p['rows'] for p in manifest['partitions'].values())
+    _write_manifest(store_dir, manifest)
+
+    if verbose:
+        print(f"📦 가격 스냅샷 갱신: {len(stale)}개 월 재작성, {len(removed)}개 월 삭제 "
+              f"(총 {manifest['rows']:,}행, {time.perf_counter() - start_time:.1f}초)")
+    return sorted(stale)
+
+
+def _read_partition(path, columns):
+    """memory-map으로 열어 필요한 컬럼만 선택 (제로카피)"""
+    source = pa.memory_map(path, 'r')
+    table = pa.ipc.open_file(source).read_all()
+    return table.select(columns)
+
+
+def load_from_store(start=None, end=None, columns=None, tickers=None, store_dir=DEFAULT_STORE_DIR):
+    """스냅샷에서 [start, end] 구간 패널 → Arrow Table (ticker, date 정렬)"""
+    manifest = read_manifest(store_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"가격 스냅샷이 없습니다: {store_dir} (python price_store.py --refresh)")
+
+    columns = ['ticker', 'date'] + [c for c in (columns or PANEL_COLUMNS) if c not in ('ticker', 'date')]
+    months = sorted(manifest['partitions'])
+    if start is not None:
+        months = [m for m in months if _month_bounds(m)[1] > start]
+    if end is not None:
+        months = [m for m in months if _month_bounds(m)[0] <= end]
+
+    tables = [_read_partition(os.path.join(store_dir, _partition_name(m)), columns) for m in months]
+    if not tables:
+        return pa.schema([SCHEMA.field(c) for c in columns]).empty_table()
+    table = pa.concat_tables(tables)
+
+    mask = None
+    if start is not None:
+        mask = pc.greater_equal(table['date'], pa.scalar(start, pa.date32()))
+    if end is not None:
+        m = pc.less_equal(table['date'], pa.scalar(end, pa.date32()))
+        mask = m if mask is None else pc.and_(mask, m)
+    if tickers is not None:
+        m = pc.is_in(table['ticker'], value_set=pa.array([str(t).zfill(6) for t in tickers], pa.string()))
+        mask = m if mask is None else pc.and_(mask, m)
+    if mask is not None:
+        table = table.filter(mask)
+
+    # 파티션(월) 경계를 넘어 합쳤으므로 종목별로 다시 정렬
+    if len(tables) > 1:
+        table = table.sort_by([('ticker', 'ascending'), ('date', 'ascending')])
+    return table
+
+
+def snapshot_is_current(manifest):
+    """
+    스냅샷의 마지막 거래일 이후 행이 DB에 없으면 True
+    (date 범위 조건이라 마지막 월 파티션만 조회, 마지막 거래일을 기록하지 않은 이전 매니페스트는 False)
+    """
+    if not manifest.get('max_date'):
+        return False
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT MAX(date) FROM daily_prices WHERE date >= %s", (manifest['max_date'],))
+        latest = cur.fetchone()[0]
+    return latest is None or latest.isoformat() <= manifest['max_date']
+
+
+def load_from_db(start=None, end=None, columns=None, tickers=None, backend=None):
+    """
+    스냅샷이 없을 때의 대체 경로 (daily_prices → data_access.PricePanel → DataFrame)
+    backend: 'postgres' (바이너리 COPY) / 'duckdb' (analytics_db 미러), None이면 ANALYTICS_BACKEND
+    """
+    columns = [c for c in (columns or PANEL_COLUMNS) if c not in ('ticker', 'date')]
+    return load_panel(start, end, columns, tickers, backend=backend).to_frame()
+
+
+def load_price_panel(days_back=None, start=None, end=None, columns=None, tickers=None,
+                     source='auto', store_dir=DEFAULT_STORE_DIR):
+    """
+    분석용 가격 패널 (ticker, date 정렬 DataFrame)
+
+    Args:
+        days_back: 오늘 기준 최근 N일 (date >= 오늘 - N일, 기존 SQL의 CURRENT_DATE - INTERVAL과 동일)
+        start, end: 날짜 범위 (days_back보다 우선)
+        columns: 필요한 컬럼 (ticker, date는 항상 포함, 기본: OHLCV 전체)
+        tickers: 종목 제한
+        source: 'store' (스냅샷), 'db' (daily_prices 직접), 'duckdb' (analytics_db 미러),
+                'auto' (스냅샷이 있고 DB 최신 거래일까지 반영돼 있으면 스냅샷, 아니면 DB)
+    """
+    if start is None and days_back is not None:
+        start = date.today() - timedelta(days=days_back)
+
+    if source == 'auto':
+        manifest = read_manifest(store_dir)
+        source = 'db'
+        if manifest is not None:
+            if snapshot_is_current(manifest):
+                source = 'store'
+            else:
+                print(f"⚠️  가격 스냅샷이 DB보다 오래됨 (마지막 거래일 {manifest.get('max_date') or '기록 없음'}) "
+                      f"→ daily_prices에서 직접 조회 (python price_store.py --refresh)")
+
+    if source in ('db', 'duckdb'):
+        df = load_from_db(start, end, columns, tickers, backend='duckdb' if source == 'duckdb' else None)
+    else:
+        table = load_from_store(start, end, columns, tickers, store_dir)
+        table = table.set_column(table.schema.get_field_index('date'), 'date',
+                                 table['date'].cast(pa.timestamp('ns')))
+        df = table.to_pandas()
+
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+
+def refresh_after_update(store_dir=DEFAULT_STORE_DIR):
+    """가격 업데이트 스크립트 마지막에 호출 (첫 실행이면 전체 생성, 실패해도 업데이트는 유지)"""
+    try:
+        return refresh_store(store_dir)
+    except Exception as e:
+        print(f"⚠️  가격 스냅샷 갱신 실패 (다음 실행 때 재시도): {e}")
+        return None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Partitioned Arrow snapshot of daily_prices')
+    parser.add_argument('--store-dir', default=DEFAULT_STORE_DIR)
+    parser.add_argument('--refresh', action='store_true', help='Rewrite months changed since the last sync')
+    parser.add_argument('--full', action='store_true', help='With --refresh: rewrite every month')
+    parser.add_argument('--status', action='store_true', help='Show partitions and the last sync time')
+    args = parser.parse_args()
+
+    if args.refresh:
+        refresh_store(args.store_dir, full=args.full)
+
+    if args.status or not args.refresh:
+        manifest = read_manifest(args.store_dir)
+        if manifest is None:
+            print(f"📭 스냅샷 없음: {args.store_dir} (python price_store.py --refresh)")
+        else:
+            print(f"📦 {args.store_dir}")
+            print(f"   마지막 동기화: {manifest['synced_at']} | 마지막 거래일: {manifest.get('max_date')} "
+                  f"| 총 {manifest['rows']:,}행")
+            for month, p in sorted(manifest['partitions'].items()):
+                size = os.path.getsize(os.path.join(args.store_dir, _partition_name(month)))
+                print(f"   {month}: {p['rows']:>9,}행  {size/1024/1024:6.1f}MB")
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+쿼리 지연 계측 + 느린 쿼리 리포트 (opt-in)
+- DB_QUERY_STATS=1 (또는 db_config.enable_query_stats()) 이면 db_config 풀 연결의 커서 실행마다
+  문장 지문(리터럴 제거 후 해시), 지연(ms), 행 수, 호출 위치(저장소 안의 첫 호출 파일:줄 함수), 실행 단위(run_id)를
+  프로세스 안 링 버퍼에 기록 → 백그라운드 스레드가 주기적으로 query_stats 테이블에 저장
+- run_id: 기본은 스크립트 실행 1회 (스크립트명:pid:시작 시각), 페이지 렌더 등은 db_config.query_run()으로 구분
+- 리포트: 총 시간 / p95 상위 문장, N+1 패턴 (한 실행 단위에서 같은 위치의 같은 문장이 여러 번)
+
+사용법:
+    DB_QUERY_STATS=1 python run_pipeline_to_db.py
+    DB_QUERY_STATS=1 streamlit run app.py
+    python query_stats.py                     # 최근 7일 리포트
+    python query_stats.py --days 1 --top 30 --min-calls 20
+    python query_stats.py --purge-days 30     # 30일 지난 기록 삭제
+"""
+import atexit
+import hashlib
+import os
+import re
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.extras import execute_values
+
+from db_config import db_config
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+# 호출 위치로 보지 않는 저장소 안 파일 (커서 래퍼 자신)
+SKIP_FILES = {os.path.join(PROJECT_DIR, name) for name in ('db_config.py', 'query_stats.py')}
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_TUPLE = r"\(\s*\?(?:\s*,\s*\?)*\s*\)"
+_TUPLES = re.compile(rf"({_TUPLE})(?:\s*,\s*{_TUPLE})+")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)+\s*\)", re.IGNORECASE)
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+
+def normalize(sql):
+    """문장 → 리터럴/파라미터를 ?로 바꾸고 공백을 정리한 형태 (execute_values의 VALUES 목록도 하나로)"""
+    if isinstance(sql, bytes):
+        sql = sql.decode('utf-8', errors='replace')
+    elif not isinstance(sql, str):
+        sql = str(sql)
+    sql = _COMMENT.sub(' ', sql)
+    sql = _STRING.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = re.sub(r"%\(\w+\)s", '?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = ' '.join(sql.split())
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _TUPLES.sub(r'\1, ...', sql)
+
+
+def fingerprint(sql):
+    """→ (지문 16자리, 정규화 문장)"""
+    text = normalize(sql)
+    return hashlib.md5(text.encode()).hexdigest()[:16], text
+
+
+def call_site():
+    """저장소 안에서 DB를 부른 첫 프레임 → (모듈 경로, '경로:줄 함수')"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if path.startswith(PROJECT_DIR) and path not in SKIP_FILES and 'site-packages' not in path:
+            module = os.path.relpath(path, PROJECT_DIR)
+            return module, f"{module}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return '-', '-'
+
+
+class QueryRecorder:
+    """
+    커서 실행 기록 링 버퍼 + 주기적 저장
+
+    Args:
+        capacity: 버퍼 크기 (저장이 밀리면 오래된 기록부터 버림, dropped로 집계)
+        flush_interval: 저장 주기 (초)
+        flush_size: 이만큼 쌓이면 주기를 기다리지 않고 저장
+    """
+
+    def __init__(self, capacity=20000, flush_interval=30.0, flush_size=2000):
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.default_run = f"{os.path.basename(sys.argv[0]) or 'python'}:{os.getpid()}:" \
+                           f"{datetime.now():%Y%m%d%H%M%S}"
+        self.stats = {'recorded': 0, 'flushed': 0, 'dropped': 0, 'flush_errors': 0}
+        self._buffer = deque(maxlen=capacity)
+        self._statements = {}           # 지문 → 정규화 문장 (아직 저장 안 한 것)
+        self._known = set()             # 이미 query_fingerprints에 있는 지문
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = False
+        self._conn = None
+        self._pid = os.getpid()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name='query-stats-flush', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        return self
+
+    def record(self, sql, seconds, rows, run_id=None):
+        fp, text = fingerprint(sql)
+        module, site = call_site()
+        event = (datetime.now(), run_id or self.default_run, module, site, fp, seconds * 1000,
+                 rows if rows is not None and rows >= 0 else None)
+        with self._lock:
+            if len(self._buffer) == self.capacity:
+                self.stats['dropped'] += 1
+            self._buffer.append(event)
+            self.stats['recorded'] += 1
+            if fp not in self._known:
+                self._statements[fp] = text
+            full = len(self._buffer) >= self.flush_size
+        if full:
+            self._wake.set()
+
+    def _loop(self):
+        while not self._stop:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _connection(self):
+        # fork된 자식은 부모 연결을 쓰지 않음
+        if self._conn is None or self._conn.closed or self._pid != os.getpid():
+            self._conn = psycopg2.connect(**db_config.connect_kwargs())
+            self._pid = os.getpid()
+        return self._conn
+
+    def flush(self):
+        """버퍼 → query_fingerprints / query_stats (계측하지 않는 별도 연결)"""
+        with self._flush_lock:
+            with self._lock:
+                events = list(self._buffer)
+                self._buffer.clear()
+                statements = self._statements
+                self._statements = {}
+            if not events:
+                return 0
+            try:
+                conn = self._connection()
+                with conn.cursor(cursor_factory=extensions.cursor) as cur:
+                    if statements:
+                        execute_values(cur, """
+                            INSERT INTO query_fingerprints (fingerprint, statement) VALUES %s
+                            ON CONFLICT (fingerprint) DO NOTHING
+                        """, list(statements.items()))
+                    execute_values(cur, """
+                        INSERT INTO query_stats
+                        (recorded_at, run_id, module, call_site, fingerprint, duration_ms, row_count)
+                        VALUES %s
+                    """, events, page_size=1000)
+                conn.commit()
+            except psycopg2.Error:
+                # 계측 때문에 본 작업이 실패하지 않도록 기록만 버림
+                self.stats['flush_errors'] += 1
+                if self._conn is not None and not self._conn.closed:
+                    self._conn.rollback()
+                return 0
+            with self._lock:
+                self._known.update(statements)
+                self.stats['flushed'] += len(events)
+            return len(events)
+
+    def close(self):
+        self._stop = True
+        self._wake.set()
+        self.flush()
+        if self._conn is not None and not self._conn.closed:
+            self._conn.close()
+
+
+def top_statements(cur, days=7, limit=20):
+    cur.execute("""
+        SELECT s.fingerprint, COUNT(*) AS calls,
+               SUM(s.duration_ms) AS total_ms,
+               AVG(s.duration_ms) AS avg_ms,
+               percentile_cont(0.95) WITHIN GROUP (ORDER BY s.duration_ms) AS p95_ms,
+               AVG(s.row_count) AS avg_rows,
+               COUNT(DISTINCT s.run_id) AS runs,
+               string_agg(DISTINCT s.call_site, ', ') AS sites,
+               f.statement
+        FROM query_stats s
+        JOIN query_fingerprints f ON f.fingerprint = s.fingerprint
+        WHERE s.recorded_at >= NOW() - make_interval(days => %s)
+        GROUP BY s.fingerprint, f.statement
+        ORDER BY total_ms DESC
+        LIMIT %s
+    """, (days, limit))
+    return cur.fetchall()
+
+
+def n_plus_one(cur, days=7, min_calls=20, limit=20):
+    """한 실행 단위(run_id)에서 같은 위치의 같은 문장이 min_calls번 이상 → 위치별 요약"""
+    cur.execute("""
+        WITH per_run AS (
+            SELECT run_id, call_site, fingerprint, COUNT(*) AS calls, SUM(duration_ms) AS total_ms
+            FROM query_stats
+            WHERE recorded_at >= NOW() - make_interval(days => %s)
+            GROUP BY run_id, call_site, fingerprint
+            HAVING COUNT(*) >= %s
+        )
+        SELECT p.call_site, p.fingerprint, COUNT(*) AS runs,
+               AVG(p.calls) AS avg_calls, MAX(p.calls) AS max_calls,
+               AVG(p.total_ms) AS avg_total_ms, f.statement
+        FROM per_run p
+        JOIN query_fingerprints f ON f.fingerprint = p.fingerprint
+        GROUP BY p.call_site, p.fingerprint, f.statement
+        ORDER BY avg_total_ms DESC
+        LIMIT %s
+    """, (days, min_calls, limit))
+    return cur.fetchall()
+
+
+def _short(text, width=90):
+    return text if len(text) <= width else text[:width - 3] + '...'
+
+
+def print_report(days=7, top=20, min_calls=20):
+    with db_config.get_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT COUNT(*), COUNT(DISTINCT run_id), MIN(recorded_at), MAX(recorded_at)
+            FROM query_stats WHERE recorded_at >= NOW() - make_interval(days => %s)
+        """, (days,))
+        calls, runs, lo, hi = cur.fetchone()
+        print(f"📊 최근 {days}일 쿼리 {calls:,}건, 실행 단위 {runs:,}개 ({lo} ~ {hi})")
+        if not calls:
+            return
+
+        print(f"\n=== 총 소요 시간 상위 {top}개 문장 ===")
+        print(f"{'total(s)':>9} {'calls':>7} {'avg(ms)':>8} {'p95(ms)':>8} {'rows':>8} {'runs':>5}  statement")
+        for fp, n, total, avg, p95, rows, nruns, sites, statement in top_statements(cur, days, top):
+            print(f"{total / 1000:>9.2f} {n:>7,} {avg:>8.1f} {p95:>8.1f} {float(rows or 0):>8.0f} {nruns:>5}  "
+                  f"{_short(statement)}")
+            print(f"{'':>50}  ↳ {fp} @ {_short(sites, 80)}")
+
+        rows = n_plus_one(cur, days, min_calls, top)
+        print(f"\n=== N+1 의심 (한 실행 단위에서 같은 위치의 같은 문장 {min_calls}회 이상) ===")
+        if not rows:
+            print("   없음")
+        for site, fp, nruns, avg_calls, max_calls, avg_total, statement in rows:
+            print(f"⚠️  {site}: 실행당 평균 {float(avg_calls):,.0f}회 (최대 {max_calls:,}), "
+                  f"{float(avg_total) / 1000:.2f}초, {nruns}개 실행 단위")
+            print(f"    {fp} {_short(statement)}")
+
+
+def purge(days):
+    with db_config.get_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM query_stats WHERE recorded_at < NOW() - make_interval(days => %s)", (days,))
+        removed = cur.rowcount
+        cur.execute("""
+            DELETE FROM query_fingerprints f
+            WHERE NOT EXISTS (SELECT 1 FROM query_stats s WHERE s.fingerprint = f.fingerprint)
+        """)
+    print(f"🗑️  {days}일 지난 쿼리 기록 {removed:,}건 삭제")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Query latency report from query_stats')
+    parser.add_argument('--days', type=int, default=7, help='Look back N days')
+    parser.add_argument('--top', type=int, default=20, help='Statements to list')
+    parser.add_argument('--min-calls', type=int, default=20,
+                        help='Calls of one statement from one call site per run to flag as N+1')
+    parser.add_argument('--purge-days', type=int, help='Delete records older than N days and exit')
+    args = parser.parse_args()
+
+    if args.purge_days is not None:
+        purge(args.purge_days)
+    else:
+        print_report(args.days, args.top, args.min_calls)
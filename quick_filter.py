@@ -1,8 +1,8 @@
 import pandas as pd
 import numpy as np
-from tqdm import tqdm
 import argparse
-from db_config import get_db_connection
+from panel_executor import run_sharded
+from price_store import load_price_panel
 
 def calculate_stock_score(stock_df):
     """
@@ -38,78 +38,141 @@ def calculate_stock_score(stock_df):
         'vol_ratio': vol_ratio
     }
 
-def filter_stocks(stock_list_path, output_path, top_n=500, days_back=60):
+SCORE_COLUMNS = ['ticker', 'close', 'volume', 'trading_value', 'change_5d', 'vol_ratio']
+
+
+def window_mean(values, ends, window=20):
     """
-    옵션 B: 균형적 필터링 (상위 500개) - DB 버전
+    각 끝 행(ends)까지 직전 window행의 평균, NaN은 건너뜀 (pandas tail(window).mean()과 같은 값, 모두 NaN이면 NaN)
+    값 누적합과 유효 개수 누적합의 차이로 계산 → NaN 하나가 뒤쪽 종목의 누적합까지 번지지 않음
     """
-    print(f"Loading price data from DB (최근 {days_back}일)...")
-    with get_db_connection() as conn:
-        df = pd.read_sql(f"""
-            SELECT ticker, date, open, high, low, close, volume
-            FROM daily_prices
-            WHERE date >= CURRENT_DATE - INTERVAL '{days_back} days'
-            ORDER BY ticker, date
-        """, conn)
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    csum = np.concatenate([[0.0], np.cumsum(np.nan_to_num(values))])
+    ccnt = np.concatenate([[0], np.cumsum(valid)])
+    total = csum[ends + 1] - csum[ends + 1 - window]
+    count = ccnt[ends + 1] - ccnt[ends + 1 - window]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(count > 0, total / count, np.nan)
 
-    df['date'] = pd.to_datetime(df['date'])
-    df['ticker'] = df['ticker'].astype(str).str.zfill(6)
-    print(f"   ✅ {len(df):,}행 로드 (종목 {df['ticker'].nunique()}개)")
-
-    print("Calculating scores for all stocks...")
-    stock_scores = []
 
-    for ticker in tqdm(df['ticker'].unique()):
-        stock_df = df[df['ticker'] == ticker]
-        score_data = calculate_stock_score(stock_df)
+def score_universe(df):
+    """
+    전 종목 점수 지표를 한 번에 계산 (calculate_stock_score와 같은 값, 종목 오름차순)
+    - (ticker, date) 정렬 패널에서 종목 경계만 찾아 마지막 행/5일 전 행/20일 거래량 합을 인덱스로 계산
+    - 종목별 슬라이스(df[df['ticker'] == ticker])와 재정렬 없이 O(행 수)
+    """
+    tickers = df['ticker'].to_numpy()
+    dates = df['date'].to_numpy()
+    sorted_panel = len(df) < 2 or (
+        (tickers[1:] >= tickers[:-1]).all() and
+        ((tickers[1:] != tickers[:-1]) | (dates[1:] > dates[:-1])).all()
+    )
+    if not sorted_panel:
+        df = df.sort_values(['ticker', 'date'], kind='stable')
+        tickers = df['ticker'].to_numpy()
+
+    if len(df) == 0:
+        return pd.DataFrame(columns=SCORE_COLUMNS)
+
+    close = df['close'].to_numpy()
+    volume = df['volume'].to_numpy()
+
+    # 종목 구간 [starts, ends]
+    ends = np.append(np.flatnonzero(tickers[1:] != tickers[:-1]), len(df) - 1)
+    starts = np.insert(ends[:-1] + 1, 0, 0)
+    keep = (ends - starts + 1) >= 20    # calculate_stock_score와 같은 최소 거래일
+    starts, ends = starts[keep], ends[keep]
+
+    last_close = close[ends]
+    last_volume = volume[ends]
+    base_close = close[ends - 4]
+
+    # 20일 거래량 평균 (누적합 차이, NULL 거래량은 건너뜀)
+    vol_avg_20 = window_mean(volume, ends)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change_5d = np.where(base_close > 0, (last_close - base_close) / base_close * 100, 0)
+        vol_ratio = np.where(vol_avg_20 > 0, last_volume / vol_avg_20, 0)
+
+    return pd.DataFrame({
+        'ticker': tickers[ends],
+        'close': last_close,
+        'volume': last_volume,
+        'trading_value': last_close * last_volume,
+        'change_5d': change_5d,
+        'vol_ratio': vol_ratio,
+    })
 
-        if score_data:
-            stock_scores.append(score_data)
 
-    scores_df = pd.DataFrame(stock_scores)
+# 옵션 B 필터 기준 / 가중치 (filter_replay.py 과거 재현과 공유)
+FILTER_PARAMS = {
+    'min_trading_value': 100_000_000,   # 거래대금 > 1억원
+    'min_change_5d': -5,                # 5일 등락률 > -5%
+    'min_vol_ratio': 0.5,               # 거래량 증가율 > 0.5배
+    'min_close': 5000,                  # 종가 > 5,000원
+    'w_value': 0.4,                     # 거래대금 점수 가중치
+    'w_momentum': 0.3,                  # 모멘텀 점수 가중치
+    'w_volume': 0.3,                    # 거래량 증가율 점수 가중치
+}
 
-    print(f"\nTotal stocks analyzed: {len(scores_df)}")
 
-    # 필터링 기준 적용
-    print("\nApplying filters...")
+def rank_scores(scores_df, params=FILTER_PARAMS):
+    """
+    score_universe 결과 → 필터 통과 종목 + 정규화 점수 (final_score 내림차순)
+    거래대금, 모멘텀, 거래량 증가율을 필터 통과 종목 안에서 0-100으로 Min-Max 정규화 후 가중 평균
+    """
     filtered = scores_df[
-        (scores_df['trading_value'] > 100_000_000) &  # 거래대금 > 1억원
-        (scores_df['change_5d'] > -5) &               # 5일 등락률 > -5%
-        (scores_df['vol_ratio'] > 0.5) &              # 거래량 증가율 > 0.5배
-        (scores_df['close'] > 5000)                   # 종가 > 5,000원
+        (scores_df['trading_value'] > params['min_trading_value']) &
+        (scores_df['change_5d'] > params['min_change_5d']) &
+        (scores_df['vol_ratio'] > params['min_vol_ratio']) &
+        (scores_df['close'] > params['min_close'])
     ].copy()
 
-    print(f"After filtering: {len(filtered)} stocks")
+    # 통과 종목이 없어도 점수 컬럼은 있는 빈 프레임을 돌려줌
+    for col, score_col in (('trading_value', 'trading_value_score'),
+                           ('change_5d', 'momentum_score'),
+                           ('vol_ratio', 'volume_score')):
+        lo, hi = filtered[col].min(), filtered[col].max()
+        filtered[score_col] = (filtered[col] - lo) / (hi - lo) * 100
 
-    # 점수 계산 (정규화)
-    # 거래대금, 모멘텀, 거래량 증가율을 0-100 범위로 정규화
-    if len(filtered) > 0:
-        # Min-Max 정규화
-        filtered['trading_value_score'] = (
-            (filtered['trading_value'] - filtered['trading_value'].min()) /
-            (filtered['trading_value'].max() - filtered['trading_value'].min()) * 100
-        )
+    # 가중 평균 점수
+    filtered['final_score'] = (
+        filtered['trading_value_score'] * params['w_value'] +
+        filtered['momentum_score'] * params['w_momentum'] +
+        filtered['volume_score'] * params['w_volume']
+    )
 
-        # 모멘텀은 -5 ~ max 범위를 0-100으로
-        filtered['momentum_score'] = (
-            (filtered['change_5d'] - filtered['change_5d'].min()) /
-            (filtered['change_5d'].max() - filtered['change_5d'].min()) * 100
-        )
+    # 점수 순으로 정렬
+    return filtered.sort_values('final_score', ascending=False)
 
-        filtered['volume_score'] = (
-            (filtered['vol_ratio'] - filtered['vol_ratio'].min()) /
-            (filtered['vol_ratio'].max() - filtered['vol_ratio'].min()) * 100
-        )
 
-        # 가중 평균 점수
-        filtered['final_score'] = (
-            filtered['trading_value_score'] * 0.4 +
-            filtered['momentum_score'] * 0.3 +
-            filtered['volume_score'] * 0.3
-        )
+def filter_stocks(stock_list_path, output_path, top_n=500, days_back=60, source='auto', workers=1):
+    """
+    옵션 B: 균형적 필터링 (상위 500개) - DB 버전
+    source: 가격 패널 출처 ('auto'면 price_store 스냅샷 우선, 없으면 daily_prices, 'duckdb'면 analytics_db 미러)
+    workers: 점수 계산 프로세스 수 (2 이상이면 panel_executor 공유 메모리 shard 병렬)
+    """
+    print(f"Loading price data (최근 {days_back}일)...")
+    df = load_price_panel(days_back=days_back, columns=['open', 'high', 'low', 'close', 'volume'],
+                          source=source)
+
+    df['date'] = pd.to_datetime(df['date'])
+    df['ticker'] = df['ticker'].astype(str).str.zfill(6)
+    print(f"   ✅ {len(df):,}행 로드 (종목 {df['ticker'].nunique()}개)")
 
-        # 점수 순으로 정렬
-        filtered = filtered.sort_values('final_score', ascending=False)
+    print("Calculating scores for all stocks...")
+    scores_df = run_sharded(df, score_universe, workers=workers, columns=['close', 'volume'])
 
+    print(f"\nTotal stocks analyzed: {len(scores_df)}")
+
+    # 필터링 기준 적용 + 정규화 점수
+    print("\nApplying filters...")
+    filtered = rank_scores(scores_df)
+
+    print(f"After filtering: {len(filtered)} stocks")
+
+    if len(filtered) > 0:
         # 상위 N개 선정
         top_stocks = filtered.head(top_n)
 
@@ -146,9 +209,14 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Filter stocks based on trading metrics (DB version)')
     parser.add_argument('--top', type=int, default=500, help='Number of top stocks to select')
     parser.add_argument('--days', type=int, default=60, help='Number of days to look back')
+    parser.add_argument('--source', choices=['auto', 'store', 'db', 'duckdb'], default='auto',
+                        help='Price panel source (price_store snapshot, daily_prices or the DuckDB mirror)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes for scoring (shared-memory panel, 0 = all cores)')
     args = parser.parse_args()
 
     STOCK_LIST_FILE = "korean_stocks_list.csv"
     OUTPUT_FILE = "filtered_stocks.csv"
 
-    filter_stocks(STOCK_LIST_FILE, OUTPUT_FILE, top_n=args.top, days_back=args.days)
+    filter_stocks(STOCK_LIST_FILE, OUTPUT_FILE, top_n=args.top, days_back=args.days, source=args.source,
+                  workers=args.workers or None)
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스크레이퍼 공용 적응형 요청 제한기 (token bucket + AIMD)
+- 엔드포인트별 버킷 상태를 mmap 파일에 두고 fcntl.flock으로 잠금 → 여러 프로세스/스레드가 같은 예산을 공유
+- 정상 응답이 이어지면 1초마다 rate를 조금씩 올리고 (additive increase),
+  429/5xx/차단 페이지를 받으면 rate를 절반으로 내리고 잠시 전체 요청을 멈춤 (multiplicative decrease)
+- 현재 rate, 실측 요청 속도, 백오프 횟수는 상태 파일 자체가 지표 (--status), 백오프 이벤트는 events.jsonl에 기록
+
+사용법:
+    limiter = RateLimiter()
+    limiter.acquire('naver.frgn')                       # 토큰을 얻을 때까지 대기
+    limiter.feedback('naver.frgn', resp.status_code, resp.text)
+
+    python rate_limiter.py --status            # 엔드포인트별 현재 상태
+    python rate_limiter.py --status --watch 2  # 2초마다 갱신
+    python rate_limiter.py --events 20         # 최근 백오프 이벤트
+    python rate_limiter.py --reset             # 기본 예산으로 초기화
+"""
+import asyncio
+import fcntl
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+DEFAULT_STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'ratelimit')
+
+Budget = namedtuple('Budget', ['rate', 'min_rate', 'max_rate', 'burst'])
+
+# 엔드포인트별 기본 예산 (초당 요청 수)
+DEFAULT_BUDGETS = {
+    'naver.sise_day': Budget(rate=20.0, min_rate=1.0, max_rate=50.0, burst=10.0),
+    'naver.frgn': Budget(rate=15.0, min_rate=1.0, max_rate=40.0, burst=10.0),
+    'naver': Budget(rate=10.0, min_rate=1.0, max_rate=30.0, burst=5.0),
+    'kiwoom.price': Budget(rate=8.0, min_rate=1.0, max_rate=20.0, burst=5.0),
+}
+
+ADDITIVE_STEP = 0.5         # 정상 응답이 이어질 때 1초마다 올리는 rate
+DECREASE_FACTOR = 0.5       # 제한 신호를 받으면 곱하는 비율
+BACKOFF_SECONDS = 2.0       # Retry-After가 없을 때 전체 요청을 멈추는 시간
+BACKOFF_COOLDOWN = 1.0      # 같은 폭주에 대해 여러 워커가 연달아 rate를 깎지 않도록
+
+THROTTLE_STATUSES = {403, 429}
+BLOCK_MARKERS = ('비정상적인 접근', '일시적으로 제한', '접근이 제한', 'captcha')
+
+# 상태 파일 레이아웃 (little-endian, 고정 크기)
+_FIELDS = ('rate', 'min_rate', 'max_rate', 'burst', 'tokens', 'updated_at',
+           'backoff_until', 'last_increase_at', 'last_backoff_at',
+           'ewma_interval', 'last_acquire_at', 'wait_total',
+           'acquired', 'throttled', 'backoffs', 'increases')
+_STRUCT = struct.Struct('<12d4Q')
+
+
+def endpoint_for_url(url):
+    """URL → 예산 이름 (네이버 금융 페이지 종류별)"""
+    if 'sise_day' in url:
+        return 'naver.sise_day'
+    if 'frgn' in url:
+        return 'naver.frgn'
+    return 'naver'
+
+
+def is_throttle_response(status=None, text=None):
+    """429/403/5xx 응답이거나 본문이 차단 안내 페이지면 True"""
+    if status is not None and (status in THROTTLE_STATUSES or status >= 500):
+        return True
+    if text:
+        head = text[:4000]
+        return any(m in head for m in BLOCK_MARKERS)
+    return False
+
+
+def _retry_after_seconds(value):
+    """Retry-After 헤더(초) → 대기 시간 (없거나 날짜 형식이면 기본값)"""
+    try:
+        return max(0.0, float(value)) if value else BACKOFF_SECONDS
+    except (TypeError, ValueError):
+        return BACKOFF_SECONDS
+
+
+class RateLimiter:
+    """
+    프로세스 간 공유 token bucket
+
+    Args:
+        state_dir: 상태 파일 디렉터리 (<endpoint>.bucket, events.jsonl)
+        budgets: {endpoint: Budget} (기본: DEFAULT_BUDGETS, 모르는 엔드포인트는 'naver' 예산)
+    """
+
+    def __init__(self, state_dir=DEFAULT_STATE_DIR, budgets=None):
+        self.state_dir = state_dir
+        self.budgets = dict(DEFAULT_BUDGETS, **(budgets or {}))
+        self.waited = 0.0
+
+        self._buckets = {}
+        self._pid = None
+        self._lock = threading.Lock()
+        os.makedirs(state_dir, exist_ok=True)
+
+    # multiprocessing 워커로 넘길 때는 열린 파일/mmap 없이 복사 (워커에서 다시 열기)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_buckets'] = {}
+        state['_pid'] = None
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _bucket(self, endpoint):
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._buckets = {}
+
+        bucket = self._buckets.get(endpoint)
+        if bucket is None:
+            path = os.path.join(self.state_dir, f"{endpoint}.bucket")
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size < _STRUCT.size:
+                    os.ftruncate(fd, _STRUCT.size)
+                    mm = mmap.mmap(fd, _STRUCT.size)
+                    self._write(mm, self._initial_state(endpoint))
+                else:
+                    mm = mmap.mmap(fd, _STRUCT.size)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            bucket = self._buckets[endpoint] = (fd, mm)
+        return bucket
+
+    def _initial_state(self, endpoint):
+        budget = self.budgets.get(endpoint, self.budgets['naver'])
+        st = dict.fromkeys(_FIELDS, 0.0)
+        st.update(rate=budget.rate, min_rate=budget.min_rate, max_rate=budget.max_rate,
+                  burst=budget.burst, tokens=budget.burst, updated_at=time.time())
+        for k in ('acquired', 'throttled', 'backoffs', 'increases'):
+            st[k] = 0
+        return st
+
+    @staticmethod
+    def _read(mm):
+        return dict(zip(_FIELDS, _STRUCT.unpack_from(mm, 0)))
+
+    @staticmethod
+    def _write(mm, st):
+        _STRUCT.pack_into(mm, 0, *(st[k] for k in _FIELDS))
+
+    @contextmanager
+    def _locked(self, endpoint):
+        """스레드 잠금 + 파일 잠금 안에서 상태 읽기/쓰기"""
+        with self._lock:
+            fd, mm = self._bucket(endpoint)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                st = self._read(mm)
+                yield st
+                self._write(mm, st)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def _try_take(self, endpoint):
+        """토큰 1개 시도 → 0이면 획득, 아니면 기다릴 시간(초)"""
+        with self._locked(endpoint) as st:
+            now = time.time()
+            st['tokens'] = min(st['burst'], st['tokens'] + (now - st['updated_at']) * st['rate'])
+            st['updated_at'] = now
+
+            if now < st['backoff_until']:
+                return st['backoff_until'] - now
+            if st['tokens'] < 1.0:
+                return (1.0 - st['tokens']) / st['rate']
+
+            st['tokens'] -= 1.0
+            st['acquired'] += 1
+            if st['last_acquire_at']:
+                interval = now - st['last_acquire_at']
+                st['ewma_interval'] = (interval if not st['ewma_interval']
+                                       else 0.9 * st['ewma_interval'] + 0.1 * interval)
+            st['last_acquire_at'] = now
+            return 0.0
+
+    def _add_wait(self, endpoint, waited):
+        if waited > 0:
+            self.waited += waited
+            with self._locked(endpoint) as st:
+                st['wait_total'] += waited
+
+    def acquire(self, endpoint):
+        """토큰을 얻을 때까지 대기 → 기다린 시간(초)"""
+        waited = 0.0
+        while True:
+            wait = self._try_take(endpoint)
+            if wait <= 0:
+                self._add_wait(endpoint, waited)
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, endpoint):
+        """asyncio용 acquire (이벤트 루프를 막지 않고 대기)"""
+        waited = 0.0
+        while True:
+            wait = self._try_take(endpoint)
+            if wait <= 0:
+                self._add_wait(endpoint, waited)
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def feedback(self, endpoint, status=None, text=None, retry_after=None):
+        """
+        응답 결과 반영 → 제한 신호였으면 True
+        - 제한 신호: rate 절반, backoff_until까지 모든 프로세스의 요청 중지, 이벤트 기록
+        - 정상: 직전 증가로부터 1초 이상 지났으면 rate += ADDITIVE_STEP
+        """
+        throttled = is_throttle_response(status, text)
+        event = None
+
+        with self._locked(endpoint) as st:
+            now = time.time()
+            if throttled:
+                st['throttled'] += 1
+                if now - st['last_backoff_at'] >= BACKOFF_COOLDOWN:
+                    old_rate = st['rate']
+                    st['rate'] = max(st['min_rate'], st['rate'] * DECREASE_FACTOR)
+                    st['tokens'] = 0.0
+                    pause = _retry_after_seconds(retry_after)
+                    st['backoff_until'] = max(st['backoff_until'], now + pause)
+                    st['last_backoff_at'] = now
+                    st['backoffs'] += 1
+                    event = {'ts': now, 'endpoint': endpoint, 'status': status,
+                             'rate_before': round(old_rate, 2), 'rate_after': round(st['rate'], 2),
+                             'pause': pause, 'pid': os.getpid()}
+            elif now >= st['backoff_until'] and now - st['last_increase_at'] >= 1.0:
+                if st['rate'] < st['max_rate']:
+                    st['rate'] = min(st['max_rate'], st['rate'] + ADDITIVE_STEP)
+                    st['increases'] += 1
+                st['last_increase_at'] = now
+
+        if event is not None:
+            with open(os.path.join(self.state_dir, 'events.jsonl'), 'a') as f:
+                f.write(json.dumps(event) + '\n')
+        return throttled
+
+    def snapshot(self, endpoint):
+        """현재 상태 (지표) → dict"""
+        with self._locked(endpoint) as st:
+            snap = dict(st)
+        now = time.time()
+        snap['endpoint'] = endpoint
+        snap['live_rate'] = (1.0 / snap['ewma_interval']
+                             if snap['ewma_interval'] and now - snap['last_acquire_at'] < 5 else 0.0)
+        snap['in_backoff'] = now < snap['backoff_until']
+        return snap
+
+    def endpoints(self):
+        """상태 파일이 있는 엔드포인트 목록"""
+        return sorted(f[:-len('.bucket')] for f in os.listdir(self.state_dir) if f.endswith('.bucket'))
+
+    def reset(self, endpoint):
+        with self._locked(endpoint) as st:
+            st.update(self._initial_state(endpoint))
+
+    def recent_events(self, n=20):
+        path = os.path.join(self.state_dir, 'events.jsonl')
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            lines = f.readlines()[-n:]
+        return [json.loads(line) for line in lines]
+
+    def summary(self):
+        return f"요청 제한 대기 {self.waited:.1f}초"
+
+
+def make_limiter(state_dir=None, no_limit=False):
+    """CLI 옵션 → RateLimiter (또는 None)"""
+    if no_limit:
+        return None
+    return RateLimiter(state_dir or DEFAULT_STATE_DIR)
+
+
+def print_status(limiter):
+    print(f"\n{'endpoint':<16} {'rate':>6} {'live':>6} {'max':>6} {'tokens':>7} "
+          f"{'acquired':>9} {'throttled':>9} {'backoffs':>8} {'wait s':>8}  state")
+    print('-' * 96)
+    for endpoint in limiter.endpoints():
+        s = limiter.snapshot(endpoint)
+        state = '⏸️  backoff' if s['in_backoff'] else '✅'
+        print(f"{endpoint:<16} {s['rate']:>6.1f} {s['live_rate']:>6.1f} {s['max_rate']:>6.1f} "
+              f"{s['tokens']:>7.1f} {s['acquired']:>9,} {s['throttled']:>9,} {s['backoffs']:>8,} "
+              f"{s['wait_total']:>8.1f}  {state}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Shared scraper rate limiter')
+    parser.add_argument('--state-dir', default=DEFAULT_STATE_DIR)
+    parser.add_argument('--status', action='store_true', help='Show per-endpoint rate and counters')
+    parser.add_argument('--watch', type=float, metavar='SEC', help='Refresh --status every SEC seconds')
+    parser.add_argument('--events', type=int, metavar='N', help='Show the last N backoff events')
+    parser.add_argument('--reset', action='store_true', help='Reset all buckets to their default budgets')
+    args = parser.parse_args()
+
+    limiter = RateLimiter(args.state_dir)
+
+    if args.reset:
+        for endpoint in set(limiter.endpoints()) | set(DEFAULT_BUDGETS):
+            limiter.reset(endpoint)
+        print(f"🔁 {len(set(limiter.endpoints()))}개 엔드포인트 초기화")
+
+    if args.events:
+        print(f"\n📉 최근 백오프 이벤트 ({args.events}개)")
+        for e in limiter.recent_events(args.events):
+            ts = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(e['ts']))
+            print(f"   {ts} {e['endpoint']:<16} status={e['status']} "
+                  f"rate {e['rate_before']} → {e['rate_after']} (pause {e['pause']}s, pid {e['pid']})")
+
+    if args.status or args.watch:
+        try:
+            while True:
+                print_status(limiter)
+                if not args.watch:
+                    break
+                time.sleep(args.watch)
+        except KeyboardInterrupt:
+            pass
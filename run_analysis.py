@@ -30,7 +30,7 @@ def main():
     if not run_script("create_complete_daily_prices.py", limit_args): return
     
     # 2. 데이터 수집 - 수급
-    if not run_script("all_institutional_trend_data.py", limit_args): return
+    if not run_script("all_institutional_trend_data_fast.py", ["--to-db", "--incremental"] + limit_args): return
     
     # 3. 파동 분석 (데이터가 적으므로 그대로 실행)
     if not run_script("analysis2.py"): return
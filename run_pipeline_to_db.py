@@ -5,8 +5,10 @@ StockGravity 파이프라인 - DB 저장 통합
 """
 import subprocess
 import sys
+import time
 import pandas as pd
 from datetime import datetime
+from bulk_loader import copy_frame
 from db_config import get_db_connection
 
 
@@ -32,22 +34,102 @@ def run_filtering(top_n=500):
     return True
 
 
+POOL_COLUMNS = ['ticker', 'name', 'close', 'trading_value', 'change_5d', 'vol_ratio', 'final_score']
+
+# 필터 결과 → 오늘 monitoring 목록으로 맞추는 집합 기반 병합 (바뀐 행만 UPDATE → updated_at 트리거도 그 행만)
+MERGE_STATEMENTS = [
+    # 1. 오늘 날짜 행 (상태 무관) 값 갱신 - status는 유지 (approved 종목이 다시 필터링되어도 status 유지)
+    ('갱신', """
+        UPDATE stock_pool p
+        SET name = i.name, close = i.close, trading_value = i.trading_value,
+            change_5d = i.change_5d, vol_ratio = i.vol_ratio, final_score = i.final_score
+        FROM stock_pool_incoming i
+        WHERE p.ticker = i.ticker AND p.added_date = CURRENT_DATE
+          AND (p.name, p.close, p.trading_value, p.change_5d, p.vol_ratio, p.final_score)
+              IS DISTINCT FROM (i.name, i.close, i.trading_value, i.change_5d, i.vol_ratio, i.final_score)
+    """),
+    # 2. 이전 날짜 monitoring 행이 다시 선정되면 지우고 새로 넣지 않고 그 행을 오늘 날짜로 옮김
+    ('이월', """
+        UPDATE stock_pool p
+        SET added_date = CURRENT_DATE, name = i.name, close = i.close, trading_value = i.trading_value,
+            change_5d = i.change_5d, vol_ratio = i.vol_ratio, final_score = i.final_score
+        FROM stock_pool_incoming i
+        WHERE p.id = (
+                SELECT id FROM stock_pool
+                WHERE ticker = i.ticker AND status = 'monitoring' AND added_date < CURRENT_DATE
+                ORDER BY added_date DESC LIMIT 1
+            )
+          AND NOT EXISTS (
+                SELECT 1 FROM stock_pool t WHERE t.ticker = i.ticker AND t.added_date = CURRENT_DATE
+            )
+    """),
+    # 3. 오늘 목록에 없는 monitoring 행 삭제 (approved/trading/completed는 유지)
+    ('삭제', """
+        DELETE FROM stock_pool p
+        WHERE p.status = 'monitoring'
+          AND NOT (p.added_date = CURRENT_DATE
+                   AND EXISTS (SELECT 1 FROM stock_pool_incoming i WHERE i.ticker = p.ticker))
+    """),
+    # 4. 새로 선정된 종목 추가
+    ('추가', """
+        INSERT INTO stock_pool
+        (ticker, name, close, trading_value, change_5d, vol_ratio, final_score, status, added_date)
+        SELECT i.ticker, i.name, i.close, i.trading_value, i.change_5d, i.vol_ratio, i.final_score,
+               'monitoring', CURRENT_DATE
+        FROM stock_pool_incoming i
+        WHERE NOT EXISTS (
+            SELECT 1 FROM stock_pool p WHERE p.ticker = i.ticker AND p.added_date = CURRENT_DATE
+        )
+    """),
+]
+
+
+def merge_stock_pool(cur, df):
+    """
+    필터 결과를 임시 테이블에 COPY → 갱신/이월/삭제/추가 4개 문장으로 stock_pool 병합
+    → 문장별 처리 행 수 (호출한 쪽 트랜잭션 안에서 실행)
+    """
+    df = df[POOL_COLUMNS].copy()
+    df['ticker'] = df['ticker'].astype(str).str.zfill(6)
+    df['trading_value'] = pd.to_numeric(df['trading_value']).round().astype('Int64')
+    df = df.drop_duplicates(subset='ticker', keep='first')
+
+    cur.execute("""
+        CREATE TEMP TABLE stock_pool_incoming (
+            ticker VARCHAR(6) PRIMARY KEY,
+            name VARCHAR(100),
+            close NUMERIC(10,2),
+            trading_value BIGINT,
+            change_5d NUMERIC(5,2),
+            vol_ratio NUMERIC(5,2),
+            final_score NUMERIC(5,2)
+        ) ON COMMIT DROP
+    """)
+    copy_frame(cur, df, 'stock_pool_incoming', POOL_COLUMNS)
+    cur.execute("ANALYZE stock_pool_incoming")
+
+    counts = {}
+    for label, statement in MERGE_STATEMENTS:
+        cur.execute(statement)
+        counts[label] = cur.rowcount
+    return counts
+
+
 def save_to_database():
-    """필터링 결과를 DB에 저장 (일일 갱신 방식)"""
+    """필터링 결과를 DB에 저장 (일일 갱신 방식, 한 트랜잭션)"""
     print("\n" + "="*60)
     print("📊 DB 저장 중...")
     print("="*60)
 
     # CSV 파일 읽기
     try:
-        df = pd.read_csv('filtered_stocks.csv')
+        df = pd.read_csv('filtered_stocks.csv', dtype={'ticker': str})
         print(f"읽은 종목 수: {len(df)}")
     except FileNotFoundError:
         print("❌ filtered_stocks.csv 파일이 없습니다")
         return False
 
-    # DB에 저장
-    saved_count = 0
+    start_time = time.perf_counter()
     with get_db_connection() as conn:
         cur = conn.cursor()
 
@@ -66,45 +148,17 @@ def save_to_database():
             ON CONFLICT (ticker, added_date, snapshot_date) DO NOTHING
         """)
         backup_count = cur.rowcount
-        print(f"   ✅ {backup_count}행 백업 완료")
-
-        # 2. monitoring 상태 종목만 삭제 (approved/trading/completed는 유지)
-        print("\n2️⃣ monitoring 종목 삭제 중 (approved/trading/completed 유지)...")
-        cur.execute("DELETE FROM stock_pool WHERE status = 'monitoring'")
-        deleted_count = cur.rowcount
-        print(f"   ✅ {deleted_count}행 삭제 완료 (approved/trading/completed 종목은 유지됨)")
-
-        print("\n3️⃣ 새로운 500개 종목 저장 중...")
-
-        for _, row in df.iterrows():
-            try:
-                cur.execute("""
-                    INSERT INTO stock_pool
-                    (ticker, name, close, trading_value, change_5d, vol_ratio, final_score, status, added_date)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, 'monitoring', CURRENT_DATE)
-                    ON CONFLICT (ticker, added_date) DO UPDATE SET
-                        name = EXCLUDED.name,
-                        close = EXCLUDED.close,
-                        trading_value = EXCLUDED.trading_value,
-                        change_5d = EXCLUDED.change_5d,
-                        vol_ratio = EXCLUDED.vol_ratio,
-                        final_score = EXCLUDED.final_score
-                        -- status는 유지 (approved 종목이 다시 필터링되어도 status 유지)
-                """, (
-                    str(row['ticker']).zfill(6),
-                    row['name'],
-                    float(row['close']),
-                    int(row['trading_value']),
-                    float(row['change_5d']),
-                    float(row['vol_ratio']),
-                    float(row['final_score'])
-                ))
-                saved_count += 1
-            except Exception as e:
-                print(f"⚠️ {row['ticker']} 저장 실패: {e}")
-                continue
-
-    print(f"✅ {saved_count}개 종목 DB 저장 완료")
+        backup_time = time.perf_counter() - start_time
+        print(f"   ✅ {backup_count}행 백업 완료 ({backup_time:.2f}초)")
+
+        # 2. 새 필터 결과 병합 (monitoring 종목만 교체, approved/trading/completed는 유지)
+        print(f"\n2️⃣ 새로운 {len(df)}개 종목 병합 중 (바뀐 행만 저장)...")
+        counts = merge_stock_pool(cur, df)
+        merge_time = time.perf_counter() - start_time - backup_time
+        print(f"   ✅ 갱신 {counts['갱신']}, 이월 {counts['이월']}, 삭제 {counts['삭제']}, "
+              f"추가 {counts['추가']}행 ({merge_time:.2f}초)")
+
+    print(f"✅ {len(df)}개 종목 DB 저장 완료 (트랜잭션 {time.perf_counter() - start_time:.2f}초)")
     return True
 
 
@@ -192,6 +246,10 @@ def main():
     # 4. AI 분석 (자동 실행)
     run_ai_analysis(20)
 
+    # 5. DuckDB 분석용 미러 갱신 (stock_pool_history / ai_analysis_reports, 만들어 둔 경우에만)
+    import analytics_db
+    analytics_db.refresh_after_update(tables=['stock_pool_history', 'ai_analysis_reports'])
+
     print("\n" + "="*60)
     print("✅ 전체 파이프라인 완료!")
     print("="*60)
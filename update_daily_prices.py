@@ -1,15 +1,25 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-일별 증분 업데이트: 최신 거래일 데이터만 수집하여 DB 업데이트
+일별 증분 업데이트: 종목별 워터마크 이후 빠진 거래일만 수집하여 DB 업데이트
 """
-import pandas as pd
-import requests
-from io import StringIO
-from datetime import datetime, timedelta
+import asyncio
+import math
+import time
+from datetime import datetime, date, time as dtime, timedelta
+from psycopg2.extras import execute_values
 from db_config import get_db_connection
+from bulk_loader import DailyPriceLoader
+from partitions import drop_before
+from naver_fetcher import NAVER_BASE_URL, NaverFetchEngine, fetch_daily_prices
+from rate_limiter import make_limiter
 from tqdm import tqdm
-import time
+
+ROWS_PER_PAGE = 10          # sise_day 한 페이지당 거래일 수
+NEW_TICKER_PAGES = 20       # 워터마크가 없는 종목은 최근 200거래일 수집
+MAX_PAGES = 40
+MARKET_CLOSE = dtime(15, 30)
+
 
 def get_latest_trading_date():
     """DB에서 가장 최근 거래일 조회"""
@@ -20,139 +30,215 @@ def get_latest_trading_date():
         return result[0] if result[0] else None
 
 
-def get_stock_list():
-    """DB에 있는 모든 종목 코드 조회"""
+def sync_watermarks(full=False):
+    """
+    daily_prices 기준으로 워터마크 채우기
+    full=False: 워터마크 테이블이 비어 있을 때만 (최초 1회)
+    full=True: 모든 종목의 last_date를 실제 MAX(date)로 재계산
+    """
     with get_db_connection() as conn:
         cur = conn.cursor()
-        cur.execute("SELECT DISTINCT ticker FROM daily_prices ORDER BY ticker")
-        return [row[0] for row in cur.fetchall()]
+        if not full:
+            cur.execute("SELECT EXISTS (SELECT 1 FROM price_watermarks)")
+            if cur.fetchone()[0]:
+                return 0
+
+        cur.execute("""
+            INSERT INTO price_watermarks (ticker, last_date)
+            SELECT ticker, MAX(date) FROM daily_prices GROUP BY ticker
+            ON CONFLICT (ticker) DO UPDATE SET
+                last_date = EXCLUDED.last_date,
+                updated_at = CURRENT_TIMESTAMP
+        """)
+        return cur.rowcount
+
+
+def last_close_cutoff(now=None):
+    """직전 장 마감 시각 (이 시각 이후에 확인한 종목은 다시 확인할 필요 없음)"""
+    now = now or datetime.now()
+    cutoff = datetime.combine(now.date(), MARKET_CLOSE)
+    if now < cutoff:
+        cutoff -= timedelta(days=1)
+    while cutoff.weekday() >= 5:
+        cutoff -= timedelta(days=1)
+    return cutoff
+
+
+def get_watermarks(force=False):
+    """확인이 필요한 종목의 워터마크 조회 → [(ticker, last_date), ...]"""
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        if force:
+            cur.execute("SELECT ticker, last_date FROM price_watermarks ORDER BY ticker")
+        else:
+            cur.execute("""
+                SELECT ticker, last_date FROM price_watermarks
+                WHERE last_checked_at IS NULL OR last_checked_at < %s
+                ORDER BY ticker
+            """, (last_close_cutoff(),))
+        return cur.fetchall()
 
 
-def fetch_latest_price(ticker, target_date=None):
-    """
-    특정 종목의 최신 1일 데이터 가져오기 (네이버 증권)
-    target_date: None이면 최신 데이터, 지정하면 해당 날짜 찾기
-    """
-    url = f"https://finance.naver.com/item/sise_day.nhn?code={ticker}&page=1"
-    headers = {'User-Agent': 'Mozilla/5.0'}
+def get_known_through():
+    """전 종목 워터마크 → {ticker: last_date} (스크레이퍼의 known-through 날짜)"""
+    sync_watermarks()
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT ticker, last_date FROM price_watermarks")
+        return dict(cur.fetchall())
 
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        tables = pd.read_html(StringIO(response.text))
 
-        if not tables:
-            return None
+def pages_for_gap(last_date, today=None):
+    """워터마크 이후 빠진 거래일(평일 기준)을 덮는 데 필요한 페이지 수"""
+    if last_date is None:
+        return NEW_TICKER_PAGES
 
-        df = tables[0].dropna()
-        if df.empty:
-            return None
+    today = today or date.today()
+    gap_days = 0
+    d = last_date + timedelta(days=1)
+    while d <= today:
+        if d.weekday() < 5:
+            gap_days += 1
+        d += timedelta(days=1)
 
-        df['ticker'] = ticker
-        df = df.rename(columns={
-            '날짜': 'date', '종가': 'close', '전일비': 'diff',
-            '시가': 'open', '고가': 'high', '저가': 'low', '거래량': 'volume'
-        })
-        df['date'] = pd.to_datetime(df['date'])
+    # 워터마크 당일 1행을 겹쳐 받아 연속성 확인
+    return min(MAX_PAGES, max(1, math.ceil((gap_days + 1) / ROWS_PER_PAGE)))
 
-        # 최신 1일만
-        latest = df.iloc[0:1]
-        return latest
 
-    except Exception as e:
-        print(f"   ⚠️ {ticker} 조회 실패: {e}")
-        return None
+def save_new_rows(frames, watermarks):
+    """워터마크 이후 행만 bulk_loader로 daily_prices에 upsert → (신규, 업데이트) 행 수"""
+    with DailyPriceLoader(verbose=False) as loader:
+        for ticker, df in frames.items():
+            last_date = watermarks.get(ticker)
+            if last_date is not None:
+                df = df[df['date'].dt.date > last_date]
+            loader.write(df)
+    return loader.stats['inserted'], loader.stats['updated']
 
 
-def update_incremental(limit_stocks=None):
-    """증분 업데이트: 최신 데이터만 가져와서 DB에 추가/업데이트"""
+def stream_new_rows(jobs, watermarks, on_result=None, loader=DailyPriceLoader, batch_rows=5000,
+                    **engine_kwargs):
+    """
+    수집과 저장을 겹쳐 실행: 종목이 끝날 때마다 워터마크 이후 행을 db_async 배치 writer에 넘기고
+    다음 종목 수집을 계속 → (frames, 수집 통계, 저장 통계)
+    저장 중인 배치가 max_inflight를 넘으면 writer.put에서 기다림 → 수집 엔진도 멈춰 메모리가 늘지 않음
+    """
+    from db_async import AsyncUpsertWriter, create_pool
+
+    frames = {}
+
+    async def run():
+        pool = await create_pool(min_size=1, max_size=2)
+        try:
+            async with AsyncUpsertWriter(pool, loader, batch_rows=batch_rows) as writer:
+                async def collect(ticker, df):
+                    if df is not None:
+                        frames[ticker] = df
+                        last_date = watermarks.get(ticker)
+                        await writer.put(df if last_date is None else df[df['date'].dt.date > last_date])
+                    if on_result is not None:
+                        on_result(ticker, df)
+
+                start = time.perf_counter()
+                stats = await NaverFetchEngine(**engine_kwargs).run(jobs, collect)
+                stats = dict(stats, elapsed=time.perf_counter() - start)
+        finally:
+            await pool.close()
+        return stats, writer.stats
+
+    stats, write_stats = asyncio.run(run())
+    return frames, stats, write_stats
+
+
+def update_watermarks(cur, frames, checked_at):
+    """수집 성공 종목의 last_date / last_checked_at 갱신 (워터마크가 없던 신규 종목은 추가)"""
+    values = [(ticker, df['date'].max().date() if not df.empty else None, checked_at)
+              for ticker, df in frames.items()]
+    if not values:
+        return
+
+    execute_values(cur, """
+        INSERT INTO price_watermarks AS w (ticker, last_date, last_checked_at)
+        VALUES %s
+        ON CONFLICT (ticker) DO UPDATE SET
+            last_date = GREATEST(w.last_date, EXCLUDED.last_date),
+            last_checked_at = EXCLUDED.last_checked_at,
+            updated_at = CURRENT_TIMESTAMP
+    """, values, template="(%s, %s::date, %s::timestamp)", page_size=1000)
+
+
+def update_incremental(limit_stocks=None, concurrency=8, force=False, base_url=NAVER_BASE_URL,
+                       limiter=None, stream=True):
+    """증분 업데이트: 종목별 워터마크 이후의 빠진 거래일만 가져와서 DB에 추가/업데이트"""
     print(f"\n{'='*60}")
     print(f"🔄 일별 증분 업데이트 시작")
     print(f"{'='*60}\n")
 
-    # 1. DB 최신 날짜 확인
-    latest_db_date = get_latest_trading_date()
-    print(f"1️⃣ DB 최신 거래일: {latest_db_date}")
+    # 1. 워터마크 확인
+    seeded = sync_watermarks()
+    if seeded:
+        print(f"1️⃣ 워터마크 초기화: {seeded}개 종목")
 
-    # 2. 종목 목록 가져오기
-    stock_list = get_stock_list()
+    watermarks = get_watermarks(force=force)
     if limit_stocks:
-        stock_list = stock_list[:limit_stocks]
-    print(f"2️⃣ 업데이트 대상: {len(stock_list)}개 종목")
+        watermarks = watermarks[:limit_stocks]
+    print(f"1️⃣ 확인 대상: {len(watermarks)}개 종목 (장 마감 이후 확인된 종목 제외)")
+
+    if not watermarks:
+        return 0
+
+    # 2. 종목별 페이지 상한 계산 (워터마크 이하 날짜가 보이는 페이지에서 조기 중단)
+    jobs = [(ticker, pages_for_gap(last_date), last_date) for ticker, last_date in watermarks]
+    total_pages = sum(p for _, p, _ in jobs)
+    print(f"2️⃣ 페이지 상한: {total_pages:,}개 (종목당 평균 {total_pages/len(jobs):.1f})")
+
+    # 3. 동시 수집 (stream=True면 끝난 종목부터 비동기로 바로 저장)
+    print(f"\n3️⃣ 최신 데이터 수집 중 (동시 {concurrency}{', 수집과 저장 병행' if stream else ''})...")
+    checked_at = datetime.now()
+    last_dates = dict(watermarks)
+
+    with tqdm(total=len(jobs), desc="수집 진행") as pbar:
+        if stream:
+            frames, stats, write_stats = stream_new_rows(
+                jobs, last_dates, lambda ticker, df: pbar.update(1),
+                base_url=base_url, max_per_host=concurrency, limiter=limiter)
+        else:
+            frames = {}
 
-    # 3. 각 종목의 최신 데이터 가져오기
-    print(f"\n3️⃣ 최신 데이터 수집 중...")
+            def on_result(ticker, df):
+                if df is not None:
+                    frames[ticker] = df
+                pbar.update(1)
 
-    new_count = 0
-    updated_count = 0
-    skipped_count = 0
-    error_count = 0
+            stats = fetch_daily_prices(jobs, on_result, base_url=base_url, max_per_host=concurrency,
+                                       limiter=limiter)
 
+    error_count = len(jobs) - len(frames)
+
+    # 4. DB 저장 후 워터마크 갱신 (워터마크는 저장이 끝난 뒤에만 전진)
+    if stream:
+        new_count, updated_count = write_stats['inserted'], write_stats['updated']
+    else:
+        new_count, updated_count = save_new_rows(frames, last_dates)
     with get_db_connection() as conn:
         cur = conn.cursor()
+        update_watermarks(cur, frames, checked_at)
 
-        for ticker in tqdm(stock_list, desc="수집 진행"):
-            latest_data = fetch_latest_price(ticker)
-
-            if latest_data is None or latest_data.empty:
-                error_count += 1
-                continue
-
-            row = latest_data.iloc[0]
-            data_date = row['date'].date()
-
-            # DB에 이미 최신 데이터가 있으면 스킵
-            if latest_db_date and data_date <= latest_db_date:
-                skipped_count += 1
-                continue
-
-            # DB에 저장 (INSERT or UPDATE)
-            try:
-                cur.execute("""
-                    INSERT INTO daily_prices
-                    (ticker, date, open, high, low, close, volume, diff)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (ticker, date) DO UPDATE SET
-                        open = EXCLUDED.open,
-                        high = EXCLUDED.high,
-                        low = EXCLUDED.low,
-                        close = EXCLUDED.close,
-                        volume = EXCLUDED.volume,
-                        diff = EXCLUDED.diff,
-                        created_at = CURRENT_TIMESTAMP
-                    RETURNING (xmax = 0) AS inserted
-                """, (
-                    ticker,
-                    data_date,
-                    float(row['open']) if pd.notna(row['open']) else None,
-                    float(row['high']) if pd.notna(row['high']) else None,
-                    float(row['low']) if pd.notna(row['low']) else None,
-                    float(row['close']) if pd.notna(row['close']) else None,
-                    int(row['volume']) if pd.notna(row['volume']) else None,
-                    str(row['diff']) if pd.notna(row['diff']) else None
-                ))
-
-                result = cur.fetchone()
-                if result and result[0]:
-                    new_count += 1
-                else:
-                    updated_count += 1
-
-            except Exception as e:
-                error_count += 1
-                continue
-
-            # Rate limiting (네이버 차단 방지)
-            time.sleep(0.1)
-
-        conn.commit()
+    up_to_date = sum(
+        1 for ticker, df in frames.items()
+        if last_dates.get(ticker) is not None and df['date'].max().date() <= last_dates[ticker]
+    )
 
     print(f"\n{'='*60}")
     print(f"✅ 증분 업데이트 완료!")
     print(f"{'='*60}")
-    print(f"   📝 신규 추가: {new_count}개")
-    print(f"   🔄 업데이트: {updated_count}개")
-    print(f"   ⏭️  스킵: {skipped_count}개 (이미 최신)")
-    print(f"   ❌ 실패: {error_count}개")
+    print(f"   📝 신규 추가: {new_count}행")
+    print(f"   🔄 업데이트: {updated_count}행")
+    print(f"   ⏭️  변동 없음: {up_to_date}개 종목 (이미 최신)")
+    print(f"   ❌ 실패: {error_count}개 종목 (다음 실행 시 재시도)")
+    print(f"   🌐 요청: {stats['requests']:,}페이지 ({stats['elapsed']:.1f}초, "
+          f"조기 중단 {stats['early_stops']:,}개 종목, "
+          f"제한 응답 {stats['throttled']:,}회)")
 
     # 최종 DB 상태 확인
     new_latest = get_latest_trading_date()
@@ -168,10 +254,23 @@ if __name__ == "__main__":
     parser.add_argument('--limit', type=int, help='Limit number of stocks to update')
     parser.add_argument('--no-cleanup', action='store_true', help='Skip cleanup of old data')
     parser.add_argument('--keep-days', type=int, default=200, help='Keep last N days (default: 200)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Max concurrent requests')
+    parser.add_argument('--force', action='store_true', help='Re-check tickers already checked since the last close')
+    parser.add_argument('--resync-watermarks', action='store_true',
+                        help='Recompute watermarks from daily_prices before updating')
+    parser.add_argument('--base-url', default=NAVER_BASE_URL, help='Override host (e.g. local stub server)')
+    parser.add_argument('--no-rate-limit', action='store_true', help='Disable the shared rate limiter')
+    parser.add_argument('--no-stream', action='store_true',
+                        help='Save after all tickers are fetched instead of streaming rows to the DB')
     args = parser.parse_args()
 
     start_time = datetime.now()
-    updated = update_incremental(args.limit)
+    if args.resync_watermarks:
+        print(f"🔁 워터마크 재계산: {sync_watermarks(full=True)}개 종목")
+    updated = update_incremental(args.limit, concurrency=args.concurrency,
+                                 force=args.force, base_url=args.base_url,
+                                 limiter=make_limiter(no_limit=args.no_rate_limit),
+                                 stream=not args.no_stream)
 
     elapsed = (datetime.now() - start_time).total_seconds()
     print(f"\n⏱️  소요 시간: {elapsed:.1f}초")
@@ -185,37 +284,22 @@ if __name__ == "__main__":
         print(f"🗑️  오래된 데이터 정리 중 (최근 {args.keep_days}일만 유지)...")
         print(f"{'='*60}")
 
-        with get_db_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(f"""
-                DELETE FROM daily_prices
-                WHERE date < CURRENT_DATE - INTERVAL '{args.keep_days} days'
-            """)
-            deleted = cur.rowcount
-
-            if deleted > 0:
-                print(f"✅ {deleted:,}행 삭제 완료")
-
-        # VACUUM은 별도 연결에서 (autocommit 모드)
-        if deleted > 0:
-            print(f"🔧 디스크 공간 회수 중...")
-            import psycopg2
-            import os as os_env
-            from dotenv import load_dotenv
-
-            load_dotenv()
-            vacuum_conn = psycopg2.connect(
-                host=os_env.getenv("DB_HOST", "localhost"),
-                port=os_env.getenv("DB_PORT", "5432"),
-                database=os_env.getenv("DB_NAME", "stockgravity"),
-                user=os_env.getenv("DB_USER", "postgres"),
-                password=os_env.getenv("DB_PASSWORD", "")
-            )
-            vacuum_conn.autocommit = True
-            vacuum_cur = vacuum_conn.cursor()
-            vacuum_cur.execute("VACUUM ANALYZE daily_prices")
-            vacuum_cur.close()
-            vacuum_conn.close()
-            print(f"✅ 완료")
+        # 월별 파티션이면 오래된 달은 파티션째 삭제, 경계 달만 DELETE
+        result = drop_before('daily_prices', date.today() - timedelta(days=args.keep_days))
+
+        if result['dropped'] or result['deleted']:
+            print(f"✅ 파티션 {result['dropped']}개, {result['deleted']:,}행 삭제 완료")
         else:
             print(f"✅ 정리할 데이터 없음 (이미 최근 {args.keep_days}일만 유지 중)")
+
+    # 분석용 가격 스냅샷 갱신 (변경된 월만)
+    from price_store import refresh_after_update
+    refresh_after_update()
+
+    # 전 종목 기술 지표 (daily_indicators, 새로 들어온 거래일만)
+    import daily_indicators
+    daily_indicators.refresh_after_update()
+
+    # DuckDB 분석용 미러 (analytics_db.py, 만들어 둔 경우에만)
+    import analytics_db
+    analytics_db.refresh_after_update()